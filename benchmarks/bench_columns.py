@@ -0,0 +1,67 @@
+#!/usr/bin/python3
+"""
+Benchmark a numeric Place filter: loop over storage.all() vs Columns
+
+Usage: ./benchmarks/bench_columns.py [count ...]
+(default counts: 100000 1000000)
+
+count Places are stored, then the places under 100 a night with at
+least 2 rooms are found with a Python loop over storage.all(Place) and
+with storage.columns(Place).select().
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+os.chdir(tempfile.mkdtemp())
+
+from models.engine import columns  # noqa: E402
+from models.engine.file_storage import FileStorage  # noqa: E402
+from models.place import Place  # noqa: E402
+
+DATE = "2024-01-13T12:09:00.462348"
+
+
+def timed(func):
+    """return the seconds spent running func and its result"""
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def loop(storage):
+    """the filter as a loop over the objects"""
+    return [obj.id for obj in storage.all(Place).values()
+            if obj.price_by_night < 100 and obj.number_rooms >= 2]
+
+
+if __name__ == "__main__":
+    counts = [int(arg) for arg in sys.argv[1:]] or [100000, 1000000]
+    random.seed(0)
+    for count in counts:
+        FileStorage._FileStorage__objects.clear()
+        storage = FileStorage(fsync=False)
+        storage.reload()
+        for i in range(count):
+            storage.new(Place(id=str(i), created_at=DATE, updated_at=DATE,
+                              price_by_night=random.randrange(500),
+                              number_rooms=random.randrange(6)))
+        build, _ = timed(lambda: storage.columns(Place))
+        before, expected = timed(lambda: loop(storage))
+        print(f"{count:>8} places: build={build:6.3f}s loop={before:6.3f}s")
+        numpy = columns.numpy
+        for name in ("numpy", "array"):
+            if name == "array":
+                columns.numpy = None
+            elif numpy is None:
+                continue
+            after, found = timed(lambda: storage.columns(Place).select(
+                price_by_night__lt=100, number_rooms__ge=2))
+            assert sorted(found) == sorted(expected)
+            print(f"{name:>17}: select={after:6.3f}s "
+                  f"speedup={before / after:5.1f}x")
+        columns.numpy = numpy
@@ -0,0 +1,58 @@
+#!/usr/bin/python3
+"""
+Benchmark the compression codecs of FileStorage
+
+Usage: ./benchmarks/bench_compression.py [count ...]
+(default counts: 100000)
+
+count Place objects are saved and reloaded with each serializer, plain
+and through every codec at a few levels; the file size and the time of
+a full save and of a reload are printed.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+os.chdir(tempfile.mkdtemp())
+
+from models.engine.file_storage import FileStorage  # noqa: E402
+from models.place import Place  # noqa: E402
+
+CODECS = [(None, None), ("zlib", 1), ("zlib", 6), ("zlib", 9),
+          ("gzip", 1), ("gzip", 6), ("gzip", 9), ("lzma", 0), ("lzma", 6)]
+
+
+def timed(func):
+    """return the seconds spent running func"""
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    counts = [int(arg) for arg in sys.argv[1:]] or [100000]
+    for count in counts:
+        FileStorage._FileStorage__objects.clear()
+        for i in range(count):
+            Place().__dict__.update(
+                city_id=str(i % 100), user_id=str(i % 1000),
+                name=f"Place {i}", number_rooms=i % 7,
+                price_by_night=i % 300, latitude=i / count)
+        objects = dict(FileStorage._FileStorage__objects)
+        for name in ("json", "binary"):
+            for codec, level in CODECS:
+                path = f"file_{count}_{name}_{codec}_{level}"
+                storage = FileStorage(path, fsync=False, serializer=name,
+                                      compression=codec,
+                                      compresslevel=level)
+                save = timed(storage.save)
+                FileStorage._FileStorage__objects.clear()
+                reload = timed(storage.reload)
+                FileStorage._FileStorage__objects.update(objects)
+                label = "none" if codec is None else f"{codec}-{level}"
+                print(f"{count:>8} {name:>6} {label:>7}: "
+                      f"size={os.path.getsize(path):>10} "
+                      f"save={save:6.3f}s reload={reload:6.3f}s")
@@ -0,0 +1,87 @@
+#!/usr/bin/python3
+"""
+Measure the memory the shared id strings save on reload
+
+Usage: ./benchmarks/bench_intern.py [scale]
+(default scale: 1, i.e. 100000 places and 300000 reviews)
+
+A file.json with a realistic fan-out is written (50 states, 40 cities
+per state, users, places with 3 amenities each, reviews) and reloaded
+with and without share(), and the traced memory kept by the loaded
+objects is printed.
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+import tracemalloc
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+os.chdir(tempfile.mkdtemp())
+
+from models import base_model  # noqa: E402
+from models.engine import file_storage  # noqa: E402
+from models.engine.file_storage import FileStorage  # noqa: E402
+
+DATE = "2024-01-13T12:09:00.462348"
+
+
+def ids(count):
+    """return count new uuid strings"""
+    return [str(uuid.uuid4()) for i in range(count)]
+
+
+def records(scale):
+    """return the {key: record} of the dataset"""
+    random.seed(0)
+    states, amenities = ids(50), ids(100)
+    cities, users = ids(2000), ids(20000 * scale)
+    places, reviews = ids(100000 * scale), ids(300000 * scale)
+    data = {}
+
+    def add(cls, obj_id, **attributes):
+        data[f"{cls}.{obj_id}"] = dict(attributes, id=obj_id, __class__=cls,
+                                       created_at=DATE, updated_at=DATE)
+    for obj_id in states:
+        add("State", obj_id, name="California")
+    for obj_id in amenities:
+        add("Amenity", obj_id, name="Wifi")
+    for obj_id in cities:
+        add("City", obj_id, state_id=random.choice(states), name="SF")
+    for obj_id in users:
+        add("User", obj_id, email="a@b.c", first_name="Betty")
+    for obj_id in places:
+        add("Place", obj_id, city_id=random.choice(cities),
+            user_id=random.choice(users), name="Loft",
+            amenity_ids=random.sample(amenities, 3))
+    for obj_id in reviews:
+        add("Review", obj_id, place_id=random.choice(places),
+            user_id=random.choice(users), text="Great")
+    return data
+
+
+def kept():
+    """return the MiB kept by a reload of file.json"""
+    FileStorage._FileStorage__objects.clear()
+    tracemalloc.start()
+    FileStorage("file.json").reload()
+    used = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return used / 2 ** 20
+
+
+if __name__ == "__main__":
+    scale = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    with open("file.json", "w") as file:
+        json.dump(records(scale), file)
+    shared = kept()
+    share = base_model.share
+    base_model.share = file_storage.share = lambda value: value
+    copies = kept()
+    base_model.share = file_storage.share = share
+    print(f"scale {scale}: copies={copies:7.1f} MiB shared={shared:7.1f} MiB "
+          f"saved={copies - shared:6.1f} MiB "
+          f"({100 * (1 - shared / copies):4.1f}%)")
@@ -0,0 +1,56 @@
+#!/usr/bin/python3
+"""
+Measure the memory used per instance of every model class
+
+Usage: ./benchmarks/bench_memory.py [count]
+(default count: 100000)
+
+count instances of each class are built with from_dict() from records
+shaped like the ones in file.json, once with the regular class and once
+with its compact variant, and the traced bytes per instance are printed.
+"""
+
+import os
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+os.chdir(tempfile.mkdtemp())
+
+import models  # noqa: E402
+from models.compact import compact  # noqa: E402
+
+DATE = "2024-01-13T12:09:00.462348"
+
+
+def records(cls, count):
+    """return count to_dict() style records of cls"""
+    sample = {name: value for name, value in cls.defaults().items()
+              if not isinstance(value, list)}
+    for name, value in sample.items():
+        if isinstance(value, str):
+            sample[name] = name * 4
+    return [dict(sample, id=f"{i:036d}", created_at=DATE, updated_at=DATE,
+                 __class__=cls.__name__) for i in range(count)]
+
+
+def per_instance(cls, data):
+    """return the traced bytes per instance of cls built from data"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [cls.from_dict(record) for record in data]
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del objects
+    return used / len(data)
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    for name, cls in models.classes.items():
+        data = records(cls, count)
+        regular = per_instance(cls, data)
+        small = per_instance(compact(cls), data)
+        print(f"{name:10} regular={regular:7.1f} B compact={small:7.1f} B "
+              f"saved={100 * (1 - small / regular):5.1f}%")
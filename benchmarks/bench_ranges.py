@@ -0,0 +1,90 @@
+#!/usr/bin/python3
+"""
+Benchmark the range queries of Place: linear scan vs sorted index
+
+Usage: ./benchmarks/bench_ranges.py [count ...]
+(default counts: 100000 1000000)
+
+count Places with random prices are spread over 200 cities, then three
+queries (a narrow price range, the 20 cheapest places, the 20 cheapest
+places of a city) are answered by a loop over storage.all(Place) and by
+storage.query(Place), which reads the sorted index of price_by_night
+(or the reverse index of city_id). The average time of a query is
+printed.
+"""
+
+import heapq
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+os.chdir(tempfile.mkdtemp())
+
+from models.engine.file_storage import FileStorage  # noqa: E402
+from models.place import Place  # noqa: E402
+
+DATE = "2024-01-13T12:09:00.462348"
+QUERIES = 20
+
+
+def timed(func, arguments):
+    """return the average seconds of func over arguments, and its results"""
+    start = time.perf_counter()
+    results = [func(*args) for args in arguments]
+    return (time.perf_counter() - start) / len(arguments), results
+
+
+def price(obj):
+    """return the price of a place, to sort on it"""
+    return obj.price_by_night
+
+
+if __name__ == "__main__":
+    counts = [int(arg) for arg in sys.argv[1:]] or [100000, 1000000]
+    random.seed(0)
+    cities = [f"city-{i}" for i in range(200)]
+    for count in counts:
+        FileStorage._FileStorage__objects.clear()
+        storage = FileStorage(fsync=False)
+        storage.reload()
+        for i in range(count):
+            storage.new(Place(
+                id=str(i), created_at=DATE, updated_at=DATE,
+                city_id=random.choice(cities),
+                price_by_night=random.randrange(10000)))
+        start = time.perf_counter()
+        storage.ranges(Place, "price_by_night")
+        storage.references(Place)
+        print(f"{count:>8} places: build={time.perf_counter() - start:.3f}s")
+        lows = [random.randrange(9990) for i in range(QUERIES)]
+        picked = random.sample(cities, QUERIES)
+        places = storage.all(Place).values
+        kinds = [
+            ("price range", lows,
+             lambda low: [obj for obj in places()
+                          if low <= obj.price_by_night < low + 10],
+             lambda low: storage.query(Place).filter(
+                 price_by_night__ge=low,
+                 price_by_night__lt=low + 10).all()),
+            ("20 cheapest", [None] * QUERIES,
+             lambda _: heapq.nsmallest(20, places(), key=price),
+             lambda _: storage.query(Place).order_by(
+                 "price_by_night").limit(20).all()),
+            ("20 cheapest of city", picked,
+             lambda city: heapq.nsmallest(
+                 20, (obj for obj in places() if obj.city_id == city),
+                 key=price),
+             lambda city: storage.query(Place).filter(city_id=city)
+             .order_by("price_by_night").limit(20).all()),
+        ]
+        for name, arguments, scan, indexed in kinds:
+            before, expected = timed(scan, [(arg,) for arg in arguments])
+            after, found = timed(indexed, [(arg,) for arg in arguments])
+            assert [sorted(map(price, result)) for result in found] == \
+                [sorted(map(price, result)) for result in expected]
+            print(f"{name:>20}: scan={before * 1000:9.3f}ms "
+                  f"query={after * 1000:7.3f}ms "
+                  f"speedup={before / after:7.0f}x")
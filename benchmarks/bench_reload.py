@@ -0,0 +1,87 @@
+#!/usr/bin/python3
+"""
+Benchmark FileStorage.reload() against the previous eval/__init__ path
+
+Usage: ./benchmarks/bench_reload.py [count ...]
+(default counts: 100000 1000000)
+
+A file.json holding count Review objects is written, then loaded once
+the old way (eval of the class name and BaseModel.__init__(**kwargs))
+and once with FileStorage.reload(). Each load is then run again under
+tracemalloc to print its peak memory next to the memory the loaded
+objects keep.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+os.chdir(tempfile.mkdtemp())
+
+from models.engine.file_storage import FileStorage  # noqa: E402
+from models.review import Review  # noqa: E402
+
+DATE = "2024-01-13T12:09:00.462348"
+
+
+def old_reload(path):
+    """the reload loop FileStorage used before the class registry"""
+    objects = {}
+    with open(path) as file:
+        for obj in json.load(file).values():
+            instance = eval(obj["__class__"], {"Review": Review})(**obj)
+            objects[f"{obj['__class__']}.{instance.id}"] = instance
+    return objects
+
+
+def timed(func):
+    """return the seconds spent running func"""
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def traced(func):
+    """return the peak and the kept MiB traced while running func"""
+    tracemalloc.start()
+    kept = func()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return peak / 2 ** 20, current / 2 ** 20
+
+
+def new_reload(path):
+    """reload path into an empty FileStorage, return its objects"""
+    FileStorage._FileStorage__objects.clear()
+    FileStorage(path).reload()
+    return FileStorage._FileStorage__objects
+
+
+if __name__ == "__main__":
+    counts = [int(arg) for arg in sys.argv[1:]] or [100000, 1000000]
+    for count in counts:
+        path = f"file_{count}.json"
+        records = {f"Review.{i}": {"id": str(i), "created_at": DATE,
+                                   "updated_at": DATE, "__class__": "Review",
+                                   "place_id": str(i % 100),
+                                   "user_id": str(i % 1000),
+                                   "text": "Great place"}
+                   for i in range(count)}
+        with open(path, "w") as file:
+            json.dump(records, file)
+        del records
+
+        before = timed(lambda: old_reload(path))
+        after = timed(lambda: new_reload(path))
+        FileStorage._FileStorage__objects.clear()
+        print(f"{count:>8} records: before={before:7.3f}s "
+              f"after={after:7.3f}s speedup={before / after:4.1f}x")
+        for name, func in (("before", old_reload), ("after", new_reload)):
+            peak, kept = traced(lambda: func(path))
+            FileStorage._FileStorage__objects.clear()
+            print(f"{name:>17}: peak={peak:8.1f} MiB kept={kept:8.1f} MiB")
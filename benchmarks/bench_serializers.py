@@ -0,0 +1,47 @@
+#!/usr/bin/python3
+"""
+Benchmark the JSON and binary FileStorage formats
+
+Usage: ./benchmarks/bench_serializers.py [count ...]
+(default counts: 100000)
+
+count Place objects are saved and reloaded with each serializer; the
+file size and the time of a full save and of a reload are printed.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+os.chdir(tempfile.mkdtemp())
+
+from models.engine.file_storage import FileStorage  # noqa: E402
+from models.place import Place  # noqa: E402
+
+
+def timed(func):
+    """return the seconds spent running func"""
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    counts = [int(arg) for arg in sys.argv[1:]] or [100000]
+    for count in counts:
+        FileStorage._FileStorage__objects.clear()
+        for i in range(count):
+            Place().__dict__.update(
+                city_id=str(i % 100), user_id=str(i % 1000),
+                name=f"Place {i}", number_rooms=i % 7,
+                price_by_night=i % 300, latitude=i / count)
+        for name in ("json", "binary"):
+            path = f"file_{count}.{name}"
+            storage = FileStorage(path, fsync=False, serializer=name)
+            save = timed(storage.save)
+            FileStorage._FileStorage__objects.clear()
+            reload = timed(storage.reload)
+            print(f"{count:>8} {name:>6}: size={os.path.getsize(path):>10} "
+                  f"save={save:6.3f}s reload={reload:6.3f}s")
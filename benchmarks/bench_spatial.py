@@ -0,0 +1,81 @@
+#!/usr/bin/python3
+"""
+Benchmark the spatial queries of Place: linear scan vs Grid
+
+Usage: ./benchmarks/bench_spatial.py [count ...]
+(default counts: 100000 1000000)
+
+count Places are spread around 200 random cities, then 20 queries of
+each kind (places within 5 km, in a 0.2 degree box, 10 nearest) around
+random cities are answered by a scan of storage.all(Place) and by the
+Grid of storage.grid(Place). The average time of a query is printed.
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+os.chdir(tempfile.mkdtemp())
+
+from models.engine.file_storage import FileStorage  # noqa: E402
+from models.engine.spatial import point, scan_box  # noqa: E402
+from models.engine.spatial import scan_nearest, scan_radius  # noqa: E402
+from models.place import Place  # noqa: E402
+
+DATE = "2024-01-13T12:09:00.462348"
+QUERIES = 20
+
+
+def timed(func, arguments):
+    """return the average seconds of func over arguments, and its results"""
+    start = time.perf_counter()
+    results = [func(*args) for args in arguments]
+    return (time.perf_counter() - start) / len(arguments), results
+
+
+def points(storage):
+    """return the (id, point) of every place, the way a scan reads them"""
+    return ((obj.id, point(obj)) for obj in storage.all(Place).values())
+
+
+if __name__ == "__main__":
+    counts = [int(arg) for arg in sys.argv[1:]] or [100000, 1000000]
+    random.seed(0)
+    cities = [(random.uniform(-60, 70), random.uniform(-180, 180))
+              for i in range(200)]
+    for count in counts:
+        FileStorage._FileStorage__objects.clear()
+        storage = FileStorage(fsync=False)
+        storage.reload()
+        for i in range(count):
+            latitude, longitude = random.choice(cities)
+            storage.new(Place(
+                id=str(i), created_at=DATE, updated_at=DATE,
+                latitude=min(90, max(-90, random.gauss(latitude, 0.2))),
+                longitude=(random.gauss(longitude, 0.2) + 180) % 360 - 180))
+        start = time.perf_counter()
+        grid = storage.grid(Place)
+        print(f"{count:>8} places: build={time.perf_counter() - start:.3f}s")
+        centres = random.sample(cities, QUERIES)
+        kinds = [
+            ("radius 5km", lambda c: scan_radius(points(storage), *c, 5),
+             lambda c: grid.radius(*c, 5)),
+            ("box 0.2deg", lambda c: scan_box(points(storage), c[0] - 0.1,
+                                              c[1] - 0.1, c[0] + 0.1,
+                                              c[1] + 0.1),
+             lambda c: grid.box(c[0] - 0.1, c[1] - 0.1, c[0] + 0.1,
+                                c[1] + 0.1)),
+            ("10 nearest", lambda c: scan_nearest(points(storage), *c, 10),
+             lambda c: grid.nearest(*c, 10)),
+        ]
+        for name, scan, indexed in kinds:
+            before, expected = timed(scan, [(c,) for c in centres])
+            after, found = timed(indexed, [(c,) for c in centres])
+            assert [sorted(result) for result in found] == \
+                [sorted(result) for result in expected]
+            print(f"{name:>17}: scan={before * 1000:9.3f}ms "
+                  f"grid={after * 1000:7.3f}ms "
+                  f"speedup={before / after:7.0f}x")
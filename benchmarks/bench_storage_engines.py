@@ -0,0 +1,72 @@
+#!/usr/bin/python3
+"""
+Benchmark FileStorage against DBStorage
+
+Usage: ./benchmarks/bench_storage_engines.py [count ...]
+(default counts: 10000 100000 1000000)
+
+For each count, both engines are filled with Review objects, then the
+time of the bulk save, of saving a single changed object, of loading
+every review in a new storage (reload() then all(Review): FileStorage
+reads its file in reload(), DBStorage only opens the database there and
+reads the rows in all()) and of counting one class is printed.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+os.chdir(tempfile.mkdtemp())
+
+import models  # noqa: E402
+from models.engine.db_storage import DBStorage  # noqa: E402
+from models.engine.file_storage import FileStorage  # noqa: E402
+from models.review import Review  # noqa: E402
+
+DATE = "2024-01-13T12:09:00.462348"
+
+
+def timed(func):
+    """return the seconds spent running func"""
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def bench(name, make_storage, count):
+    """fill a storage with count reviews and print the timings"""
+    storage = make_storage()
+    storage.reload()
+    models.storage = storage
+    reviews = [Review(id=str(i), created_at=DATE, updated_at=DATE,
+                      place_id=str(i % 100), user_id=str(i % 1000),
+                      text="Great place") for i in range(count)]
+    for review in reviews:
+        storage.new(review)
+    save_all = timed(storage.save)
+    reviews[count // 2].text = "Changed"
+    save_one = timed(storage.save)
+
+    storage = make_storage()
+    models.storage = storage
+    if isinstance(storage, FileStorage):
+        FileStorage._FileStorage__objects.clear()
+    load = timed(lambda: (storage.reload(), storage.all(Review)))
+    count_cls = timed(lambda: storage.count(Review))
+    print(f"{name:12} {count:>8} save_all={save_all:8.3f}s "
+          f"save_one={save_one:8.4f}s load={load:8.3f}s "
+          f"count={count_cls:8.4f}s")
+    if isinstance(storage, DBStorage):
+        storage.close()
+    else:
+        FileStorage._FileStorage__objects.clear()
+
+
+if __name__ == "__main__":
+    counts = [int(arg) for arg in sys.argv[1:]] or [10000, 100000, 1000000]
+    for count in counts:
+        bench("FileStorage", lambda: FileStorage(f"file_{count}.json"),
+              count)
+        bench("DBStorage", lambda: DBStorage(f"hbnb_{count}.db"), count)
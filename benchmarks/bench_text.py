@@ -0,0 +1,98 @@
+#!/usr/bin/python3
+"""
+Benchmark the text search of Review: linear scan vs TextIndex
+
+Usage: ./benchmarks/bench_text.py [count ...]
+(default counts: 100000 1000000)
+
+count Reviews of 5 to 40 words drawn from a vocabulary of 20000 words
+with Zipf frequencies are stored, then the index is built, written with
+persist_text=True and read back (checking every review against it)
+as a storage would at startup. 10 queries of each kind (two rare words,
+two rare and a common word, one common word) are answered by a scan
+tokenizing every review, by scoring every review using a word (k=None)
+and by the top 10 of search(). The average time of a query is printed.
+"""
+
+import itertools
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+os.chdir(tempfile.mkdtemp())
+
+from models.engine.file_storage import FileStorage  # noqa: E402
+from models.engine.text import tokens  # noqa: E402
+from models.review import Review  # noqa: E402
+
+DATE = "2024-01-13T12:09:00.462348"
+QUERIES = 10
+WORDS = [f"word{rank}" for rank in range(20000)]
+# cumulated once, random.choices() would do it for every review
+WEIGHTS = list(itertools.accumulate(1 / (rank + 1)
+                                    for rank in range(len(WORDS))))
+
+
+def timed(func, arguments):
+    """return the average seconds of func over arguments, and its results"""
+    start = time.perf_counter()
+    results = [func(*args) for args in arguments]
+    return (time.perf_counter() - start) / len(arguments), results
+
+
+def scan(storage, text):
+    """return the ids of the reviews using a word of text, by a scan"""
+    words = set(tokens(text))
+    return [obj.id for obj in storage.all(Review).values()
+            if not words.isdisjoint(tokens(obj.text))]
+
+
+if __name__ == "__main__":
+    counts = [int(arg) for arg in sys.argv[1:]] or [100000, 1000000]
+    random.seed(0)
+    for count in counts:
+        FileStorage._FileStorage__objects.clear()
+        storage = FileStorage(fsync=False, persist_text=True)
+        storage.reload()
+        for i in range(count):
+            storage.new(Review(id=str(i), created_at=DATE, updated_at=DATE,
+                               text=" ".join(random.choices(
+                                   WORDS, cum_weights=WEIGHTS,
+                                   k=random.randrange(5, 41)))))
+        start = time.perf_counter()
+        storage.text(Review)
+        built = time.perf_counter() - start
+        start = time.perf_counter()
+        storage.close()
+        written = time.perf_counter() - start
+        storage.reload()
+        start = time.perf_counter()
+        storage.text(Review)
+        read = time.perf_counter() - start
+        size = os.path.getsize("file.json.Review.text") / 2 ** 20
+        print(f"{count:>8} reviews: build={built:.2f}s write={written:.2f}s"
+              f" read={read:.2f}s ({size:.1f}MB)")
+        kinds = [
+            ("2 rare", lambda: random.sample(WORDS[2000:], 2)),
+            ("2 rare + common", lambda: random.sample(WORDS[2000:], 2)
+             + random.sample(WORDS[:10], 1)),
+            ("1 common", lambda: random.sample(WORDS[:10], 1)),
+        ]
+        for name, pick in kinds:
+            texts = [(" ".join(pick()),) for i in range(QUERIES)]
+            before, expected = timed(lambda text: scan(storage, text), texts)
+            every, ranked = timed(
+                lambda text: storage.search(Review, text, None), texts)
+            after, found = timed(
+                lambda text: storage.search(Review, text, 10), texts)
+            assert [sorted(obj.id for score, obj in result)
+                    for result in ranked] == [sorted(ids) for ids in expected]
+            assert [result[:10] for result in ranked] == found
+            print(f"{name:>16}: scan={before * 1000:9.3f}ms "
+                  f"all={every * 1000:8.3f}ms "
+                  f"top10={after * 1000:7.3f}ms "
+                  f"speedup={before / after:7.0f}x")
+        storage.close()
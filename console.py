@@ -5,18 +5,12 @@ import ast
 import cmd
 import models
 import shlex
-from models import storage
-from models.amenity import Amenity
-from models.base_model import BaseModel
-from models.city import City
-from models.place import Place
-from models.review import Review
-from models.state import State
-from models.user import User
+from models import classes, storage
+from models.base_model import typed
+from models.engine.query import parse
 
-classes = dict(BaseModel=BaseModel, User=User, State=State, City=City,
-               Amenity=Amenity, Place=Place, Review=Review)
-commands = ['create', 'show', 'update', 'all', 'destroy', 'count']
+commands = ['create', 'show', 'update', 'all', 'destroy', 'count', 'near',
+            'search']
 
 
 class HBNBCommand(cmd.Cmd):
@@ -37,9 +31,11 @@ class HBNBCommand(cmd.Cmd):
                     except SyntaxError:
                         pass
                     if isinstance(dictionary, dict):
-                        for key, value in dictionary.items():
-                            line = f"{cls} {instance_id} {key} {value}"
-                            self.do_update(line)
+                        # one write for the whole dictionary
+                        with storage.transaction():
+                            for key, value in dictionary.items():
+                                line = f"{cls} {instance_id} {key} {value}"
+                                self.do_update(line)
                         return line
 
             cls = line.split(".")[0]
@@ -91,13 +87,11 @@ class HBNBCommand(cmd.Cmd):
             elif len(args) < 2:
                 print("** instance id missing **")
             else:
-                instance_id = args[1]
-                objs = models.storage.all()
-                instance_key = "{}.{}".format(class_name, instance_id)
-                if instance_key not in objs:
+                instance = models.storage.get(class_name, args[1])
+                if instance is None:
                     print("** no instance found **")
                 else:
-                    print(objs[instance_key])
+                    print(instance)
 
     def do_destroy(self, line):
         """ Deletes an instance based on the class name and id """
@@ -111,19 +105,19 @@ class HBNBCommand(cmd.Cmd):
             elif len(args) < 2:
                 print("** instance id missing **")
             else:
-                instance_id = args[1]
-                objs = models.storage.all()
-                instance_key = "{}.{}".format(class_name, instance_id)
-                if instance_key not in objs:
+                instance = models.storage.get(class_name, args[1])
+                if instance is None:
                     print("** no instance found **")
                 else:
-                    del models.storage.all()[instance_key]
-                    models.storage.save()
+                    models.storage.delete(instance)
 
     def do_all(self, line):
         """
         Prints all string representation of all instances
         based or not on the class name
+        Usage:  all [<class> [<field>[__<op>]=<value> ...]]
+                <class>.all([<field>[__<op>]=<value>, ...])
+        op is one of eq, ne, lt, le, gt, ge and in
         """
         instance_list = []
         if not line:
@@ -131,12 +125,24 @@ class HBNBCommand(cmd.Cmd):
             instance_list.extend(str(instance) for instance in
                                  models.storage.all().values())
         else:
-            args = line.split()
+            try:
+                args = shlex.split(line)
+            except ValueError:
+                print("** unbalanced quotes **")
+                return False
             class_name = args[0]
             if class_name in classes:
-                for key, value in models.storage.all().items():
-                    if value.__class__.__name__ == class_name:
-                        instance_list.append(str(value))
+                try:
+                    predicates = self.__predicates(class_name, args[1:])
+                except ValueError as error:
+                    print(f"** invalid argument: {error} **")
+                    return False
+                if predicates:
+                    instances = models.storage.query(class_name) \
+                        .filter(**predicates)
+                else:
+                    instances = models.storage.all(class_name).values()
+                instance_list.extend(str(instance) for instance in instances)
             else:
                 print("** class doesn't exist **")
                 return False
@@ -151,7 +157,6 @@ class HBNBCommand(cmd.Cmd):
                 <class>.update(<id>, <attribute_name>, <attribute_value>)
                 <class>.update(<id>, <dictionary>)
         """
-        all_objs = storage.all()
         line_split = shlex.split(line)
         len_line = len(line_split)
 
@@ -166,10 +171,8 @@ class HBNBCommand(cmd.Cmd):
             else:
                 try:
                     cls_id = line_split[1]
-                    key = cls + "." + cls_id
-                    try:
-                        unused = all_objs[key]
-                    except KeyError:
+                    instance = storage.get(cls, cls_id)
+                    if instance is None:
                         print("** no instance found **")
                         return False
                 except IndexError:
@@ -182,28 +185,113 @@ class HBNBCommand(cmd.Cmd):
                     print("** value missing **")
                     return False
 
-        key = cls + "." + cls_id
         if len_line > 2:
             if len_line > 3:
-                setattr(storage.all()[key], line_split[2], line_split[3])
-                storage.all()[key].save()
+                # numbers get the type the class declares for them
+                setattr(instance, line_split[2],
+                        typed(type(instance), *line_split[2:4]))
+                instance.save()
             else:
                 return
 
+    @staticmethod
+    def __predicates(class_name, args):
+        """return the <field>[__<op>]=<value> args as query predicates
+
+        Values are given the type the class declares for the field; the
+        values of __in are separated by commas. Raises ValueError (with
+        the arg as message) for an arg without "=".
+        """
+        cls = classes[class_name]
+        predicates = {}
+        for arg in args:
+            condition, equal, value = arg.partition("=")
+            if not equal or not condition:
+                raise ValueError(arg)
+            field, op = parse(condition)
+            if op == "in":
+                value = [typed(cls, field, item)
+                         for item in value.split(",")]
+            else:
+                value = typed(cls, field, value)
+            predicates[condition] = value
+        return predicates
+
     def default(self, line):
         """Called on an input line when the command prefix is not recognized"""
         pass
 
     def do_count(self, args):
         """Count instances of class"""
-        count = 0
-        all_objs = storage.all()
-        for key in all_objs.keys():
-            key_split = key.split(".")
-            key_cls = key_split[0]
-            if key_cls == args:
-                count = count + 1
-        print(count)
+        print(storage.count(args))
+
+    def do_near(self, line):
+        """Prints the instances of a class near a point, nearest first
+        Usage:  near <class> <latitude> <longitude> <km>
+                near <class> <latitude> <longitude> top=<n>
+                near <class> <south> <west> <north> <east>
+                <class>.near(<latitude>, <longitude>, <km>)
+        The first form lists the instances within km of the point, the
+        second the n nearest ones and the last the ones in a box.
+        """
+        args = line.split()
+        if not args:
+            print("** class name missing **")
+            return False
+        if args[0] not in classes:
+            print("** class doesn't exist **")
+            return False
+        top = [arg for arg in args[1:] if arg.startswith("top=")]
+        try:
+            numbers = [float(arg) for arg in args[1:] if arg not in top]
+            k = int(top[0][4:]) if top else None
+        except ValueError:
+            print("** invalid number **")
+            return False
+        if len(numbers) == 4 and k is None:
+            instances = models.storage.within_box(args[0], *numbers)
+        elif len(numbers) == 3 and k is None:
+            instances = [obj for km, obj in models.storage.within_radius(
+                args[0], *numbers)]
+        elif len(numbers) == 2 and k is not None:
+            instances = [obj for km, obj in models.storage.nearest(
+                args[0], *numbers, k)]
+        elif len(numbers) < 2:
+            print("** coordinates missing **")
+            return False
+        elif len(numbers) == 2:
+            print("** distance missing **")
+            return False
+        else:
+            print("** invalid arguments **")
+            return False
+        print([str(instance) for instance in instances])
+
+    def do_search(self, line):
+        """Prints the instances of a class matching words, best first
+        Usage:  search <class> <words> [top=<n>]
+                <class>.search(<words>)
+        Only the n best instances are printed, 10 by default.
+        """
+        args = line.split()
+        if not args:
+            print("** class name missing **")
+            return False
+        if args[0] not in classes:
+            print("** class doesn't exist **")
+            return False
+        top = [arg for arg in args[1:] if arg.startswith("top=")]
+        words = [arg for arg in args[1:] if arg not in top]
+        try:
+            k = int(top[-1][4:]) if top else 10
+        except ValueError:
+            print("** invalid number **")
+            return False
+        if not words:
+            print("** words missing **")
+            return False
+        found = models.storage.search(args[0], " ".join(words), k)
+        print([str(instance) for score, instance in found])
 
 
 if __name__ == '__main__':
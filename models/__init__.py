@@ -1,12 +1,46 @@
 from models.engine.file_storage import FileStorage
+from models.amenity import Amenity
+from models.base_model import BaseModel
+from models.city import City
+from models.place import Place
+from models.review import Review
+from models.state import State
+from models.user import User
+from os import getenv
 """
 Desc:
     when the application starts or when the models package is imported,
     a single instance of FileStorage is created.
     This instance is then accessible throughout the application.
     This allows different parts of code to use the same storage system.
+    Setting HBNB_TYPE_STORAGE=db selects the SQLite DBStorage instead,
+    with the database file taken from HBNB_DB_PATH (default hbnb.db).
+
+    classes maps every model class name to its class; the storage engines
+    and the console use it to rebuild objects without eval.
+    Setting HBNB_COMPACT_MODELS=1 puts the compact, __slots__ based
+    variant of every class in it instead (see models/compact.py). The
+    model modules keep their regular classes: the objects the storage
+    builds are compact, User() still makes a regular User, and both are
+    saved the same way. Compare types with models.classes["User"], not
+    with the imported class.
+    Setting HBNB_TIME_IDS=1 gives new objects time-ordered (UUIDv7)
+    ids, which sort in creation order; existing ids are kept as they are.
 """
 
+classes = dict(BaseModel=BaseModel, User=User, State=State, City=City,
+               Amenity=Amenity, Place=Place, Review=Review)
+if getenv("HBNB_COMPACT_MODELS"):
+    from models.compact import compact
+    classes = {name: compact(cls) for name, cls in classes.items()}
+if getenv("HBNB_TIME_IDS"):
+    from models import base_model
+    base_model.new_id = base_model.uuid7
+
 
-storage = FileStorage()
+if getenv("HBNB_TYPE_STORAGE") == "db":
+    from models.engine.db_storage import DBStorage
+    storage = DBStorage(getenv("HBNB_DB_PATH", "hbnb.db"))
+else:
+    storage = FileStorage()
 storage.reload()
@@ -1,9 +1,10 @@
 #!/usr/bin/python33
 
 """ This file contains information about amenities """
-from models.base_model import BaseModel
+from models.base_model import BaseModel, Related
 
 
 class Amenity(BaseModel):
     """ Amenity information module """
     name = ""
+    places = Related("Place", "amenity_ids")
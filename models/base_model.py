@@ -1,14 +1,250 @@
 #!/usr/bin/python3
 """This module contains a BaseModel parent class"""
 
-from datetime import datetime
+from datetime import datetime, timedelta
 import models
+import os
+import sys
+import time
 import uuid
 
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+# (quarter hour, offset in microseconds) of the last local UTC offset read
+_offset = [None, 0]
+# the attributes holding ids: id, the foreign keys and the lists of them
+ID_SUFFIXES = ("_id", "_ids")
+# (unix milliseconds, counter) of the last time-ordered id (see uuid7)
+_last_id = [0, 0]
+# the numeric attribute types of each class (see schema)
+_schemas = {}
+
+
+def now():
+    """return the local time in microseconds since 1970-01-01
+
+    It reads the same naive local clock as datetime.now(), without
+    building a datetime. Offset changes happen on quarter hours, so the
+    UTC offset is only looked up again once per quarter hour.
+    """
+    nanoseconds = time.time_ns()
+    seconds = nanoseconds // 1000000000
+    if seconds // 900 != _offset[0]:
+        _offset[:] = [seconds // 900,
+                      time.localtime(seconds).tm_gmtoff * 1000000]
+    return nanoseconds // 1000 + _offset[1]
+
+
+def share(value):
+    """return the shared copy of an id string (or of each id of a list)
+
+    Many objects point at the same parent, so keeping one string per id
+    instead of one per reference saves a 36 character string each time.
+    The copies are interned: an id nothing uses any more is freed.
+    """
+    if type(value) is str:
+        return sys.intern(value)
+    if type(value) is list:
+        return [sys.intern(item) if type(item) is str else item
+                for item in value]
+    return value
+
+
+def uuid7():
+    """return a new time-ordered UUID (version 7)
+
+    The first 48 bits are the Unix time in milliseconds and the other 74
+    a counter starting at a random value each millisecond, so ids created
+    later sort after earlier ones, as UUIDs and as strings, even within
+    one millisecond or if the clock steps back.
+    """
+    milliseconds = time.time_ns() // 1000000
+    if milliseconds <= _last_id[0]:
+        milliseconds, counter = _last_id[0], _last_id[1] + 1
+        if counter >> 74:
+            milliseconds, counter = milliseconds + 1, 0
+    else:
+        # leave the top bit clear so the counter has room to grow
+        counter = int.from_bytes(os.urandom(10), "big") >> 7
+    _last_id[:] = [milliseconds, counter]
+    return uuid.UUID(int=milliseconds << 80 | 7 << 76
+                     | counter >> 62 << 64 | 2 << 62
+                     | counter & (1 << 62) - 1)
+
+
+def id_time(obj_id):
+    """return the Unix time in milliseconds of a uuid7 id, else None"""
+    if obj_id[14:15] != "7":
+        return None
+    try:
+        return int(obj_id[:8] + obj_id[9:13], 16)
+    except ValueError:
+        return None
+
+
+def first_id(milliseconds):
+    """return the smallest uuid7 id string of a Unix time in milliseconds
+
+    Every id created at or after that time sorts at or after it, so a
+    range of creation times is a range of ids.
+    """
+    digits = f"{milliseconds:012x}"
+    return f"{digits[:8]}-{digits[8:]}-7000-8000-000000000000"
+
+
+# the function BaseModel calls for the id of a new object (uuid4 or uuid7)
+new_id = uuid.uuid4
+
+
+def schema(cls):
+    """return {name: int or float} of the numeric class attributes of cls
+
+    The type of an attribute is the type of its class-level default, e.g.
+    Place.number_rooms = 0 makes number_rooms an int.
+    """
+    types = _schemas.get(cls)
+    if types is None:
+        types = _schemas[cls] = {
+            name: type(value) for name, value in cls.defaults().items()
+            if type(value) is int or type(value) is float}
+    return types
+
+
+def foreign_keys(cls):
+    """return the names of the foreign key class attributes of cls
+
+    A foreign key is an attribute named like one (<class>_id, or
+    <class>_ids for a list of ids) with a str or list default.
+    """
+    return [name for name, value in cls.defaults().items()
+            if name.endswith(ID_SUFFIXES) and type(value) in (str, list)]
+
+
+def text_fields(cls):
+    """return the names of the attributes of cls searched as text
+
+    A model lists them in its _searchable class attribute, e.g. Place
+    searches its name and description.
+    """
+    return list(getattr(cls, "_searchable", ()))
+
+
+def coerce(kind, value):
+    """return value as kind (int or float) when it is such a number
+
+    Values that are not numbers, and ints with a fraction, are returned
+    unchanged, so nothing that was stored is ever lost.
+    """
+    if type(value) is kind or type(value) is bool:
+        return value
+    try:
+        if kind is float:
+            return float(value)
+        if isinstance(value, str):
+            try:
+                return int(value)
+            except ValueError:
+                pass
+        number = float(value)
+    except (TypeError, ValueError):
+        return value
+    return int(number) if number.is_integer() else value
+
+
+def typed(cls, name, value):
+    """return value as the type the class cls declares for name"""
+    kind = schema(cls).get(name)
+    return value if kind is None else coerce(kind, value)
+
+
+def to_datetime(value):
+    """return a stored timestamp (micros, ISO text or datetime) as datetime"""
+    if isinstance(value, int):
+        return EPOCH + timedelta(microseconds=value)
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    return value
+
+
+def to_isoformat(value):
+    """return a stored timestamp (micros, ISO text or datetime) as ISO text"""
+    if isinstance(value, str):
+        return value
+    return to_datetime(value).isoformat()
+
+
+class Micros(int):
+    """Microseconds since 1970-01-01 that print like the datetime they are"""
+
+    __slots__ = ()
+
+    def __repr__(self):
+        """return the repr of the datetime"""
+        return repr(to_datetime(self))
+
+
+class Timestamp():
+    """
+    Descriptor of created_at/updated_at
+
+    The instance keeps the timestamp in __dict__ as Micros (microseconds
+    since 1970-01-01, local time like datetime.now()), or as the ISO text
+    it was read from until it changes, and only builds a datetime when the
+    attribute is read.
+    """
+
+    def __set_name__(self, owner, name):
+        """remember the attribute name"""
+        self.name = name
+
+    def __get__(self, obj, owner=None):
+        """return the timestamp of obj as a datetime"""
+        if obj is None:
+            return self
+        try:
+            return to_datetime(obj.__dict__[self.name])
+        except KeyError:
+            raise AttributeError(self.name) from None
+
+    def __set__(self, obj, value):
+        """store a datetime as microseconds, micros and ISO text as is"""
+        if isinstance(value, datetime):
+            value = Micros((value - EPOCH) // MICROSECOND)
+        elif type(value) is int:
+            value = Micros(value)
+        elif not isinstance(value, (Micros, str)):
+            raise TypeError(f"{self.name} must be a datetime, "
+                            f"not {type(value).__name__}")
+        obj.__dict__[self.name] = value
+
+
+class Related():
+    """
+    Descriptor of the objects of another class pointing at an instance
+
+    State.cities = Related("City", "state_id") makes state.cities the list
+    of the cities whose state_id is the id of state, read from the
+    reverse foreign-key index of the storage.
+    """
+
+    def __init__(self, cls_name, field):
+        """Set up the class and the foreign key pointing at the owner"""
+        self.cls_name = cls_name
+        self.field = field
+
+    def __get__(self, obj, owner=None):
+        """return the objects of cls_name whose field holds the id of obj"""
+        if obj is None:
+            return self
+        return models.storage.children(self.cls_name, self.field, obj.id)
+
 
 class BaseModel():
     """This defines all common attributes/methods for other classes"""
 
+    created_at = Timestamp()
+    updated_at = Timestamp()
+
     def __init__(self, *args, **kwargs):
         """Constructor for every new instance"""
         if kwargs:
@@ -17,27 +253,73 @@ class BaseModel():
                     continue
                 elif key == "created_at" or key == "updated_at":
                     setattr(self, key, datetime.fromisoformat(value))
+                elif key == "id" or key.endswith(ID_SUFFIXES):
+                    setattr(self, key, share(value))
                 else:
                     setattr(self, key, value)
         else:
-            self.id = str(uuid.uuid4())
-            self.created_at = datetime.now()
-            self.updated_at = datetime.now()
+            self.id = share(str(new_id()))
+            self.created_at = now()
+            self.updated_at = now()
             models.storage.new(self)
 
+    @classmethod
+    def defaults(cls):
+        """return the class-level default of every declared attribute"""
+        defaults = {}
+        for klass in reversed(cls.__mro__):
+            for name, value in vars(klass).items():
+                # skip private names, methods and other descriptors
+                if not name.startswith("_") and not hasattr(value, "__get__"):
+                    defaults[name] = value
+        return defaults
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build an instance from a to_dict() dict without running __init__
+
+        This is the bulk-loading path of the storage engines: the attributes
+        are put in __dict__ directly (the timestamps as they were read, see
+        Timestamp, the ids shared, see share, the numbers typed, see
+        schema) and the instance is not registered.
+        """
+        obj = cls.__new__(cls)
+        attributes = obj.__dict__
+        for name, value in data.items():
+            if name == "id" or name.endswith(ID_SUFFIXES):
+                attributes[name] = share(value)
+            elif name != "__class__":
+                attributes[name] = value
+        for name, kind in schema(cls).items():
+            value = attributes.get(name)
+            if value is not None and type(value) is not kind:
+                attributes[name] = coerce(kind, value)
+        return obj
+
+    def __setattr__(self, name, value):
+        """Mark the instance dirty in storage and set an attribute"""
+        models.storage.touch(self)
+        super().__setattr__(name, value)
+        # again: a write between the two calls may have saved the old value
+        models.storage.touch(self)
+
     def __str__(self):
         """String repr of a BaseModel instance"""
-        return f"[{self.__class__.__name__}] ({self.id}) {self.__dict__}"
+        attributes = self.__dict__.copy()
+        for name in ("created_at", "updated_at"):
+            if name in attributes:
+                attributes[name] = to_datetime(attributes[name])
+        return f"[{self.__class__.__name__}] ({self.id}) {attributes}"
 
     def save(self):
         """Update the updated_at attr"""
-        self.updated_at = datetime.now()
+        self.updated_at = now()
         models.storage.save()
 
     def to_dict(self):
         """returns a dict containing keys/values of __dict__ of the instance"""
         new_dict = self.__dict__.copy()
         new_dict["__class__"] = self.__class__.__name__
-        new_dict["created_at"] = self.created_at.isoformat()
-        new_dict["updated_at"] = self.updated_at.isoformat()
+        new_dict["created_at"] = to_isoformat(new_dict["created_at"])
+        new_dict["updated_at"] = to_isoformat(new_dict["updated_at"])
         return new_dict
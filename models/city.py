@@ -1,10 +1,11 @@
 #!/usr/bin/python3
 
 """ This file contains the city information """
-from models.base_model import BaseModel
+from models.base_model import BaseModel, Related
 
 
 class City(BaseModel):
     """ This contains the city module """
     state_id = ""
     name = ""
+    places = Related("Place", "city_id")
@@ -0,0 +1,141 @@
+#!/usr/bin/python3
+"""
+This module builds compact, __slots__ based variants of the model classes
+
+A compact class has the name, attributes and methods of the class it is
+built from, but its instances have no __dict__: the id, the timestamps
+and every attribute declared on the class live in __slots__, and the
+attributes added at runtime (like the ones set by the console update
+command) go to a small overflow dict that only exists once needed.
+Compact classes are not subclasses of the class they are built from, so
+isinstance(obj, User) is False for a compact User; models.classes holds
+the classes the storage builds objects with.
+"""
+
+from models.base_model import ID_SUFFIXES, BaseModel, Related, coerce
+from models.base_model import schema, share
+from models.base_model import to_datetime
+import models
+
+
+class CompactModel():
+    """Common attributes/methods of the compact model classes"""
+
+    __slots__ = ("_extra",)
+    _fields = frozenset()
+    _defaults = {}
+
+    __init__ = BaseModel.__init__
+    __str__ = BaseModel.__str__
+    save = BaseModel.save
+    to_dict = BaseModel.to_dict
+
+    @classmethod
+    def defaults(cls):
+        """return the class-level default of every declared attribute"""
+        return dict(cls._defaults)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build an instance from a to_dict() dict without running __init__"""
+        obj = cls.__new__(cls)
+        extra = {}
+        types = schema(cls)
+        for name, value in data.items():
+            if name == "__class__":
+                continue
+            if name == "created_at" or name == "updated_at":
+                value = to_datetime(value)
+            elif name == "id" or name.endswith(ID_SUFFIXES):
+                value = share(value)
+            elif name in types and type(value) is not types[name]:
+                value = coerce(types[name], value)
+            if name in cls._fields:
+                object.__setattr__(obj, name, value)
+            else:
+                extra[name] = value
+        if extra:
+            object.__setattr__(obj, "_extra", extra)
+        return obj
+
+    def __setattr__(self, name, value):
+        """Mark the instance dirty in storage and set an attribute"""
+        models.storage.touch(self)
+        if name == "created_at" or name == "updated_at":
+            # compact instances keep their timestamps as datetimes
+            value = to_datetime(value)
+        if name in type(self)._fields or name == "__dict__":
+            object.__setattr__(self, name, value)
+        else:
+            extra = self._extra
+            if extra is None:
+                extra = {}
+                object.__setattr__(self, "_extra", extra)
+            extra[name] = value
+        # again: a write between the two calls may have saved the old value
+        models.storage.touch(self)
+
+    def __getattr__(self, name):
+        """Look up the overflow dict, then the declared class defaults"""
+        if name == "_extra":
+            return None
+        extra = self._extra
+        if extra is not None and name in extra:
+            return extra[name]
+        if name not in type(self)._defaults:
+            raise AttributeError(f"'{type(self).__name__}' object has no "
+                                 f"attribute '{name}'")
+        value = type(self)._defaults[name]
+        if isinstance(value, (list, dict)):
+            # never hand out the shared mutable default itself
+            value = value.copy()
+            object.__setattr__(self, name, value)
+        return value
+
+    @property
+    def __dict__(self):
+        """return the attributes of the instance as a new dict"""
+        attributes = {}
+        for name in type(self).__slots__:
+            try:
+                attributes[name] = object.__getattribute__(self, name)
+            except AttributeError:
+                pass
+        if self._extra:
+            attributes.update(self._extra)
+        return attributes
+
+    @__dict__.setter
+    def __dict__(self, attributes):
+        """replace every attribute of the instance by the given ones"""
+        for name in type(self).__slots__:
+            try:
+                object.__delattr__(self, name)
+            except AttributeError:
+                pass
+        extra = {}
+        for name, value in attributes.items():
+            if name in type(self)._fields:
+                object.__setattr__(self, name, value)
+            else:
+                extra[name] = value
+        object.__setattr__(self, "_extra", extra or None)
+
+
+def compact(cls):
+    """return the compact variant of the model class cls"""
+    defaults = cls.defaults()
+    fields = ("id", "created_at", "updated_at") + tuple(defaults)
+    # the relationship accessors (state.cities...) are kept as they are
+    related = {name: value for klass in reversed(cls.__mro__)
+               for name, value in vars(klass).items()
+               if isinstance(value, Related)}
+    return type(cls.__name__, (CompactModel,), {
+        "__slots__": fields,
+        "__doc__": cls.__doc__,
+        "__module__": cls.__module__,
+        "_fields": frozenset(fields),
+        "_defaults": defaults,
+        "_searchable": getattr(cls, "_searchable", ()),
+        **related,
+    })
@@ -0,0 +1,131 @@
+#!/usr/bin/python3
+"""
+This module contains the Columns class, a columnar copy of the numeric
+attributes of the objects of one class
+
+Every attribute is kept for all objects in one contiguous array of
+doubles (row i of every array belongs to ids[i]), so a filter on them is
+a scan over a buffer instead of a loop over the objects. The scans run
+with NumPy when it is installed and with C-level map()/compress() over
+the arrays otherwise.
+"""
+
+from array import array
+from itertools import compress
+import math
+import operator
+from models.base_model import schema
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# the method of the bound value that tests "row <op> value"
+reflected = {"lt": "__gt__", "le": "__ge__", "gt": "__lt__",
+             "ge": "__le__", "eq": "__eq__", "ne": "__ne__"}
+
+
+def numeric_fields(cls):
+    """return the names of the int and float class attributes of cls"""
+    return list(schema(cls))
+
+
+def number(value):
+    """return value as a float, NaN when it is not a number"""
+    if type(value) is int or type(value) is float:
+        return float(value)
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return math.nan
+
+
+class Columns():
+    """
+    The numeric attributes of the objects of one class, one array each
+
+    put() adds or refreshes the row of an object and discard() removes
+    it; rows are kept packed by moving the last row into a removed one.
+    Values that are not numbers are stored as NaN, which no comparison
+    but "ne" matches.
+    """
+
+    def __init__(self, fields):
+        """Set up one empty array per field"""
+        self.fields = tuple(fields)
+        self.ids = []
+        self.stale = set()
+        self.__rows = {}
+        self.__arrays = {name: array("d") for name in self.fields}
+
+    def __len__(self):
+        """return the number of rows"""
+        return len(self.ids)
+
+    def put(self, obj_id, obj):
+        """store the current values of obj in the row of obj_id"""
+        row = self.__rows.get(obj_id)
+        if row is None:
+            self.__rows[obj_id] = len(self.ids)
+            self.ids.append(obj_id)
+            for name, column in self.__arrays.items():
+                column.append(number(getattr(obj, name, None)))
+        else:
+            for name, column in self.__arrays.items():
+                column[row] = number(getattr(obj, name, None))
+
+    def discard(self, obj_id):
+        """remove the row of obj_id, if any"""
+        row = self.__rows.pop(obj_id, None)
+        if row is None:
+            return
+        last = self.ids.pop()
+        for column in self.__arrays.values():
+            value = column.pop()
+            if last != obj_id:
+                column[row] = value
+        if last != obj_id:
+            self.ids[row] = last
+            self.__rows[last] = row
+
+    def column(self, name):
+        """return a copy of the values of field name, in row order"""
+        return array("d", self.__arrays[name])
+
+    def select(self, **conditions):
+        """return the ids of the rows matching every condition
+
+        Conditions are written <field>__<op>=value with op one of lt, le,
+        gt, ge, eq and ne, e.g. select(price_by_night__lt=100,
+        number_rooms__ge=2).
+        """
+        tests = []
+        for condition, value in conditions.items():
+            name, _, op = condition.rpartition("__")
+            if name not in self.__arrays or op not in reflected:
+                raise ValueError(f"unknown condition {condition}")
+            tests.append((self.__arrays[name], op, float(value)))
+        if not self.ids:
+            return []
+        if numpy is not None:
+            rows = self.__numpy_rows(tests)
+        else:
+            rows = range(len(self.ids))
+            for column, op, value in tests:
+                test = getattr(value, reflected[op])
+                if isinstance(rows, range):
+                    rows = list(compress(rows, map(test, column)))
+                else:
+                    rows = list(compress(rows, map(
+                        test, map(column.__getitem__, rows))))
+        return [self.ids[row] for row in rows]
+
+    def __numpy_rows(self, tests):
+        """return the matching rows, the arrays scanned with NumPy"""
+        mask = numpy.ones(len(self.ids), dtype=bool)
+        for column, op, value in tests:
+            # a view on the array's own buffer, dropped before returning
+            values = numpy.frombuffer(column, dtype=numpy.float64)
+            mask &= getattr(operator, op)(values, value)
+            del values
+        return numpy.flatnonzero(mask).tolist()
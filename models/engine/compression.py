@@ -0,0 +1,133 @@
+#!/usr/bin/python3
+"""
+This module contains the compressed file streams FileStorage can use
+
+Storage files can be written through gzip, lzma or zlib. Both ways are
+streams: a file is compressed while it is written and decompressed as it
+is read, a chunk at a time, so neither side ever holds the whole
+uncompressed file. reading() recognizes the codec of a file from its
+first bytes, plain files included.
+"""
+
+from contextlib import contextmanager
+import gzip
+import io
+import lzma
+import zlib
+
+# the size of the compressed reads of a zlib stream
+CHUNK = 1 << 16
+LZMA_MAGIC = b"\xfd7zXZ\x00"
+GZIP_MAGIC = b"\x1f\x8b"
+# the errors a corrupt or truncated compressed file raises
+errors = (EOFError, gzip.BadGzipFile, lzma.LZMAError, zlib.error)
+
+
+class ZlibWriter(io.BufferedIOBase):
+    """Compresses what is written to it into a binary file as zlib"""
+
+    def __init__(self, raw, level=None):
+        """Set up the compressor, raw is left open by close()"""
+        self.__raw = raw
+        self.__compressor = zlib.compressobj(-1 if level is None else level)
+
+    def writable(self):
+        """return True, this is a write-only stream"""
+        return True
+
+    def write(self, data):
+        """compress data into the file"""
+        self.__raw.write(self.__compressor.compress(data))
+        return len(data)
+
+    def close(self):
+        """write the end of the zlib stream"""
+        if not self.closed:
+            self.__raw.write(self.__compressor.flush())
+        super().close()
+
+
+class ZlibReader(io.RawIOBase):
+    """Decompresses a zlib binary file as it is read"""
+
+    def __init__(self, raw):
+        """Set up the decompressor, raw is left open by close()"""
+        self.__raw = raw
+        self.__decompressor = zlib.decompressobj()
+
+    def readable(self):
+        """return True, this is a read-only stream"""
+        return True
+
+    def readinto(self, buffer):
+        """decompress at most len(buffer) bytes into buffer"""
+        decompressor = self.__decompressor
+        while not decompressor.eof:
+            data = decompressor.unconsumed_tail or self.__raw.read(CHUNK)
+            if not data:
+                raise EOFError("zlib stream ended before its end marker")
+            data = decompressor.decompress(data, len(buffer))
+            if data:
+                buffer[:len(data)] = data
+                return len(data)
+        return 0
+
+
+writers = {
+    "gzip": lambda raw, level: gzip.GzipFile(
+        filename="", mode="wb", fileobj=raw, mtime=0,
+        compresslevel=6 if level is None else level),
+    "lzma": lambda raw, level: lzma.LZMAFile(raw, "wb", preset=level),
+    "zlib": ZlibWriter,
+}
+readers = {
+    "gzip": lambda raw: gzip.GzipFile(mode="rb", fileobj=raw),
+    "lzma": lambda raw: lzma.LZMAFile(raw, "rb"),
+    "zlib": lambda raw: io.BufferedReader(ZlibReader(raw)),
+}
+
+
+def detect(raw):
+    """return the codec of the binary file raw (None when plain)"""
+    head = raw.peek(len(LZMA_MAGIC))[:len(LZMA_MAGIC)]
+    if head.startswith(GZIP_MAGIC):
+        return "gzip"
+    if head.startswith(LZMA_MAGIC):
+        return "lzma"
+    # a zlib header: deflate method and a check making it a multiple of 31
+    if len(head) >= 2 and head[0] & 0x0F == 8 and head[0] >> 4 <= 7 \
+            and (head[0] << 8 | head[1]) % 31 == 0:
+        return "zlib"
+    return None
+
+
+@contextmanager
+def reading(path):
+    """open path as a binary stream, decompressed if it is compressed"""
+    with open(path, "rb") as raw:
+        codec = detect(raw)
+        stream = raw if codec is None else readers[codec](raw)
+        try:
+            yield stream
+        finally:
+            if stream is not raw:
+                stream.close()
+
+
+@contextmanager
+def writing(raw, codec=None, level=None, text=False):
+    """write through codec into the open binary file raw
+
+    The stream is text (UTF-8) when text is true. raw is left open, so
+    the caller can fsync it once the end of the stream is written.
+    """
+    stream = raw if codec is None else writers[codec](raw, level)
+    file = io.TextIOWrapper(stream, encoding="utf-8") if text else stream
+    try:
+        yield file
+    finally:
+        if text:
+            file.flush()
+            file.detach()
+        if stream is not raw:
+            stream.close()
@@ -0,0 +1,332 @@
+#!/usr/bin/python3
+"""This module contains the DBStorage class"""
+
+import json
+import models
+import sqlite3
+from contextlib import contextmanager
+from models.base_model import text_fields
+from models.engine.query import Query
+from models.engine.references import parents
+from models.engine.spatial import point, scan_box, scan_nearest
+from models.engine.spatial import scan_radius
+from models.engine.text import TextIndex
+
+foreign_keys = ("state_id", "city_id", "place_id", "user_id")
+
+
+class DBStorage():
+    """
+    This class stores instances in a SQLite database, one table per class
+
+    Every class attribute declared on a model gets its own column, foreign
+    key columns are indexed, and attributes added at runtime are kept as
+    JSON in the extra column. Rows are only read when objects are asked
+    for, and save() only writes the rows of objects that changed; until
+    then, all(), get() and count() see the objects created and deleted
+    since the last save as if they were written.
+
+    The spatial queries (within_box(), within_radius(), nearest()) look
+    at the latitude and longitude of every object of the class, and
+    search() indexes the text of every object of the class for the query.
+
+    Inside a transaction() (or batch()) block, the rows are written in one
+    commit when the block exits; if the block raises, the objects it
+    created, changed or deleted are put back the way they were.
+    """
+
+    def __init__(self, db_path="hbnb.db"):
+        """Set up the database path, the connection is opened by reload"""
+        self.__db_path = db_path
+        self.__conn = None
+        self.__objects = {}
+        self.__dirty = set()
+        self.__columns = {}
+        self.__stats = {"encoded": 0}
+        self.__depth = 0
+        self.__undo = {}
+        self.__deferred = False
+
+    def __table_columns(self, cls):
+        """return the column names of the table of cls"""
+        columns = ["id", "created_at", "updated_at"]
+        columns += [name for name in cls.defaults() if name not in columns]
+        return columns + ["extra"]
+
+    def reload(self):
+        """Open the database and create the tables if they are missing"""
+        if self.__conn is None:
+            self.__conn = sqlite3.connect(self.__db_path)
+        for name, cls in models.classes.items():
+            columns = self.__table_columns(cls)
+            self.__columns[name] = columns
+            self.__conn.execute(
+                f'CREATE TABLE IF NOT EXISTS "{name}" (id TEXT PRIMARY KEY, '
+                + ", ".join(columns[1:]) + ")")
+            for column in columns:
+                if column in foreign_keys:
+                    self.__conn.execute(
+                        f'CREATE INDEX IF NOT EXISTS "{name}_{column}" '
+                        f'ON "{name}" ({column})')
+        self.__conn.commit()
+
+    def close(self):
+        """Write pending changes and close the database"""
+        if self.__conn is not None:
+            self.save()
+            self.__conn.close()
+            self.__conn = None
+
+    def __select(self, name):
+        """return the SELECT statement reading the columns of class name"""
+        return f'SELECT {", ".join(self.__columns[name])} FROM "{name}"'
+
+    def __from_row(self, name, row):
+        """return the object stored in row, reusing the loaded instance"""
+        key = f"{name}.{row[0]}"
+        if key in self.__objects:
+            return self.__objects[key]
+        kwargs = json.loads(row[-1]) if row[-1] else {}
+        for column, value in zip(self.__columns[name][:-1], row[:-1]):
+            if value is not None:
+                kwargs[column] = value
+        obj = models.classes[name].from_dict(kwargs)
+        self.__objects[key] = obj
+        return obj
+
+    def __to_row(self, name, obj):
+        """return the column values of obj for the table of class name"""
+        values = obj.to_dict()
+        del values["__class__"]
+        row = []
+        for column in self.__columns[name][:-1]:
+            value = values.get(column)
+            if isinstance(value, (str, int, float)) or value is None:
+                row.append(values.pop(column, None))
+            else:
+                row.append(None)
+        row.append(json.dumps(values) if values else None)
+        return row
+
+    def __class_names(self, cls):
+        """return the table names to look at for cls (all when None)"""
+        if cls is None:
+            return list(models.classes)
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        return [cls] if cls in models.classes else []
+
+    def all(self, cls=None):
+        """return a dict of all objects, or only the objects of class cls"""
+        names = self.__class_names(cls)
+        objects = {}
+        deleted = self.__deleted()
+        for name in names:
+            for row in self.__conn.execute(self.__select(name)):
+                if f"{name}.{row[0]}" not in deleted:
+                    objects[f"{name}.{row[0]}"] = self.__from_row(name, row)
+            # objects created since the last save are not in the table yet
+            for key in self.__dirty:
+                if key.startswith(name + ".") and key in self.__objects:
+                    objects[key] = self.__objects[key]
+        return objects
+
+    def get(self, cls, obj_id):
+        """return the object of class cls with id obj_id, or None"""
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        if cls not in models.classes:
+            return None
+        key = f"{cls}.{obj_id}"
+        if key in self.__objects:
+            return self.__objects[key]
+        if key in self.__dirty:
+            # deleted since the last save
+            return None
+        row = self.__conn.execute(self.__select(cls) + " WHERE id = ?",
+                                  (obj_id,)).fetchone()
+        return None if row is None else self.__from_row(cls, row)
+
+    def children(self, cls, field, parent_id):
+        """return the objects of cls whose foreign key field is parent_id"""
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        if cls not in models.classes:
+            return []
+        if field in foreign_keys and field in self.__columns[cls]:
+            # an indexed column
+            deleted = self.__deleted()
+            objects = {f"{cls}.{row[0]}": self.__from_row(cls, row)
+                       for row in self.__conn.execute(
+                           self.__select(cls) + f" WHERE {field} = ?",
+                           (parent_id,))
+                       if f"{cls}.{row[0]}" not in deleted}
+        else:
+            objects = self.all(cls)
+        # objects changed since the last save may no longer match their row
+        for key in self.__dirty:
+            if key.startswith(cls + ".") and key in self.__objects:
+                objects[key] = self.__objects[key]
+        return [obj for obj in objects.values()
+                if parent_id in parents(getattr(obj, field, None))]
+
+    def __points(self, cls):
+        """return the objects of cls by id and the (id, point) of each"""
+        objects = {obj.id: obj for obj in self.all(cls).values()}
+        points = [(obj_id, point(obj)) for obj_id, obj in objects.items()]
+        return objects, [item for item in points if item[1] is not None]
+
+    def within_box(self, cls, south, west, north, east):
+        """return the objects of cls in a latitude/longitude box"""
+        objects, points = self.__points(cls)
+        return [objects[obj_id]
+                for obj_id in scan_box(points, south, west, north, east)]
+
+    def within_radius(self, cls, latitude, longitude, km):
+        """return the (km, obj) of cls within km of a point, by distance"""
+        objects, points = self.__points(cls)
+        return [(away, objects[obj_id]) for away, obj_id
+                in scan_radius(points, latitude, longitude, km)]
+
+    def nearest(self, cls, latitude, longitude, k=1):
+        """return the (km, obj) of the k objects of cls nearest a point"""
+        objects, points = self.__points(cls)
+        return [(away, objects[obj_id]) for away, obj_id
+                in scan_nearest(points, latitude, longitude, k)]
+
+    def search(self, cls, text, k=10):
+        """return the (score, obj) of the k objects of cls matching text"""
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        if cls not in models.classes:
+            return []
+        objects = {obj.id: obj for obj in self.all(cls).values()}
+        index = TextIndex(text_fields(models.classes[cls]))
+        for obj_id, obj in objects.items():
+            index.put(obj_id, obj)
+        return [(score, objects[obj_id])
+                for score, obj_id in index.search(text, k)]
+
+    def query(self, cls):
+        """return a Query of the objects of cls, see models/engine/query"""
+        return Query(self, cls)
+
+    def count(self, cls=None):
+        """return the number of objects, or of objects of class cls"""
+        total = 0
+        for name in self.__class_names(cls):
+            total += self.__conn.execute(
+                f'SELECT COUNT(*) FROM "{name}"').fetchone()[0]
+            # objects created or deleted since the last save, not written
+            pending = {key.split(".", 1)[1]: key in self.__objects
+                       for key in self.__dirty if key.startswith(name + ".")}
+            stored = self.__stored(name, pending)
+            for obj_id, present in pending.items():
+                total += present - (obj_id in stored)
+        return total
+
+    def __stored(self, name, ids):
+        """return the ids among ids that have a row in the table of name"""
+        ids = list(ids)
+        stored = set()
+        # below the limit of SQLite on the number of parameters
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            stored.update(row[0] for row in self.__conn.execute(
+                f'SELECT id FROM "{name}" WHERE id IN '
+                f'({", ".join("?" * len(chunk))})', chunk))
+        return stored
+
+    def __deleted(self):
+        """return the keys deleted since the last save, not written yet"""
+        return {key for key in self.__dirty if key not in self.__objects}
+
+    def new(self, obj):
+        """adds object to the current session"""
+        key = f"{obj.__class__.__name__}.{obj.id}"
+        self.__remember(key)
+        self.__objects[key] = obj
+        self.__dirty.add(key)
+
+    def touch(self, obj):
+        """marks a loaded object as about to change since the last save"""
+        key = f"{obj.__class__.__name__}.{getattr(obj, 'id', None)}"
+        if key in self.__objects:
+            self.__remember(key)
+            self.__dirty.add(key)
+
+    def __remember(self, key):
+        """keep the state of key before the current transaction changes it"""
+        if self.__depth and key not in self.__undo:
+            obj = self.__objects.get(key)
+            self.__undo[key] = None if obj is None \
+                else (obj, obj.__dict__.copy())
+
+    @contextmanager
+    def transaction(self):
+        """defer saves to the end of the block, undo it if it raises"""
+        self.__depth += 1
+        if self.__depth == 1:
+            self.__undo = {}
+            self.__deferred = False
+        try:
+            yield self
+        except BaseException:
+            self.__depth -= 1
+            if not self.__depth:
+                self.__rollback()
+            raise
+        self.__depth -= 1
+        if not self.__depth and self.__deferred:
+            self.save()
+
+    batch = transaction
+
+    def __rollback(self):
+        """put back the objects changed by the failed transaction"""
+        for key, state in self.__undo.items():
+            if state is None:
+                self.__objects.pop(key, None)
+                self.__dirty.discard(key)
+            else:
+                obj, attributes = state
+                object.__setattr__(obj, "__dict__", attributes)
+                self.__objects[key] = obj
+        self.__undo = {}
+
+    def stats(self):
+        """return counters about the last save"""
+        return dict(self.__stats)
+
+    def save(self):
+        """writes the rows of the objects changed since the last save"""
+        if self.__depth:
+            self.__deferred = True
+            return
+
+        encoded = 0
+        for key in self.__dirty:
+            name, obj_id = key.split(".", 1)
+            obj = self.__objects.get(key)
+            if obj is None:
+                self.__conn.execute(f'DELETE FROM "{name}" WHERE id = ?',
+                                    (obj_id,))
+                continue
+            columns = self.__columns[name]
+            self.__conn.execute(
+                f'INSERT OR REPLACE INTO "{name}" ({", ".join(columns)}) '
+                f'VALUES ({", ".join("?" * len(columns))})',
+                self.__to_row(name, obj))
+            encoded += 1
+        self.__conn.commit()
+        self.__dirty.clear()
+        self.__stats["encoded"] = encoded
+
+    def delete(self, obj=None):
+        """Delete obj from the database if it's inside"""
+        if obj is not None:
+            key = f"{obj.__class__.__name__}.{obj.id}"
+            self.__remember(key)
+            self.__objects.pop(key, None)
+            self.__dirty.add(key)
+            self.save()
@@ -1,29 +1,262 @@
 #!/usr/bin/python3
 """This module contains the FileStorage class"""
 
+import atexit
 import json
 import models
 import os
-from models.amenity import Amenity
-from models.base_model import BaseModel
-from models.city import City
-from models.place import Place
-from models.review import Review
-from models.state import State
-from models.user import User
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from models.base_model import foreign_keys, schema, share
+from models.base_model import text_fields
+from models.engine.columns import Columns, numeric_fields
+from models.engine import compression as codecs
+from models.engine.query import Query
+from models.engine.ranges import Ranges
+from models.engine.references import References
+from models.engine.spatial import Grid
+from models.engine.text import TextIndex
+from models.engine.serializers import detect, open_text, serializers
 
 
 class FileStorage():
     """
     This class serializes instances to a JSON file
     and deserializes JSON file to instances
+
+    A class name -> {id: obj} index is kept next to __objects so that
+    all(cls) and count(cls) only touch the objects of that class.
+
+    Objects report their own changes through touch(), so save() only
+    re-encodes dirty objects and reuses the cached JSON fragment of the
+    others. reload() keeps the text of every record it reads as that
+    fragment, so the first save after it only encodes what changed, and
+    stats() counts the fragments reused and encoded.
+
+    Inside a transaction() (or batch()) block, save() only records that a
+    write is due and the block writes once when it exits; if the block
+    raises, the objects it created, changed or deleted are put back the
+    way they were. flush() and the write-behind thread do not write while
+    a block is open either.
+
+    With flush_interval (milliseconds) set, save() only marks the store as
+    pending and a background thread writes it at most once per interval.
+    flush() writes right away, close() stops the thread after a last
+    flush, and close() also runs at interpreter exit.
+
+    The file is never rewritten in place: a snapshot is written to a
+    temporary file, fsync'ed and renamed over the old one, so a crash
+    leaves either the old or the new file. fsync=False skips the fsync
+    calls, and group_commit=True lets the saves requested by other threads
+    while a write is in progress share the next write and fsync. stats()
+    reports how many fsyncs ran and how long they took.
+
+    With sharded=True, every class is stored in its own file next to
+    file_path (file.json -> file.User.json), or in `buckets` files per
+    class picked by a hash of the id (file.User.0.json, ...). save() only
+    rewrites the shards holding dirty objects, and reload(classes) can
+    load the shards of some classes only; the shards of a class that was
+    not loaded are read before save() rewrites them.
+
+    With lazy=True, reload() only keeps the text (or bytes) every object
+    was read from, and decodes it and builds the instance the first time
+    it is asked for, through all(), all(cls) or get(). count() and save()
+    work on that text without building anything.
+
+    serializer picks the file format: "json" (the default, the original
+    file.json layout) or "binary" (see models/engine/serializers.py).
+    reload() recognizes either format whatever the serializer is.
+
+    compression ("gzip", "lzma" or "zlib", at compresslevel) compresses
+    the files as they are written; reload() decompresses them as it
+    reads them, whatever the compression of the storage is. The log of
+    log mode is never compressed.
+
+    columns(cls) returns a columnar copy of the numeric attributes of the
+    objects of cls (see models/engine/columns.py), built on first use and
+    then kept in step with new(), delete(), reload() and the attributes
+    set since, for scans like columns(Place).select(price_by_night__lt=100,
+    number_rooms__ge=2). references(cls) is the reverse index of the
+    foreign keys of cls (see models/engine/references.py), kept the same
+    way; children() reads it, for accessors like state.cities. ranges(cls,
+    field) is the sorted index of a numeric attribute of cls (see
+    models/engine/ranges.py), kept the same way too. query(cls) reads
+    objects by predicates and uses these indexes, or get(), when it can
+    (see models/engine/query.py).
+
+    grid(cls) is the spatial index of the latitude and longitude of the
+    objects of cls (see models/engine/spatial.py), kept the same way, and
+    within_box(), within_radius() and nearest() answer from it.
+
+    text(cls) is the full-text index of the searchable attributes of cls
+    (see models/engine/text.py), kept the same way, and search() ranks
+    the objects matching some words from it. With persist_text=True, the
+    text indexes are written next to file_path (file.json.Review.text) by
+    close(), which then also runs at interpreter exit, and read back on
+    first use instead of being built again; the text of every object is
+    checked against the file, so objects changed in between are indexed
+    again.
+
+    In log mode, every new/save/delete appends one record per changed
+    object to a write-ahead log (<file_path>.log) instead of rewriting the
+    whole file. reload() replays the snapshot and then the log, and the log
+    is folded back into the snapshot by compact().
     """
     __file_path = "file.json"
     __objects = {}
+    __by_class = {}
+    __dirty = set()
+    __fragments = {}
+    __raw = {}
+    # the classes whose shards have been read, see __write_shards
+    __loaded = set()
+    # kind -> {class name -> index}, see __refreshed
+    __indexes = {"columns": {}, "references": {}, "grid": {}, "ranges": {},
+                 "text": {}}
+    __lock = threading.RLock()
+
+    def __init__(self, file_path=None, log_mode=False, compact_after=1000,
+                 flush_interval=None, fsync=True, group_commit=False,
+                 sharded=False, buckets=1, lazy=False, serializer="json",
+                 compression=None, compresslevel=None, persist_text=False):
+        """Set up the storage file, the write-ahead log and write-behind"""
+        if sharded and log_mode:
+            raise ValueError("sharded storage has no write-ahead log")
+        if file_path is not None:
+            self.__file_path = file_path
+        self.__log_path = self.__file_path + ".log"
+        self.__log_mode = log_mode
+        self.__compact_after = compact_after
+        self.__log_records = 0
+        self.__sharded = sharded
+        self.__buckets = buckets
+        self.__lazy = lazy
+        self.__serializer = serializers[serializer]()
+        if compression is not None and compression not in codecs.writers:
+            raise ValueError(f"unknown compression {compression}")
+        self.__compression = compression
+        self.__compresslevel = compresslevel
+        self.__stats = {"encoded": 0, "writes": 0, "fsyncs": 0,
+                        "fsync_ms": 0.0, "fsync_total_ms": 0.0,
+                        "fragment_hits": 0, "fragment_misses": 0}
+        self.__fsync = fsync
+        self.__group_commit = group_commit
+        self.__commit = threading.Condition()
+        self.__committing = False
+        self.__next_group = 1
+        self.__durable_group = 0
+        self.__flush_interval = flush_interval
+        self.__flusher = None
+        self.__wake = threading.Event()
+        self.__closing = threading.Event()
+        self.__pending = False
+        self.__depth = 0
+        self.__undo = {}
+        self.__deferred = False
+        self.__persist_text = persist_text
+        if persist_text:
+            atexit.register(self.close)
+
+    def all(self, cls=None):
+        """return the __objects dict, or only the objects of class cls"""
+        if cls is None:
+            for cls_name in list(type(self).__raw):
+                self.__materialize(cls_name)
+            return self.__class__.__objects
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        self.__materialize(cls)
+        return {f"{cls}.{obj_id}": obj for obj_id, obj
+                in type(self).__by_class.get(cls, {}).items()}
+
+    def get(self, cls, obj_id):
+        """return the object of class cls with id obj_id, or None"""
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        self.__materialize(cls, obj_id)
+        return type(self).__by_class.get(cls, {}).get(obj_id)
+
+    def count(self, cls=None):
+        """return the number of objects, or of objects of class cls"""
+        raw = type(self).__raw
+        if cls is None:
+            return len(self.__class__.__objects) + \
+                sum(len(records) for records in raw.values())
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        return len(type(self).__by_class.get(cls, {})) + \
+            len(raw.get(cls, {}))
+
+    def query(self, cls):
+        """return a Query of the objects of cls, see models/engine/query"""
+        return Query(self, cls)
+
+    def __materialize(self, cls_name, obj_id=None):
+        """build the raw records of a class (or of one id) into objects
+
+        It all happens under the lock, and each record leaves __raw only
+        once its object is in __objects, so a write never misses one.
+        """
+        if not type(self).__raw.get(cls_name):
+            return
+        objects = type(self).__objects
+        cls = models.classes[cls_name]
+        with type(self).__lock:
+            records = type(self).__raw.get(cls_name, {})
+            if obj_id is None:
+                ids = list(records)
+            elif obj_id in records:
+                ids = [obj_id]
+            else:
+                return
+            for obj_id in ids:
+                key = f"{cls_name}.{obj_id}"
+                record = self.__record(records[obj_id])
+                obj = cls.from_dict(record)
+                if not self.__as_read(obj, record):
+                    # the fragment no longer matches the object
+                    self.__forget(key)
+                objects[key] = obj
+                self.__index(key, obj)
+                del records[obj_id]
+            if not records:
+                type(self).__raw.pop(cls_name, None)
 
-    def all(self):
-        """return the __objects dict"""
-        return self.__class__.__objects
+    def __stash(self, key, record):
+        """keep record as the raw, not yet built, state of key
+
+        record is the to_dict() of the object, or the (format, fragment)
+        it was read from, decoded when it is built (see __record).
+        """
+        cls_name, obj_id = key.split(".", 1)
+        if type(self).__objects.pop(key, None) is not None:
+            self.__index(key, None)
+        self.__forget(key)
+        type(self).__raw.setdefault(cls_name, {})[obj_id] = record
+
+    @staticmethod
+    def __record(raw):
+        """return the to_dict() record of a raw state kept by __stash"""
+        if isinstance(raw, tuple):
+            name, fragment = raw
+            return serializers[name]().decode(fragment)
+        return raw
+
+    @staticmethod
+    def __as_read(obj, record):
+        """return True if from_dict() kept the numbers of record as read
+
+        A number read as text ("120") is typed by from_dict(), and then
+        the text read can no longer be written back as the object.
+        """
+        return all(getattr(obj, name, None) is record[name]
+                   for name in schema(type(obj)) if name in record)
+
+    def stats(self):
+        """return counters about the last save"""
+        return dict(self.__stats)
 
     def new(self, obj):
         """adds object to __objects dictionary"""
@@ -31,36 +264,623 @@ class FileStorage():
             return
 
         key = f"{obj.__class__.__name__}.{obj.id}"
-        self.__class__.__objects[key] = obj
+        self.__materialize(obj.__class__.__name__, obj.id)
+        with type(self).__lock:
+            self.__remember(key)
+            self.__class__.__objects[key] = obj
+            self.__index(key, obj)
+            type(self).__dirty.add(key)
+
+    def __index(self, key, obj):
+        """add obj to the per-class index, None removes key from it"""
+        cls_name, obj_id = key.split(".", 1)
+        if obj is None:
+            type(self).__by_class.get(cls_name, {}).pop(obj_id, None)
+        else:
+            # the id string of the object itself rather than a copy
+            obj_id = share(obj_id)
+            type(self).__by_class.setdefault(cls_name, {})[obj_id] = obj
+        self.__stale(cls_name, obj_id)
+
+    def __stale(self, cls_name, obj_id):
+        """mark the rows of obj_id in the indexes of its class out of date"""
+        for indexes in type(self).__indexes.values():
+            index = indexes.get(cls_name)
+            if index is not None:
+                index.stale.add(obj_id)
+
+    def __refreshed(self, kind, cls, build):
+        """return the up to date index of a kind of the objects of cls
+
+        The index is built by build(cls) and filled on first use, then
+        only the rows marked stale since (see __stale) are refreshed.
+        """
+        cls = self.__name(cls)
+        self.__materialize(cls)
+        with type(self).__lock:
+            objects = type(self).__by_class.get(cls, {})
+            indexes = type(self).__indexes[kind]
+            index = indexes.get(cls)
+            if index is None:
+                index = indexes[cls] = build(models.classes[cls])
+                index.stale.update(objects)
+            # rows of objects added, changed or removed since the last call
+            for obj_id in index.stale:
+                obj = objects.get(obj_id)
+                if obj is None:
+                    index.discard(obj_id)
+                else:
+                    index.put(obj_id, obj)
+            index.stale.clear()
+        return index
+
+    def columns(self, cls):
+        """return the up to date Columns of the numeric attributes of cls"""
+        return self.__refreshed("columns", cls,
+                                lambda cls: Columns(numeric_fields(cls)))
+
+    def ranges(self, cls, field):
+        """return the up to date Ranges of cls, with field sorted"""
+        cls = self.__name(cls)
+        with type(self).__lock:
+            ranges = type(self).__indexes["ranges"].get(cls)
+            objects = type(self).__by_class.get(cls, {})
+            if ranges is not None and len(ranges.stale) * 32 > len(objects):
+                # sorting again is cheaper than moving many rows one by one
+                ranges.reset()
+            ranges = self.__refreshed(
+                "ranges", cls, lambda cls: Ranges(numeric_fields(cls)))
+            if not ranges.built(field):
+                ranges.build(field,
+                             type(self).__by_class.get(cls, {}).items())
+        return ranges
+
+    def references(self, cls):
+        """return the up to date References of the foreign keys of cls"""
+        return self.__refreshed("references", cls,
+                                lambda cls: References(foreign_keys(cls)))
+
+    def grid(self, cls="Place"):
+        """return the up to date spatial Grid of the objects of cls"""
+        return self.__refreshed("grid", cls, lambda cls: Grid())
+
+    def within_box(self, cls, south, west, north, east):
+        """return the objects of cls in a latitude/longitude box"""
+        objects = type(self).__by_class.get(self.__name(cls), {})
+        return [objects[obj_id] for obj_id
+                in self.grid(cls).box(south, west, north, east)]
+
+    def within_radius(self, cls, latitude, longitude, km):
+        """return the (km, obj) of cls within km of a point, by distance"""
+        found = self.grid(cls).radius(latitude, longitude, km)
+        return self.__objects_of(cls, found)
+
+    def nearest(self, cls, latitude, longitude, k=1):
+        """return the (km, obj) of the k objects of cls nearest a point"""
+        found = self.grid(cls).nearest(latitude, longitude, k)
+        return self.__objects_of(cls, found)
+
+    def __objects_of(self, cls, found):
+        """return the (km or score, id) pairs found with objects for ids"""
+        objects = type(self).__by_class.get(self.__name(cls), {})
+        return [(away, objects[obj_id]) for away, obj_id in found]
+
+    def text(self, cls):
+        """return the up to date TextIndex of the searchable fields of cls"""
+        return self.__refreshed("text", cls, self.__text_index)
+
+    def __text_index(self, cls):
+        """return a new TextIndex of cls, read from its file if persisted"""
+        fields = text_fields(cls)
+        if self.__persist_text:
+            try:
+                with open(self.__text_path(cls.__name__), "rb") as file:
+                    index = TextIndex.load(file)
+                if list(index.fields) == fields:
+                    return index
+            except (OSError, ValueError):
+                # no file yet or an unreadable one, built from the objects
+                pass
+        return TextIndex(fields)
+
+    def __text_path(self, cls_name):
+        """return the path of the file of the text index of a class"""
+        return f"{self.__file_path}.{cls_name}.text"
+
+    def search(self, cls, text, k=10):
+        """return the (score, obj) of the k objects of cls matching text"""
+        return self.__objects_of(cls, self.text(cls).search(text, k))
+
+    def __write_text(self):
+        """write the text indexes changed since they were read"""
+        with type(self).__lock:
+            for cls_name in list(type(self).__indexes["text"]):
+                index = self.text(cls_name)
+                if not index.changed:
+                    continue
+                path = self.__text_path(cls_name)
+                with open(path + ".tmp", "wb") as file:
+                    index.dump(file)
+                    self.__sync(file)
+                self.__replace(path + ".tmp", path)
+
+    @staticmethod
+    def __name(cls):
+        """return the name of a class given by name or as a class"""
+        return cls if isinstance(cls, str) else cls.__name__
+
+    def children(self, cls, field, parent_id):
+        """return the objects of cls whose foreign key field is parent_id"""
+        ids = self.references(cls).ids(field, parent_id)
+        objects = type(self).__by_class.get(self.__name(cls), {})
+        return [objects[obj_id] for obj_id in ids]
+
+    def touch(self, obj):
+        """marks a stored object as about to change since the last save"""
+        key = f"{obj.__class__.__name__}.{getattr(obj, 'id', None)}"
+        if key in type(self).__objects:
+            with type(self).__lock:
+                self.__remember(key)
+                type(self).__dirty.add(key)
+                self.__stale(obj.__class__.__name__, obj.id)
+
+    def __remember(self, key):
+        """keep the state of key before the current transaction changes it"""
+        if self.__depth and key not in self.__undo:
+            obj = type(self).__objects.get(key)
+            self.__undo[key] = None if obj is None \
+                else (obj, obj.__dict__.copy())
+
+    @contextmanager
+    def transaction(self):
+        """defer saves to the end of the block, undo it if it raises"""
+        # under the lock, so that no write sees half of the block
+        with type(self).__lock:
+            self.__depth += 1
+            if self.__depth == 1:
+                self.__undo = {}
+                self.__deferred = False
+        try:
+            yield self
+        except BaseException:
+            with type(self).__lock:
+                self.__depth -= 1
+                if not self.__depth:
+                    self.__rollback()
+            raise
+        with type(self).__lock:
+            self.__depth -= 1
+        if not self.__depth and self.__deferred:
+            self.save()
+
+    batch = transaction
+
+    def __rollback(self):
+        """put back the objects changed by the failed transaction"""
+        objects = type(self).__objects
+        for key, state in self.__undo.items():
+            if state is None:
+                objects.pop(key, None)
+                self.__index(key, None)
+            else:
+                obj, attributes = state
+                object.__setattr__(obj, "__dict__", attributes)
+                objects[key] = obj
+                self.__index(key, obj)
+        self.__undo = {}
 
     def save(self):
         """serializes __objects to the JSON file (path: __file_path)"""
-        serializable_objects = {}
+        if self.__depth:
+            self.__deferred = True
+            return
+
+        if self.__flush_interval is not None:
+            self.__pending = True
+            if self.__flusher is None:
+                self.__flusher = threading.Thread(target=self.__flush_loop,
+                                                  daemon=True)
+                self.__flusher.start()
+                atexit.register(self.close)
+            self.__wake.set()
+            return
+        self.flush()
 
-        # __objects contain instances of BaseModel, make them serializable
-        for key, value in self.__class__.__objects.items():
-            serializable_objects[key] = value.to_dict()
+    def flush(self):
+        """writes every pending change to disk now"""
+        if not self.__group_commit:
+            self.__flush()
+            return
 
-        with open(self.__class__.__file_path, "w") as file:
-            json.dump(serializable_objects, file)
+        with self.__commit:
+            # saves made while a write runs are covered by the next one
+            group = self.__next_group
+            while self.__committing:
+                self.__commit.wait()
+                if self.__durable_group >= group:
+                    return
+            self.__committing = True
+            self.__next_group += 1
+        try:
+            self.__flush()
+        finally:
+            with self.__commit:
+                self.__durable_group = group
+                self.__committing = False
+                self.__commit.notify_all()
 
-    def reload(self):
-        """Deserialize JSON file to objects dict, if it exists"""
-        if os.path.exists(self.__class__.__file_path):
-            try:
-                with open(self.__class__.__file_path) as file:
-                    for obj in json.load(file).values():
-                        # dynamically creates a class obj with it's name
-                        # use **unpacking op to unpack remaining keys & values
-                        # as args for the new object and add it to __objects
-                        self.new(eval(obj["__class__"])(**obj))
-            except (FileNotFoundError, json.decoder.JSONDecodeError):
+    def __flush(self):
+        """write the snapshot or the log, whichever the mode uses"""
+        with type(self).__lock:
+            if self.__depth:
+                # a transaction is open: the end of the block writes it
+                self.__deferred = True
                 return
+            self.__pending = False
+            if self.__log_mode:
+                self.__append_log()
+            elif self.__sharded:
+                self.__write_shards()
+            else:
+                self.__write_snapshot()
+
+    def __sync(self, file):
+        """fsync file (when enabled) and record how long it took"""
+        if not self.__fsync:
+            return
+        file.flush()
+        start = time.perf_counter()
+        os.fsync(file.fileno())
+        elapsed = (time.perf_counter() - start) * 1000
+        self.__stats["fsyncs"] += 1
+        self.__stats["fsync_ms"] = elapsed
+        self.__stats["fsync_total_ms"] += elapsed
+
+    def __replace(self, tmp_path, path):
+        """atomically rename tmp_path to path and persist the rename"""
+        os.replace(tmp_path, path)
+        if not self.__fsync:
+            return
+        try:
+            fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+        except OSError:
+            # directories cannot be opened on every platform
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+    def close(self):
+        """stops the write-behind thread and writes what is still pending"""
+        if self.__flusher is not None:
+            self.__closing.set()
+            self.__wake.set()
+            self.__flusher.join()
+            self.__flusher = None
+            self.__closing.clear()
+            atexit.unregister(self.close)
+        if self.__pending:
+            self.flush()
+        if self.__persist_text:
+            self.__write_text()
+            atexit.unregister(self.close)
+
+    def __flush_loop(self):
+        """write-behind thread: flush, then wait out the interval"""
+        while True:
+            self.__wake.wait()
+            if self.__closing.is_set():
+                return
+            self.__wake.clear()
+            self.flush()
+            self.__closing.wait(self.__flush_interval / 1000)
+
+    def __write_snapshot(self):
+        """rewrites the JSON file from __objects"""
+        self.__drop_fragments()
+        items = self.__class__.__objects.items()
+        if type(self).__raw:
+            items = list(items) + [
+                (f"{cls_name}.{obj_id}", record) for cls_name, records
+                in type(self).__raw.items() for obj_id, record
+                in records.items()]
+        self.__write_file(self.__file_path, items)
+        type(self).__dirty.clear()
+
+    def __shard(self, key):
+        """return the name of the shard that stores key"""
+        cls_name, obj_id = key.split(".", 1)
+        if self.__buckets == 1:
+            return cls_name
+        bucket = zlib.crc32(obj_id.encode()) % self.__buckets
+        return f"{cls_name}.{bucket}"
+
+    def __shard_path(self, shard):
+        """return the path of the file of a shard"""
+        base, ext = os.path.splitext(self.__file_path)
+        return f"{base}.{shard}{ext}"
+
+    def __write_shards(self):
+        """rewrites the shard files that hold a dirty object"""
+        self.__drop_fragments()
+        shards = {self.__shard(key) for key in type(self).__dirty}
+        loaded = type(self).__loaded
+        for cls_name in {shard.split(".")[0] for shard in shards} - loaded:
+            # never read (reload(classes) skipped it): what the shards of
+            # the class hold is read first, or rewriting them would drop it
+            skip = type(self).__dirty.union(
+                f"{cls_name}.{obj_id}" for obj_id in self.__ids_of(cls_name))
+            for shard, path in self.__shards([cls_name]):
+                self.__read(path, skip)
+            loaded.add(cls_name)
+        stale = []
+        for cls_name in {shard.split(".")[0] for shard in shards}:
+            layout = {cls_name} if self.__buckets == 1 else {
+                f"{cls_name}.{bucket}" for bucket in range(self.__buckets)}
+            old = [path for shard, path in self.__shards([cls_name])
+                   if shard not in layout]
+            if old:
+                # written with other buckets: every shard of the class is
+                # written again and the old files removed, or a reload
+                # would bring back what they still hold
+                stale += old
+                shards.update(self.__shard(f"{cls_name}.{obj_id}")
+                              for obj_id in self.__ids_of(cls_name))
+        for shard in shards:
+            cls_name = shard.split(".")[0]
+            items = ((f"{cls_name}.{obj_id}", obj) for obj_id, obj
+                     in list(type(self).__by_class.get(cls_name, {}).items())
+                     + list(type(self).__raw.get(cls_name, {}).items()))
+            if self.__buckets > 1:
+                items = ((key, obj) for key, obj in items
+                         if self.__shard(key) == shard)
+            self.__write_file(self.__shard_path(shard), items)
+        for path in stale:
+            os.remove(path)
+        type(self).__dirty.clear()
+
+    def __ids_of(self, cls_name):
+        """return the ids of the objects of a class, built or not"""
+        return list(type(self).__by_class.get(cls_name, {})) \
+            + list(type(self).__raw.get(cls_name, {}))
+
+    def __forget(self, key):
+        """drop the cached fragments of key, in every format"""
+        for fragments in type(self).__fragments.values():
+            fragments.pop(key, None)
+
+    def __drop_fragments(self):
+        """forget the fragments of deleted objects before a write"""
+        self.__stats["encoded"] = 0
+        for key in type(self).__dirty:
+            if key not in type(self).__objects:
+                self.__forget(key)
+
+    def __write_file(self, path, items):
+        """atomically writes the (key, obj) items to path"""
+        serializer = self.__serializer
+        dirty = type(self).__dirty
+        fragments = type(self).__fragments.setdefault(serializer.name, {})
+
+        # only dirty objects are re-encoded, the rest reuse their fragment
+        parts = []
+        for key, value in items:
+            if key in dirty or key not in fragments:
+                # raw records of a lazy storage are not built into objects
+                if not isinstance(value, (dict, tuple)):
+                    value = value.to_dict()
+                value = self.__record(value)
+                self.__forget(key)
+                fragments[key] = serializer.encode(value)
+                self.__stats["encoded"] += 1
+                self.__stats["fragment_misses"] += 1
+            else:
+                self.__stats["fragment_hits"] += 1
+            parts.append((key, fragments[key]))
+
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as raw:
+            with codecs.writing(raw, self.__compression, self.__compresslevel,
+                                not serializer.binary) as file:
+                serializer.write(file, parts)
+            self.__sync(raw)
+        self.__replace(tmp_path, path)
+        self.__stats["writes"] += 1
+
+    def compact(self):
+        """Fold the write-ahead log into the snapshot and truncate it"""
+        with type(self).__lock:
+            self.__append_log(compacting=True)
+            self.__write_snapshot()
+            if os.path.exists(self.__log_path):
+                os.remove(self.__log_path)
+            self.__log_records = 0
+
+    def __append_log(self, compacting=False):
+        """Append one record per dirty object to the write-ahead log"""
+        objects = type(self).__objects
+        dirty = type(self).__dirty
+        if dirty:
+            encode = serializers["json"]().encode
+            fragments = type(self).__fragments.setdefault("json", {})
+            with open(self.__log_path, "a") as file:
+                for key in dirty:
+                    obj = objects.get(key)
+                    self.__forget(key)
+                    if obj is None:
+                        fragment = "null"
+                    else:
+                        # the snapshot written by compact() reuses it
+                        fragment = fragments[key] = encode(obj.to_dict())
+                    file.write(f'{{"key": {json.dumps(key)}, '
+                               f'"value": {fragment}}}\n')
+                    self.__stats["fragment_misses"] += 1
+                self.__sync(file)
+            self.__log_records += len(dirty)
+            self.__stats["encoded"] = len(dirty)
+            self.__stats["writes"] += 1
+            dirty.clear()
+
+        # a log longer than the data it describes is cheaper to rewrite
+        if not compacting and self.__log_records >= self.__compact_after \
+                and self.__log_records > len(objects):
+            self.compact()
+
+    def reload(self, classes=None):
+        """Deserialize JSON file to objects dict, if it exists
+
+        classes (names or classes) restricts a sharded storage to the
+        shards of these classes
+        """
+        # __objects may have been changed behind our back, re-index it
+        type(self).__by_class.clear()
+        for indexes in type(self).__indexes.values():
+            indexes.clear()
+        for key, obj in type(self).__objects.items():
+            self.__index(key, obj)
+
+        if self.__sharded:
+            paths = self.__shard_paths(classes)
+            loaded = type(self).__loaded
+            if classes is None:
+                loaded.clear()
+                loaded.update(shard.split(".")[0]
+                              for shard, path in self.__shards())
+            else:
+                # a class with no object left in memory is not loaded
+                loaded.difference_update([
+                    cls_name for cls_name in loaded
+                    if not type(self).__by_class.get(cls_name)
+                    and not type(self).__raw.get(cls_name)])
+                loaded.update(cls if isinstance(cls, str) else cls.__name__
+                              for cls in classes)
+        else:
+            paths = [self.__file_path]
+        for path in paths:
+            self.__read(path)
+        if self.__log_mode:
+            self.__replay_log()
+            type(self).__dirty.clear()
+
+    def __read(self, path, skip=()):
+        """load the records of the file at path, except the keys in skip"""
+        if not os.path.exists(path):
+            return
+        try:
+            with codecs.reading(path) as stream:
+                reader = detect(stream)
+                fragments = type(self).__fragments.setdefault(
+                    reader.name, {})
+                records = reader.scan(open_text(stream, reader))
+                if skip:
+                    records = (item for item in records
+                               if item[0] not in skip)
+                if self.__lazy:
+                    with type(self).__lock:
+                        for key, record, fragment in records:
+                            if fragment is None:
+                                self.__stash(key, record)
+                                continue
+                            # only the text is kept, not the record
+                            self.__stash(key, (reader.name, fragment))
+                            fragments[key] = fragment
+                else:
+                    self.__load(records, fragments)
+        except (FileNotFoundError, ValueError) + codecs.errors:
+            # records are loaded as they are read, so a file that is
+            # corrupt half way keeps the records that came before; the
+            # other files (and the log) are still read
+            pass
+
+    def __load(self, records, fragments):
+        """bulk-add the objects of (key, to_dict(), fragment) records"""
+        objects = type(self).__objects
+        registry = models.classes
+        with type(self).__lock:
+            for key, record, fragment in records:
+                # look the class up by name and skip __init__ entirely
+                obj = registry[record["__class__"]].from_dict(record)
+                self.__remember(key)
+                objects[key] = obj
+                self.__index(key, obj)
+                self.__forget(key)
+                if fragment is not None and self.__as_read(obj, record):
+                    fragments[key] = fragment
+
+    def __shard_paths(self, classes=None):
+        """return the paths of the existing shards of the given classes"""
+        return [path for shard, path in self.__shards(classes)]
+
+    def __shards(self, classes=None):
+        """return the (shard, path) of the existing shards of classes"""
+        if classes is not None:
+            classes = {cls if isinstance(cls, str) else cls.__name__
+                       for cls in classes}
+        base, ext = os.path.splitext(self.__file_path)
+        directory, prefix = os.path.split(base)
+        prefix += "."
+        shards = []
+        for name in sorted(os.listdir(directory or ".")):
+            if not name.startswith(prefix) or not name.endswith(ext):
+                continue
+            shard = name[len(prefix):len(name) - len(ext)]
+            if not shard or classes is not None \
+                    and shard.split(".")[0] not in classes:
+                continue
+            shards.append((shard, os.path.join(directory, name)))
+        return shards
+
+    def __replay_log(self):
+        """Apply the write-ahead log records on top of the snapshot"""
+        if not os.path.exists(self.__log_path):
+            return
+        objects = type(self).__objects
+        self.__log_records = 0
+        # the end of the last whole record
+        good = 0
+        with open(self.__log_path, "rb") as file:
+            for line in file:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("record without its newline")
+                    record = json.loads(line)
+                except ValueError:
+                    # torn record from a crash mid-append, nothing follows it
+                    break
+                good += len(line)
+                self.__log_records += 1
+                key = record["key"]
+                value = record["value"]
+                self.__forget(key)
+                if value is None:
+                    objects.pop(key, None)
+                    self.__index(key, None)
+                    cls_name, obj_id = key.split(".", 1)
+                    type(self).__raw.get(cls_name, {}).pop(obj_id, None)
+                elif self.__lazy:
+                    self.__stash(key, value)
+                else:
+                    objects[key] = \
+                        models.classes[value["__class__"]].from_dict(value)
+                    self.__index(key, objects[key])
+            torn = file.tell() != good
+        if torn:
+            # the next record would be appended to the torn one
+            with open(self.__log_path, "r+b") as file:
+                file.truncate(good)
+                self.__sync(file)
 
     def delete(self, obj=None):
         """Delete obj from __objects if it's inside"""
         if obj is not None:
             key = f"{obj.__class__.__name__}.{obj.id}"
             if key in type(self).__objects:
-                del type(self).__objects[key]
+                with type(self).__lock:
+                    self.__remember(key)
+                    del type(self).__objects[key]
+                    self.__index(key, None)
+                    type(self).__dirty.add(key)
                 self.save()
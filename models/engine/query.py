@@ -0,0 +1,316 @@
+#!/usr/bin/python3
+"""
+This module contains the Query class, the predicate read API of storage
+
+storage.query(cls).filter(**predicates).order_by(*fields).limit(n) reads
+the objects of one class. Predicates are written <field>=value or
+<field>__<op>=value with op one of eq, ne, lt, le, gt, ge and in, e.g.
+filter(price_by_night__lt=100, city_id=city.id). search(words) keeps the
+objects whose text uses some of the words, best match first.
+
+Before reading, the query picks the cheapest way to get its candidates
+from what the storage offers, in this order:
+
+    text         a search() ranks the objects using its words through the
+                 full-text index of the storage (search(), see
+                 models/engine/text.py), reading more of them as needed
+    id           an id predicate is a single get()
+    foreign key  an equality on a foreign key (state_id...) reads the
+                 reverse index of the storage, see children(); on a list
+                 of ids (amenity_ids) it matches the lists holding it
+    range        a numeric order_by() with a limit(), or numeric predicates
+                 matching at most an eighth of the objects, read a range
+                 of the sorted index of one field (FileStorage.ranges(),
+                 see models/engine/ranges.py), in order
+    columns      numeric predicates scan the columnar store of the class
+                 (FileStorage.columns(), see models/engine/columns.py)
+    scan         every object of the class, through the class index
+
+The predicates the chosen path does not cover are checked on each
+candidate. explain() describes the plan without running it.
+"""
+
+import heapq
+import math
+import operator
+from itertools import islice
+from models.base_model import ID_SUFFIXES, foreign_keys, schema
+from models.engine.columns import number
+from models.engine.ranges import bounds
+from models.engine.references import parents
+import models
+
+# the comparisons a predicate can use, applied as op(attribute, value)
+operators = {"eq": operator.eq, "ne": operator.ne, "lt": operator.lt,
+             "le": operator.le, "gt": operator.gt, "ge": operator.ge,
+             "in": lambda value, values: value in values}
+# the value of an attribute an object does not have
+MISSING = object()
+
+
+def parse(condition):
+    """return the (field, op) of a <field>[__<op>] predicate name"""
+    field, _, op = condition.rpartition("__")
+    if not field or op not in operators:
+        return condition, "eq"
+    return field, op
+
+
+def matches(obj, predicates):
+    """return True if obj satisfies every (field, op, value) predicate"""
+    for field, op, value in predicates:
+        attribute = getattr(obj, field, MISSING)
+        if attribute is MISSING:
+            return False
+        if op == "eq" and type(attribute) is list \
+                and field.endswith(ID_SUFFIXES):
+            # a list of ids (amenity_ids) matches the ids it holds, as on
+            # the foreign key path
+            if value not in parents(attribute):
+                return False
+            continue
+        try:
+            if not operators[op](attribute, value):
+                return False
+        except TypeError:
+            # values of different types (e.g. "many" < 3) never match
+            return False
+    return True
+
+
+def sort_key(fields, reverse=False, numeric=()):
+    """return a key function sorting on fields, missing values last
+
+    reverse tells the key the sort is descending, so that missing values
+    still come last. The values of the numeric fields that are not
+    numbers (e.g. "many") come last too, in the order they are met, as
+    the range index yields them.
+    """
+    def key(obj):
+        values = []
+        for field in fields:
+            value = getattr(obj, field, None)
+            if field in numeric:
+                value = number(value)
+                last = math.isnan(value)
+                if last:
+                    value = 0.0
+            else:
+                last = value is None
+            values.append((last != reverse, value))
+        return values
+    return key
+
+
+def interval(low, low_open, high, high_open):
+    """return the bounds of a range as text, e.g. [50.0, 100.0)"""
+    start = "(-inf" if low is None else ("(" if low_open else "[") + str(low)
+    end = "inf)" if high is None else str(high) + (")" if high_open else "]")
+    return f"{start}, {end}"
+
+
+class Query():
+    """
+    A lazy read of the objects of one class of a storage
+
+    filter(), order_by() and limit() return a new Query; the objects are
+    only read by all(), first(), count() or iterating over the query.
+    """
+
+    def __init__(self, storage, cls, predicates=(), order=(), size=None,
+                 text=None):
+        """Set up a query of the objects of cls (a class or its name)"""
+        self.storage = storage
+        self.cls = cls if isinstance(cls, str) else cls.__name__
+        self.predicates = tuple(predicates)
+        self.order = tuple(order)
+        self.size = size
+        self.text = text
+
+    def __copy(self, **changes):
+        """return a copy of the query with some attributes changed"""
+        attributes = dict(predicates=self.predicates, order=self.order,
+                          size=self.size, text=self.text)
+        attributes.update(changes)
+        return Query(self.storage, self.cls, **attributes)
+
+    def filter(self, **predicates):
+        """return the query restricted to the objects matching predicates"""
+        parsed = []
+        for condition, value in predicates.items():
+            field, op = parse(condition)
+            if op == "in":
+                value = frozenset(value)
+            parsed.append((field, op, value))
+        return self.__copy(predicates=self.predicates + tuple(parsed))
+
+    def search(self, text):
+        """return the query restricted to the objects matching text"""
+        return self.__copy(text=text)
+
+    def order_by(self, *fields):
+        """return the query sorted on fields, "-field" sorts descending"""
+        return self.__copy(order=self.order + fields)
+
+    def limit(self, size):
+        """return the query stopped after size objects"""
+        return self.__copy(size=size)
+
+    def plan(self):
+        """return (path, details, candidates, remaining, ordered)
+
+        candidates is a function returning an iterable of the objects the
+        path selects, remaining are the predicates still to be checked and
+        ordered tells whether the candidates come in the order_by() order.
+        """
+        storage = self.storage
+        cls = self.cls
+        if self.text is not None:
+            # without an order_by() the best matches come first
+            return ("text", f"{cls} matching {self.text!r}", self.__matching,
+                    self.predicates, not self.order)
+        for index, (field, op, value) in enumerate(self.predicates):
+            if field == "id" and op == "eq":
+                rest = self.predicates[:index] + self.predicates[index + 1:]
+                return ("id", f"{cls}.{value}", lambda: filter(
+                    None, [storage.get(cls, value)]), rest, False)
+        keys = foreign_keys(models.classes[cls]) \
+            if cls in models.classes else []
+        for index, (field, op, value) in enumerate(self.predicates):
+            if field in keys and op == "eq" and type(value) is str:
+                rest = self.predicates[:index] + self.predicates[index + 1:]
+                return ("foreign key", f"{cls}.{field} = {value}",
+                        lambda: storage.children(cls, field, value), rest,
+                        False)
+        types = schema(models.classes[cls]) \
+            if cls in models.classes else {}
+        numeric = {}
+        ranged = {}
+        rest = []
+        for field, op, value in self.predicates:
+            if field in types and op != "in" and type(value) in (int, float):
+                if f"{field}__{op}" in numeric:
+                    # select() takes one condition per field and op
+                    rest.append((field, op, value))
+                else:
+                    numeric[f"{field}__{op}"] = value
+                if op != "ne":
+                    ranged.setdefault(field, []).append((field, op, value))
+            else:
+                rest.append((field, op, value))
+        if hasattr(storage, "ranges"):
+            order = self.order[0] if len(self.order) == 1 else ""
+            if order.lstrip("-") in types and self.size is not None:
+                # read in order and stop after size objects, no sorting
+                return self.__range(order.lstrip("-"), ranged,
+                                    order.startswith("-"))
+            narrowest = None
+            for field, conditions in ranged.items():
+                size = storage.ranges(cls, field).count(field, *bounds(
+                    (op, value) for name, op, value in conditions))
+                if narrowest is None or size < narrowest[0]:
+                    narrowest = (size, field)
+            if narrowest is not None \
+                    and narrowest[0] * 8 <= storage.count(cls):
+                return self.__range(narrowest[1], ranged,
+                                    order == "-" + narrowest[1])
+        if numeric and hasattr(storage, "columns"):
+            def candidates():
+                """return the objects of the rows matching numeric"""
+                ids = storage.columns(cls).select(**numeric)
+                return filter(None, (storage.get(cls, obj_id)
+                                     for obj_id in ids))
+            return ("columns", ", ".join(numeric), candidates, tuple(rest),
+                    False)
+        return ("scan", cls, lambda: storage.all(cls).values(),
+                self.predicates, False)
+
+    def __range(self, field, ranged, reverse):
+        """return the plan reading the sorted index of field"""
+        storage = self.storage
+        cls = self.cls
+        used = ranged.get(field, [])
+        limits = bounds((op, value) for name, op, value in used)
+        details = f"{cls}.{field} in {interval(*limits)}"
+        if reverse:
+            details += " descending"
+
+        def candidates():
+            """return the objects of the range, in the order of field"""
+            ids = storage.ranges(cls, field).ids(field, *limits, reverse)
+            return filter(None, (storage.get(cls, obj_id) for obj_id in ids))
+        rest = tuple(predicate for predicate in self.predicates
+                     if predicate not in used)
+        ordered = len(self.order) == 1 and self.order[0].lstrip("-") == field
+        return "range", details, candidates, rest, ordered
+
+    def __matching(self):
+        """yield the objects matching the text of the query, best first"""
+        # the first size matches, and more when filters drop some of them
+        k = None if self.order else self.size
+        read = 0
+        while True:
+            found = self.storage.search(self.cls, self.text, k)
+            for score, obj in found[read:]:
+                yield obj
+            if not k or len(found) < k:
+                return
+            read = k
+            k *= 4
+
+    def explain(self):
+        """return how the query would run, one step per line"""
+        path, details, candidates, rest, ordered = self.plan()
+        steps = [f"{path}: {details}"]
+        if rest:
+            steps.append("filter: " + ", ".join(
+                f"{field}__{op}" for field, op, value in rest))
+        if self.order and not ordered:
+            steps.append("order by: " + ", ".join(self.order))
+        if self.size is not None:
+            steps.append(f"limit: {self.size}")
+        return "\n".join(steps)
+
+    def __iter__(self):
+        """yield the objects of the query"""
+        path, details, candidates, rest, ordered = self.plan()
+        objects = candidates()
+        if rest:
+            objects = (obj for obj in objects if matches(obj, rest))
+        if self.order and not ordered:
+            objects = self.__sorted(objects)
+        if self.size is not None:
+            objects = islice(objects, self.size)
+        return iter(objects)
+
+    def __sorted(self, objects):
+        """return the objects in the order of order_by()"""
+        fields = [field.lstrip("-") for field in self.order]
+        descending = [field.startswith("-") for field in self.order]
+        numeric = schema(models.classes[self.cls]) \
+            if self.cls in models.classes else {}
+        if len(set(descending)) == 1:
+            key = sort_key(fields, descending[0], numeric)
+            if self.size is not None:
+                # only the first size objects are ever needed
+                pick = heapq.nlargest if descending[0] else heapq.nsmallest
+                return pick(self.size, objects, key=key)
+            return sorted(objects, key=key, reverse=descending[0])
+        objects = list(objects)
+        # mixed directions: one stable sort per field, the last one first
+        for field, reverse in reversed(list(zip(fields, descending))):
+            objects.sort(key=sort_key([field], reverse, numeric),
+                         reverse=reverse)
+        return objects
+
+    def all(self):
+        """return the list of the objects of the query"""
+        return list(self)
+
+    def first(self):
+        """return the first object of the query, or None"""
+        return next(iter(self.limit(1)), None)
+
+    def count(self):
+        """return the number of objects of the query"""
+        return sum(1 for obj in self)
@@ -0,0 +1,152 @@
+#!/usr/bin/python3
+"""
+This module contains the Ranges class, the sorted index of the numeric
+attributes of the objects of one class
+
+Every field indexed keeps its values in one sorted array of doubles with
+the ids of the objects next to them, so a range of values is found by
+bisection and read in order, and the cheapest or largest n objects are
+the first n of it. Fields are only sorted once something asks for them.
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+import math
+from models.engine.columns import number
+
+
+def bounds(conditions):
+    """return the (low, low_open, high, high_open) of (op, value) pairs
+
+    op is one of lt, le, gt, ge and eq; None is an open end.
+    """
+    low = high = None
+    low_open = high_open = False
+    for op, value in conditions:
+        value = float(value)
+        if op in ("gt", "ge", "eq"):
+            if low is None or value > low or value == low and op == "gt":
+                low, low_open = value, op == "gt"
+        if op in ("lt", "le", "eq"):
+            if high is None or value < high or value == high and op == "lt":
+                high, high_open = value, op == "lt"
+    return low, low_open, high, high_open
+
+
+class Ranges():
+    """
+    The sorted values of the numeric attributes of the objects of a class
+
+    build() sorts a field, then put() and discard() keep its order as
+    objects are added, changed or removed. Objects whose value is not a
+    number are kept apart: ranges never match them and ordered reads of
+    the whole field give them last.
+    """
+
+    def __init__(self, fields):
+        """Set up the index of fields, none of them sorted yet"""
+        self.fields = tuple(fields)
+        self.stale = set()
+        self.__keys = {}
+        self.__ids = {}
+        self.__values = {}
+        self.__others = {}
+
+    def built(self, name):
+        """return True if field name is sorted"""
+        return name in self.__keys
+
+    def build(self, name, objects):
+        """sort field name of the (id, obj) objects"""
+        if name not in self.fields:
+            raise ValueError(f"{name} is not a numeric field")
+        values = {}
+        others = {}
+        for obj_id, obj in objects:
+            value = number(getattr(obj, name, None))
+            if math.isnan(value):
+                others[obj_id] = None
+            else:
+                values[obj_id] = value
+        pairs = sorted(zip(values.values(), values))
+        self.__keys[name] = array("d", [value for value, obj_id in pairs])
+        self.__ids[name] = [obj_id for value, obj_id in pairs]
+        self.__values[name] = values
+        self.__others[name] = others
+
+    def reset(self):
+        """forget the order of every field, to sort them again"""
+        for index in (self.__keys, self.__ids, self.__values, self.__others):
+            index.clear()
+
+    def put(self, obj_id, obj):
+        """move obj to the place of its current values in sorted fields"""
+        for name, values in self.__values.items():
+            value = number(getattr(obj, name, None))
+            old = values.get(obj_id)
+            if old is not None and old == value:
+                continue
+            if old is None and math.isnan(value) \
+                    and obj_id in self.__others[name]:
+                continue
+            self.__remove(name, obj_id)
+            if math.isnan(value):
+                self.__others[name][obj_id] = None
+                continue
+            keys = self.__keys[name]
+            # after the equal values, so ties stay in insertion order
+            position = bisect_right(keys, value)
+            keys.insert(position, value)
+            self.__ids[name].insert(position, obj_id)
+            values[obj_id] = value
+
+    def discard(self, obj_id):
+        """remove obj_id from every sorted field"""
+        for name in self.__values:
+            self.__remove(name, obj_id)
+
+    def __remove(self, name, obj_id):
+        """remove obj_id from the sorted field name, if it is there"""
+        others = self.__others[name]
+        if obj_id in others:
+            del others[obj_id]
+            return
+        value = self.__values[name].pop(obj_id, None)
+        if value is None:
+            return
+        keys = self.__keys[name]
+        ids = self.__ids[name]
+        position = ids.index(obj_id, bisect_left(keys, value),
+                             bisect_right(keys, value))
+        del keys[position]
+        del ids[position]
+
+    def __slice(self, name, low, low_open, high, high_open):
+        """return the (start, stop) positions of a range of field name"""
+        keys = self.__keys[name]
+        start = 0 if low is None else \
+            (bisect_right if low_open else bisect_left)(keys, low)
+        stop = len(keys) if high is None else \
+            (bisect_left if high_open else bisect_right)(keys, high)
+        return start, max(start, stop)
+
+    def count(self, name, low=None, low_open=False, high=None,
+              high_open=False):
+        """return the number of objects in a range of field name"""
+        start, stop = self.__slice(name, low, low_open, high, high_open)
+        return stop - start
+
+    def ids(self, name, low=None, low_open=False, high=None,
+            high_open=False, reverse=False):
+        """yield the ids of a range of field name in the order of values
+
+        With no bound at all, the objects that have no number follow.
+        """
+        start, stop = self.__slice(name, low, low_open, high, high_open)
+        ids = self.__ids[name]
+        positions = range(stop - 1, start - 1, -1) if reverse \
+            else range(start, stop)
+        for position in positions:
+            yield ids[position]
+        if low is None and high is None:
+            yield from list(self.__others[name])
@@ -0,0 +1,74 @@
+#!/usr/bin/python3
+"""
+This module contains the References class, the reverse index of the
+foreign keys of the objects of one class
+
+For every foreign key attribute (state_id, city_id, amenity_ids...) it
+maps each id pointed at to the ids of the objects pointing at it, so the
+cities of a state or the reviews of a place are found in time
+proportional to their number instead of by a scan of the whole class.
+"""
+
+
+def parents(value):
+    """return the ids a foreign key value holds (a list holds several)"""
+    values = value if type(value) is list else (value,)
+    return [parent for parent in values if type(parent) is str and parent]
+
+
+class References():
+    """
+    The ids of the objects of one class by the value of each foreign key
+
+    put() adds or refreshes the entries of an object and discard() removes
+    them. A foreign key holding a list (like amenity_ids) indexes the
+    object under every id of the list.
+    """
+
+    def __init__(self, fields):
+        """Set up one empty index per field"""
+        self.fields = tuple(fields)
+        self.stale = set()
+        # the (field, parent id) entries of every object, to remove them
+        self.__entries = {}
+        self.__index = {name: {} for name in self.fields}
+
+    def __len__(self):
+        """return the number of objects indexed"""
+        return len(self.__entries)
+
+    def put(self, obj_id, obj):
+        """index the current foreign keys of obj under obj_id"""
+        if obj_id in self.__entries:
+            self.discard(obj_id)
+        entries = []
+        for name, index in self.__index.items():
+            value = getattr(obj, name, None)
+            if not value:
+                continue
+            if type(value) is str:
+                # the common case, one id, without building a list
+                index.setdefault(value, {})[obj_id] = None
+                entries.append((name, value))
+                continue
+            for parent in parents(value):
+                index.setdefault(parent, {})[obj_id] = None
+                entries.append((name, parent))
+        self.__entries[obj_id] = entries
+
+    def discard(self, obj_id):
+        """remove the entries of obj_id, if any"""
+        for name, parent in self.__entries.pop(obj_id, ()):
+            # a list holding an id twice gave it two entries
+            children = self.__index[name].get(parent)
+            if children is None:
+                continue
+            children.pop(obj_id, None)
+            if not children:
+                del self.__index[name][parent]
+
+    def ids(self, name, parent):
+        """return the ids of the objects whose field name holds parent"""
+        if name not in self.__index:
+            raise ValueError(f"{name} is not a foreign key")
+        return list(self.__index[name].get(parent, ()))
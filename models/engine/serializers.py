@@ -0,0 +1,282 @@
+#!/usr/bin/python3
+"""
+This module contains the file formats FileStorage can write
+
+Every serializer turns the to_dict() record of one object into a
+fragment (which FileStorage caches between saves), writes a sequence of
+(key, fragment) pairs as a file and reads such a file back as
+(key, record) pairs. Files are read as a stream: each record is handed
+out as soon as it is decoded, so reloading never holds the whole parsed
+document next to the objects built from it.
+
+JSONSerializer is the original file.json layout. BinarySerializer is a
+compact format: a header (magic, then the table of class names) followed
+by length-prefixed records, each one a marshal tuple where the class is
+an index in that table and created_at/updated_at are microseconds since
+1970-01-01 (and stay ints in the records read back). marshal is read
+and written in C, which a struct call per field is not, and only ever
+holds plain values here (str, int, float, bool, None, list, dict).
+"""
+
+import io
+import json
+import json.scanner
+import marshal
+import re
+import struct
+from datetime import datetime, timedelta
+from models.engine import compression
+
+# the size of the reads a JSON file is streamed in
+CHUNK = 1 << 16
+EPOCH = datetime(1970, 1, 1)
+LENGTH = struct.Struct("<I")
+MAGIC = b"HBNB\x02"
+MICROSECOND = timedelta(microseconds=1)
+# the marshal format version the records are written with
+VERSION = 4
+
+
+def _isoformat(value):
+    """json.dumps hook for datetimes"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _micros(value):
+    """return a timestamp (ISO text, datetime or micros) as micros"""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if isinstance(value, datetime):
+        return (value - EPOCH) // MICROSECOND
+    return value
+
+
+_scan_once = json.scanner.make_scanner(json.JSONDecoder())
+_open = re.compile(r"[ \t\n\r]*\{")
+_pair = re.compile(r'[ \t\n\r]*("(?:[^"\\]|\\.)*")[ \t\n\r]*:[ \t\n\r]*')
+_after = re.compile(r"[ \t\n\r]*([,}])")
+_close = re.compile(r"[ \t\n\r]*\}")
+
+
+class Serializer():
+    """Common methods of the serializers"""
+
+    def read(self, file):
+        """yield the (key, record) pairs of a file"""
+        for key, record, fragment in self.scan(file):
+            yield key, record
+
+
+class JSONSerializer(Serializer):
+    """Reads and writes the {"<class>.<id>": {...}} JSON layout"""
+
+    name = "json"
+    binary = False
+
+    def encode(self, record):
+        """return the JSON text of one record"""
+        for name in ("created_at", "updated_at"):
+            # records read from a binary file hold micros
+            if isinstance(record.get(name), int):
+                record = dict(record)
+                record[name] = (EPOCH + timedelta(
+                    microseconds=record[name])).isoformat()
+        return json.dumps(record, default=_isoformat)
+
+    def decode(self, fragment):
+        """return the record of one fragment"""
+        return json.loads(fragment)
+
+    def write(self, file, fragments):
+        """write the (key, fragment) pairs to a text file, one at a time"""
+        file.write("{")
+        separator = ""
+        for key, fragment in fragments:
+            file.write(f"{separator}{json.dumps(key)}: {fragment}")
+            separator = ", "
+        file.write("}")
+
+    def scan(self, file):
+        """yield the (key, record, fragment) of a text file, chunk by chunk
+
+        Each record is decoded and handed out as soon as it has been read,
+        so the whole document is never held in memory. The fragment is the
+        JSON text of the record as found in the file.
+        """
+        match = _open.match(file.read(CHUNK))
+        if match is None:
+            raise ValueError("not a JSON storage file")
+        buffer = match.string
+        offset = match.end()
+        names = {}
+        while True:
+            records, offset, done = _scan(buffer, offset, names)
+            yield from records
+            if done:
+                return
+            chunk = file.read(CHUNK)
+            if not chunk:
+                raise ValueError("truncated or corrupt JSON storage file")
+            buffer = buffer[offset:] + chunk
+            offset = 0
+
+
+def _scan(buffer, offset, names):
+    """decode the complete "key": {record} pairs of buffer from offset
+
+    Return the (key, record, fragment) of each, the offset that follows
+    them and whether the closing brace of the document was reached.
+    """
+    records = []
+    while True:
+        match = _pair.match(buffer, offset)
+        if match is None:
+            return records, offset, bool(_close.match(buffer, offset))
+        start = match.end()
+        try:
+            record, end = _scan_once(buffer, start)
+        except (StopIteration, json.JSONDecodeError):
+            return records, offset, False
+        after = _after.match(buffer, end)
+        if after is None:
+            return records, offset, False
+        key = match.group(1)
+        key = json.loads(key) if "\\" in key else key[1:-1]
+        # json.load shares the attribute names between all the records,
+        # decoding them one by one does not, so share them here
+        records.append((key, {names.setdefault(name, name): value
+                              for name, value in record.items()},
+                        buffer[start:end]))
+        offset = after.end()
+        if after.group(1) == "}":
+            return records, offset, True
+
+
+class BinarySerializer(Serializer):
+    """Reads and writes the length-prefixed binary layout"""
+
+    name = "binary"
+    binary = True
+    # class ids only ever grow so cached fragments stay valid
+    __class_ids = {}
+
+    def encode(self, record):
+        """return the bytes of one record, length prefix included"""
+        record = dict(record)
+        cls_name = record.pop("__class__")
+        class_ids = type(self).__class_ids
+        if cls_name not in class_ids:
+            class_ids[cls_name] = len(class_ids)
+        stamps = []
+        for name in ("created_at", "updated_at"):
+            value = record.pop(name, None)
+            stamps.append(None if value is None else _micros(value))
+        try:
+            body = marshal.dumps((class_ids[cls_name], record.pop("id"),
+                                  *stamps, record), VERSION)
+        except ValueError:
+            # values marshal does not know (nested datetimes...) go as JSON
+            body = marshal.dumps((class_ids[cls_name], record.pop("id"),
+                                  *stamps, json.dumps(record,
+                                                      default=_isoformat)),
+                                 VERSION)
+        return LENGTH.pack(len(body)) + body
+
+    def decode(self, fragment):
+        """return the record of one fragment, length prefix included"""
+        class_ids = type(self).__class_ids
+        return _unpack_record(fragment[LENGTH.size:],
+                              sorted(class_ids, key=class_ids.get))[1]
+
+    def write(self, file, fragments):
+        """write the header and the (key, fragment) pairs to a binary file"""
+        names = sorted(type(self).__class_ids,
+                       key=type(self).__class_ids.get)
+        file.write(MAGIC + marshal.dumps(tuple(names), VERSION))
+        for key, fragment in fragments:
+            file.write(fragment)
+
+    def scan(self, file):
+        """yield the (key, record, fragment) of each record of a binary file
+
+        The fragment is None when the class table of the file does not
+        match the one of this process, as the class ids would differ.
+        """
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError("not a binary storage file")
+        try:
+            names = marshal.load(file)
+        except (EOFError, TypeError) as error:
+            raise ValueError(f"corrupt header: {error}") from error
+        class_ids = type(self).__class_ids
+        table = sorted(class_ids, key=class_ids.get)
+        shared = list(names[:len(table)]) == table[:len(names)]
+        if shared:
+            for name in names:
+                class_ids.setdefault(name, len(class_ids))
+        while True:
+            prefix = file.read(LENGTH.size)
+            if not prefix:
+                return
+            if len(prefix) < LENGTH.size:
+                raise ValueError("truncated record")
+            size = LENGTH.unpack(prefix)[0]
+            body = file.read(size)
+            if len(body) < size:
+                raise ValueError("truncated record")
+            key, record = _unpack_record(body, names)
+            yield key, record, prefix + body if shared else None
+
+
+def _unpack_record(body, names):
+    """return the (key, record) of the bytes of one record"""
+    try:
+        class_id, obj_id, created, updated, record = marshal.loads(body)
+        if isinstance(record, str):
+            record = json.loads(record)
+        cls_name = names[class_id]
+        record["__class__"] = cls_name
+        record["id"] = obj_id
+    except (EOFError, ValueError, TypeError, IndexError) as error:
+        raise ValueError(f"corrupt record: {error}") from error
+    # the models keep micros too, so they are never turned into datetimes
+    if created is not None:
+        record["created_at"] = created
+    if updated is not None:
+        record["updated_at"] = updated
+    return f"{cls_name}.{obj_id}", record
+
+
+serializers = {"json": JSONSerializer, "binary": BinarySerializer}
+
+
+def detect(file):
+    """return a serializer able to read the binary stream file"""
+    head = file.peek(len(MAGIC))[:len(MAGIC)]
+    return BinarySerializer() if head == MAGIC else JSONSerializer()
+
+
+def open_text(file, serializer):
+    """return the binary stream file as the serializer reads it"""
+    if serializer.binary:
+        return file
+    return io.TextIOWrapper(file, encoding="utf-8")
+
+
+def convert(source, destination, to="binary", codec=None, level=None):
+    """rewrite the storage file source as destination in format to
+
+    codec (gzip, lzma or zlib) compresses the destination at level.
+    """
+    writer = serializers[to]()
+    with compression.reading(source) as stream:
+        reader = detect(stream)
+        fragments = [(key, writer.encode(record))
+                     for key, record in reader.read(open_text(stream,
+                                                              reader))]
+    with open(destination, "wb") as raw:
+        with compression.writing(raw, codec, level,
+                                 not writer.binary) as file:
+            writer.write(file, fragments)
@@ -0,0 +1,212 @@
+#!/usr/bin/python3
+"""
+This module contains the Grid class, the spatial index of the latitude
+and longitude of the objects of one class
+
+The surface is cut into cells of `size` degrees on each side and every
+object is kept in the cell holding its point, so a bounding box or a
+radius only looks at the points of the cells it overlaps. The nearest
+neighbours are found by radius searches of growing radius. Distances are
+great-circle distances in kilometres.
+
+scan_box(), scan_radius() and scan_nearest() answer the same questions
+by looking at every point, for the storages without a Grid.
+"""
+
+import heapq
+import math
+
+# the mean radius of the Earth
+EARTH_KM = 6371.0088
+# the length of one degree of latitude
+DEGREE_KM = math.pi * EARTH_KM / 180
+# the greatest distance between two points
+HALF_TURN_KM = math.pi * EARTH_KM
+
+
+def point(obj):
+    """return the (latitude, longitude) of obj, None when it has none
+
+    Only the coordinates set on obj itself count, not the defaults of its
+    class (Place.latitude = 0.0), which would put at (0, 0) every object
+    that has none.
+    """
+    attributes = vars(obj)
+    latitude = attributes.get("latitude")
+    longitude = attributes.get("longitude")
+    for value in (latitude, longitude):
+        if type(value) is not float and type(value) is not int:
+            return None
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        return None
+    return float(latitude), float(longitude)
+
+
+def distance(latitude, longitude, other_latitude, other_longitude):
+    """return the great-circle distance between two points in km"""
+    phi = math.radians(latitude)
+    other_phi = math.radians(other_latitude)
+    half_dphi = (other_phi - phi) / 2
+    half_dlambda = math.radians(other_longitude - longitude) / 2
+    h = math.sin(half_dphi) ** 2 \
+        + math.cos(phi) * math.cos(other_phi) * math.sin(half_dlambda) ** 2
+    return 2 * EARTH_KM * math.asin(min(1.0, math.sqrt(h)))
+
+
+def in_box(latitude, longitude, south, west, north, east):
+    """return True if the point is in the box
+
+    A box whose west edge is east of its east edge crosses the 180th
+    meridian.
+    """
+    if not south <= latitude <= north:
+        return False
+    if west <= east:
+        return west <= longitude <= east
+    return longitude >= west or longitude <= east
+
+
+def radius_box(latitude, longitude, km):
+    """return the (south, west, north, east) box around a circle"""
+    dlat = km / DEGREE_KM
+    south = latitude - dlat
+    north = latitude + dlat
+    if south <= -90 or north >= 90:
+        # the circle holds a pole, so every longitude
+        return max(-90.0, south), -180.0, min(90.0, north), 180.0
+    # the meridians touching the circle (Matuschek, bounding coordinates)
+    dlon = math.degrees(math.asin(math.sin(km / EARTH_KM)
+                                  / math.cos(math.radians(latitude))))
+    west = longitude - dlon
+    east = longitude + dlon
+    if west < -180:
+        west += 360
+    if east > 180:
+        east -= 360
+    return south, west, north, east
+
+
+def scan_box(points, south, west, north, east):
+    """return the ids of the (id, (latitude, longitude)) points in a box"""
+    return [obj_id for obj_id, (latitude, longitude) in points
+            if in_box(latitude, longitude, south, west, north, east)]
+
+
+def scan_radius(points, latitude, longitude, km):
+    """return the (km, id) of the points within km, nearest first"""
+    found = []
+    for obj_id, (other_latitude, other_longitude) in points:
+        away = distance(latitude, longitude, other_latitude, other_longitude)
+        if away <= km:
+            found.append((away, obj_id))
+    found.sort()
+    return found
+
+
+def scan_nearest(points, latitude, longitude, k=1):
+    """return the (km, id) of the k points nearest a point"""
+    return heapq.nsmallest(k, ((distance(latitude, longitude, *position),
+                                obj_id) for obj_id, position in points))
+
+
+class Grid():
+    """
+    The (latitude, longitude) of the objects of one class, by grid cell
+
+    put() adds or moves the point of an object and discard() removes it;
+    objects without a valid latitude and longitude are left out.
+    """
+
+    def __init__(self, size=0.1):
+        """Set up an empty grid of cells of size degrees"""
+        self.size = size
+        self.stale = set()
+        self.__points = {}
+        self.__cells = {}
+
+    def __len__(self):
+        """return the number of points"""
+        return len(self.__points)
+
+    def __cell(self, latitude, longitude):
+        """return the cell holding a point"""
+        return (math.floor(latitude / self.size),
+                math.floor(longitude / self.size))
+
+    def put(self, obj_id, obj):
+        """store the current point of obj under obj_id"""
+        position = point(obj)
+        old = self.__points.get(obj_id)
+        if old == position:
+            return
+        if old is not None:
+            self.discard(obj_id)
+        if position is None:
+            return
+        self.__points[obj_id] = position
+        self.__cells.setdefault(self.__cell(*position), {})[obj_id] = \
+            position
+
+    def discard(self, obj_id):
+        """remove the point of obj_id, if any"""
+        position = self.__points.pop(obj_id, None)
+        if position is None:
+            return
+        cell = self.__cell(*position)
+        points = self.__cells[cell]
+        del points[obj_id]
+        if not points:
+            del self.__cells[cell]
+
+    def points(self):
+        """return the (id, (latitude, longitude)) of every point"""
+        return self.__points.items()
+
+    def __candidates(self, south, west, north, east):
+        """yield the (id, point) of the cells overlapping a box"""
+        rows = range(math.floor(south / self.size),
+                     math.floor(north / self.size) + 1)
+        if west <= east:
+            spans = [(west, east)]
+        else:
+            spans = [(west, 180.0), (-180.0, east)]
+        columns = [range(math.floor(low / self.size),
+                         math.floor(high / self.size) + 1)
+                   for low, high in spans]
+        wanted = len(rows) * sum(len(span) for span in columns)
+        if wanted > len(self.__cells):
+            # a large box: fewer cells are filled than it covers
+            for (row, column), points in self.__cells.items():
+                if row in rows and any(column in span for span in columns):
+                    yield from points.items()
+            return
+        for row in rows:
+            for span in columns:
+                for column in span:
+                    points = self.__cells.get((row, column))
+                    if points:
+                        yield from points.items()
+
+    def box(self, south, west, north, east):
+        """return the ids of the points in a box, in no order"""
+        return scan_box(self.__candidates(south, west, north, east),
+                        south, west, north, east)
+
+    def radius(self, latitude, longitude, km):
+        """return the (km, id) of the points within km, nearest first"""
+        return scan_radius(self.__candidates(
+            *radius_box(latitude, longitude, km)), latitude, longitude, km)
+
+    def nearest(self, latitude, longitude, k=1):
+        """return the (km, id) of the k points nearest a point"""
+        k = min(k, len(self.__points))
+        if k <= 0:
+            return []
+        # the points of about one cell, then twice the radius until k
+        # points are within it: nothing outside can be nearer than them
+        km = self.size * DEGREE_KM
+        while True:
+            found = self.radius(latitude, longitude, km)
+            if len(found) >= k or km >= HALF_TURN_KM:
+                return found[:k]
+            km *= 2
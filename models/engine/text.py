@@ -0,0 +1,183 @@
+#!/usr/bin/python3
+"""
+This module contains the TextIndex class, the full-text index of the
+text attributes of the objects of one class
+
+Texts are cut into lowercase words (see tokens()) and every word maps to
+the ids of the objects using it, with the number of times they do, so a
+search only reads the lists of its own words. Results are ranked by BM25:
+rare words weigh more than common ones, and each repeat of a word counts
+less than the one before, relative to the length of the text.
+
+dump() and load() write and read an index as marshal data, so that a
+storage can keep it in a file instead of building it again at startup.
+"""
+
+import heapq
+import marshal
+import math
+import re
+import sys
+import zlib
+
+# the words of a text: runs of letters and digits
+WORD = re.compile(r"[^\W_]+")
+# the first bytes of a file written by dump()
+MAGIC = b"HBNBTXT\x01"
+
+
+def tokens(text):
+    """return the lowercase words of text, in order"""
+    return WORD.findall(text.casefold())
+
+
+def digest(text):
+    """return a checksum of text, to tell whether it changed"""
+    return zlib.crc32(text.encode("utf-8", "surrogatepass"))
+
+
+class TextIndex():
+    """
+    The words of the text attributes of the objects of one class
+
+    put() indexes the current text of an object, discard() removes it and
+    search() returns the ids best matching some words. k1 and b are the
+    BM25 parameters: how fast the repeats of a word stop counting, and how
+    much the length of a text matters.
+    """
+
+    def __init__(self, fields, k1=1.2, b=0.75):
+        """Set up an empty index of the text of fields"""
+        self.fields = tuple(fields)
+        self.k1 = k1
+        self.b = b
+        self.stale = set()
+        # whether put() or discard() changed anything since load()
+        self.changed = False
+        # id -> (digest of the text, number of words, its distinct words)
+        self.__documents = {}
+        # word -> {id: number of times the text of id uses the word}
+        self.__postings = {}
+        self.__words = 0
+
+    def __len__(self):
+        """return the number of objects indexed"""
+        return len(self.__documents)
+
+    def text(self, obj):
+        """return the text of the fields of obj, as one string"""
+        values = (getattr(obj, name, None) for name in self.fields)
+        return " ".join(value for value in values if type(value) is str)
+
+    def put(self, obj_id, obj):
+        """index the current text of obj under obj_id"""
+        text = self.text(obj)
+        check = digest(text)
+        document = self.__documents.get(obj_id)
+        if document is not None and document[0] == check:
+            return
+        self.discard(obj_id)
+        words = tokens(text)
+        counts = {}
+        for word in words:
+            counts[word] = counts.get(word, 0) + 1
+        postings = self.__postings
+        distinct = []
+        for word, count in counts.items():
+            # one string per word, however many texts use it
+            word = sys.intern(word)
+            postings.setdefault(word, {})[obj_id] = count
+            distinct.append(word)
+        self.__documents[obj_id] = (check, len(words), tuple(distinct))
+        self.__words += len(words)
+        self.changed = True
+
+    def discard(self, obj_id):
+        """remove the text of obj_id, if any"""
+        document = self.__documents.pop(obj_id, None)
+        if document is None:
+            return
+        for word in document[2]:
+            posting = self.__postings[word]
+            del posting[obj_id]
+            if not posting:
+                del self.__postings[word]
+        self.__words -= document[1]
+        self.changed = True
+
+    def idf(self, word):
+        """return the weight of word, higher for rarer words"""
+        used = len(self.__postings.get(word, ()))
+        return math.log(1 + (len(self.__documents) - used + 0.5)
+                        / (used + 0.5))
+
+    def search(self, text, k=10):
+        """return the (score, id) of the k objects best matching text
+
+        Objects using none of the words of text are left out; k=None
+        returns every object using one of them. Best matches come first.
+        """
+        postings = self.__postings
+        words = {word for word in tokens(text) if word in postings}
+        if not words or k is not None and k <= 0:
+            return []
+        k1 = self.k1
+        documents = self.__documents
+        base = k1 * (1 - self.b)
+        slope = k1 * self.b * len(documents) / self.__words
+        # the rarest words first, with the most any of them can add
+        weights = sorted(((self.idf(word) * (k1 + 1), postings[word])
+                          for word in words), key=lambda item: -item[0])
+        left = [sum(weight for weight, posting in weights[position:])
+                for position in range(len(weights))]
+        scores = {}
+        for position, (weight, posting) in enumerate(weights):
+            items = posting.items()
+            if k is not None and len(scores) >= k and left[position] \
+                    < heapq.nlargest(k, scores.values())[-1]:
+                # the words left cannot lift an object the words read so
+                # far missed into the first k (MaxScore), only add them to
+                # the scores already there
+                if len(posting) < len(scores):
+                    items = [(obj_id, count) for obj_id, count in items
+                             if obj_id in scores]
+                else:
+                    items = [(obj_id, posting[obj_id]) for obj_id in scores
+                             if obj_id in posting]
+            for obj_id, count in items:
+                scores[obj_id] = scores.get(obj_id, 0.0) + weight * count \
+                    / (count + base + slope * documents[obj_id][1])
+        found = ((score, obj_id) for obj_id, score in scores.items())
+        if k is None:
+            return sorted(found, reverse=True)
+        return heapq.nlargest(k, found)
+
+    def dump(self, file):
+        """write the index to the binary file, see load()"""
+        file.write(MAGIC)
+        file.write(marshal.dumps((self.fields, self.k1, self.b,
+                                  self.__documents, self.__postings,
+                                  self.__words)))
+        self.changed = False
+
+    @classmethod
+    def load(cls, file):
+        """return the index dump() wrote to the binary file
+
+        Every object of the index is marked stale, so that the next
+        refresh checks its text against the one of the object. Raises
+        ValueError if file does not hold an index.
+        """
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError("not a text index")
+        try:
+            fields, k1, b, documents, postings, words = \
+                marshal.loads(file.read())
+        except (EOFError, TypeError, ValueError) as error:
+            raise ValueError("corrupt text index") from error
+        index = cls(fields, k1, b)
+        index.__documents = documents
+        index.__postings = postings
+        index.__words = words
+        index.stale.update(documents)
+        return index
@@ -1,7 +1,7 @@
 #!/usr/bin/python3
 
 """ This contains information about places """
-from models.base_model import BaseModel
+from models.base_model import BaseModel, Related
 
 
 class Place(BaseModel):
@@ -17,3 +17,5 @@ class Place(BaseModel):
     latitude = 0.0
     longitude = 0.0
     amenity_ids = []
+    reviews = Related("Review", "place_id")
+    _searchable = ("name", "description")
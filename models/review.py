@@ -9,3 +9,4 @@ class Review(BaseModel):
     place_id = ""
     user_id = ""
     text = ""
+    _searchable = ("text",)
@@ -1,9 +1,10 @@
 #!/usr/bin/python3
 
 """ This file contains the state class """
-from models.base_model import BaseModel
+from models.base_model import BaseModel, Related
 
 
 class State(BaseModel):
     """ State information """
     name = ""
+    cities = Related("City", "state_id")
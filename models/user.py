@@ -1,7 +1,7 @@
 #!/usr/bin/python3
 
 """ This file managers the users personal information """
-from models.base_model import BaseModel
+from models.base_model import BaseModel, Related
 
 
 class User(BaseModel):
@@ -10,3 +10,5 @@ class User(BaseModel):
     password = ""
     first_name = ""
     last_name = ""
+    places = Related("Place", "user_id")
+    reviews = Related("Review", "user_id")
@@ -0,0 +1,47 @@
+#!/usr/bin/python3
+"""This module contains the base TestCase of the FileStorage tests"""
+
+from models.engine.file_storage import FileStorage
+import os
+import tempfile
+import unittest
+
+# the class-level state of FileStorage, shared by all its instances
+STATE = ("objects", "by_class", "dirty", "fragments", "raw", "loaded")
+
+
+class StorageTestCase(unittest.TestCase):
+    """A TestCase with its own FileStorage, self.fs, in a temporary dir
+
+    setUp() puts the class-level state of FileStorage aside and empties
+    it, and tearDown() puts it back, so that the objects of a test never
+    reach another test. The indexes are emptied both times and built
+    again on first use. options are the arguments of the FileStorage.
+    """
+
+    options = {}
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "file.json")
+        self.__state = {}
+        for name in STATE:
+            state = getattr(FileStorage, f"_FileStorage__{name}")
+            self.__state[name] = state.copy()
+            state.clear()
+        self.clear_indexes()
+        self.fs = FileStorage(self.path, **self.options)
+        self.fs.reload()
+
+    def tearDown(self):
+        for name in STATE:
+            state = getattr(FileStorage, f"_FileStorage__{name}")
+            state.clear()
+            state.update(self.__state[name])
+        self.clear_indexes()
+        self.tmp.cleanup()
+
+    def clear_indexes(self):
+        """drop every index of every kind"""
+        for indexes in FileStorage._FileStorage__indexes.values():
+            indexes.clear()
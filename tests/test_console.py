@@ -103,6 +103,85 @@ class TestConsole(unittest.TestCase):
         correct = "** class doesn't exist **"
         self.assertOutputContains(correct, "all MyModel")
 
+    def test_count(self):
+        """Test count matches the objects of that class"""
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(self.console.onecmd("count State"))
+            before = int(output.getvalue().strip())
+        with patch("sys.stdout", new=StringIO()):
+            self.console.onecmd("create State")
+        with patch("sys.stdout", new=StringIO()) as output:
+            line = self.console.precmd("State.count()")
+            self.assertFalse(self.console.onecmd(line))
+            self.assertEqual(before + 1, int(output.getvalue().strip()))
+
+    def test_all_class(self):
+        """Test all with a class only lists that class"""
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(self.console.onecmd("create Amenity"))
+            test_id = output.getvalue().strip()
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(self.console.onecmd("all Amenity"))
+            self.assertIn(test_id, output.getvalue())
+            self.assertNotIn("[User]", output.getvalue())
+
+    def test_update_dict_single_save(self):
+        """Test dictionary update writes the storage once"""
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.console.onecmd("create User")
+            test_id = output.getvalue().strip()
+        line = 'User.update("{}", {{"first_name": "Betty", "age": 89}})'
+        with patch("models.engine.file_storage.open", create=True,
+                   wraps=open) as mock_open:
+            self.console.precmd(line.format(test_id))
+            self.assertEqual(mock_open.call_count, 1)
+        user = storage.all()["User." + test_id]
+        self.assertEqual(user.first_name, "Betty")
+        self.assertEqual(user.age, "89")
+
+    def test_update_typed(self):
+        """Test update stores the type the class declares"""
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.console.onecmd("create Place")
+            test_id = output.getvalue().strip()
+        self.console.onecmd(f"update Place {test_id} price_by_night 120")
+        self.console.onecmd(f"update Place {test_id} latitude 12")
+        self.console.onecmd(f"update Place {test_id} number_rooms many")
+        place = storage.all()["Place." + test_id]
+        self.assertIs(type(place.price_by_night), int)
+        self.assertEqual(place.price_by_night, 120)
+        self.assertIs(type(place.latitude), float)
+        self.assertEqual(place.number_rooms, "many")
+
+    def test_all_filter(self):
+        """Test all with predicates only lists the matching objects"""
+        ids = []
+        for price in ("50", "150"):
+            with patch("sys.stdout", new=StringIO()) as output:
+                self.console.onecmd("create Place")
+                ids.append(output.getvalue().strip())
+            self.console.onecmd(f"update Place {ids[-1]} "
+                                f"price_by_night {price}")
+        for line in ("all Place price_by_night__lt=100",
+                     "Place.all(price_by_night__lt=100)",
+                     f"all Place id__in={ids[0]},x"):
+            with patch("sys.stdout", new=StringIO()) as output:
+                self.console.onecmd(self.console.precmd(line))
+                self.assertIn(ids[0], output.getvalue())
+                self.assertNotIn(ids[1], output.getvalue())
+
+    def test_all_bad_arguments(self):
+        """Test all reports the arguments it cannot read"""
+        for line, error in [('all Place name="x',
+                             "** unbalanced quotes **"),
+                            ("all Place bogus",
+                             "** invalid argument: bogus **"),
+                            ("all Place name=x =1",
+                             "** invalid argument: =1 **")]:
+            with patch("sys.stdout", new=StringIO()) as output:
+                self.assertFalse(self.console.onecmd(line))
+            self.assertEqual(output.getvalue().strip(), error)
+
     def test_update_missing_class(self):
         """Test update with missing class"""
         correct = "** class name missing **"
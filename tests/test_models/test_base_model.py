@@ -2,9 +2,15 @@
 """This module contains unittests for the BaseModel class"""
 
 from datetime import datetime
-from models.base_model import BaseModel
+from models.base_model import BaseModel, Micros, now, share
+from models.base_model import coerce, first_id, id_time, schema, typed
+from models.base_model import uuid7
+from models.place import Place
 from models import storage
-from time import sleep
+from time import sleep, time
+from unittest import mock
+from uuid import RFC_4122, uuid4
+import sys
 import unittest
 
 
@@ -201,6 +207,154 @@ class TestRecreateInstanceFromDict(unittest.TestCase):
         self.assertIsInstance(my_new_model, BaseModel)
         self.assertIsNot(my_model, my_new_model)
 
+    def test_from_dict(self):
+        my_model = BaseModel()
+        my_model.name = "My First Model"
+        my_new_model = BaseModel.from_dict(my_model.to_dict())
+        self.assertIsInstance(my_new_model, BaseModel)
+        self.assertIsNot(my_model, my_new_model)
+        self.assertEqual(my_model.to_dict(), my_new_model.to_dict())
+        self.assertNotIn("__class__", my_new_model.__dict__)
+        self.assertIsInstance(my_new_model.created_at, datetime)
+
+    def test_from_dict_not_in_storage(self):
+        my_dict = BaseModel().to_dict()
+        my_dict["id"] = "from_dict_id"
+        BaseModel.from_dict(my_dict)
+        self.assertNotIn("BaseModel.from_dict_id", storage.all())
+
+
+class TestTimestamps(unittest.TestCase):
+    """Test the epoch based storage of created_at/updated_at"""
+
+    def test_stored_as_micros(self):
+        my_model = BaseModel()
+        self.assertIs(type(my_model.__dict__["created_at"]), Micros)
+        self.assertIs(type(my_model.created_at), datetime)
+        dt = datetime(2024, 1, 13, 12, 9, 0, 462348)
+        my_model.updated_at = dt
+        self.assertEqual(my_model.__dict__["updated_at"], 1705147740462348)
+        self.assertEqual(my_model.updated_at, dt)
+        self.assertEqual(repr(my_model.__dict__["updated_at"]), repr(dt))
+
+    def test_now_matches_datetime_now(self):
+        my_model = BaseModel(id="1", created_at=datetime.now().isoformat(),
+                             updated_at=datetime.now().isoformat())
+        my_model.updated_at = now()
+        self.assertLess(
+            abs(my_model.updated_at - my_model.created_at).seconds, 2)
+
+    def test_read_text_kept_until_changed(self):
+        text = "2024-01-13T12:09:00.462348"
+        my_model = BaseModel.from_dict({"id": "1", "created_at": text,
+                                        "updated_at": text})
+        self.assertIs(my_model.__dict__["created_at"], text)
+        self.assertIs(my_model.to_dict()["created_at"], text)
+        self.assertEqual(my_model.created_at,
+                         datetime(2024, 1, 13, 12, 9, 0, 462348))
+        self.assertIn("datetime.datetime(2024, 1, 13", str(my_model))
+
+    def test_bad_value(self):
+        with self.assertRaises(TypeError):
+            BaseModel().created_at = None
+
+
+class TestSharedIds(unittest.TestCase):
+    """Test that equal id strings are shared between objects"""
+
+    def test_foreign_keys_shared(self):
+        parent = "".join(["4f1d", "-parent"])
+        first = BaseModel.from_dict({"id": "".join(["a", "1"]),
+                                     "state_id": parent,
+                                     "amenity_ids": ["".join(["x", "y"])]})
+        second = BaseModel(id="a2", state_id="".join(["4f1d", "-parent"]),
+                           created_at="2024-01-13T12:09:00",
+                           updated_at="2024-01-13T12:09:00",
+                           amenity_ids=["".join(["x", "y"])])
+        self.assertIs(first.state_id, second.state_id)
+        self.assertIs(first.amenity_ids[0], second.amenity_ids[0])
+        self.assertIs(share("".join(["a", "1"])), first.id)
+
+    def test_other_strings_not_shared(self):
+        first = BaseModel.from_dict({"id": "b1", "name": "".join("ab")})
+        second = BaseModel.from_dict({"id": "b2", "name": "".join("ab")})
+        self.assertIsNot(first.name, second.name)
+
+    def test_not_kept(self):
+        """share() keeps no reference to the ids it has seen"""
+        value = str(uuid4())
+        count = sys.getrefcount(value)
+        self.assertIs(share(value), value)
+        self.assertEqual(sys.getrefcount(value), count)
+
+
+class TestTimeOrderedIds(unittest.TestCase):
+    """Test the time-ordered (UUIDv7) ids"""
+
+    def test_uuid7(self):
+        value = uuid7()
+        self.assertEqual(value.version, 7)
+        self.assertEqual(value.variant, RFC_4122)
+        self.assertAlmostEqual(id_time(str(value)) / 1000, time(), delta=5)
+
+    def test_sorted_in_creation_order(self):
+        ids = [str(uuid7()) for i in range(1000)]
+        self.assertEqual(sorted(ids), ids)
+        self.assertEqual(len(set(ids)), len(ids))
+
+    def test_clock_going_back(self):
+        first = uuid7()
+        with mock.patch("time.time_ns", return_value=0):
+            second = uuid7()
+        self.assertGreater(str(second), str(first))
+
+    def test_first_id(self):
+        start = int(time() * 1000)
+        obj_id = str(uuid7())
+        self.assertLessEqual(first_id(start), obj_id)
+        self.assertGreater(first_id(start + 60000), obj_id)
+        self.assertEqual(id_time(first_id(start)), start)
+
+    def test_option(self):
+        with mock.patch("models.base_model.new_id", uuid7):
+            obj = BaseModel()
+        self.assertIsNotNone(id_time(obj.id))
+        self.assertEqual(BaseModel(**obj.to_dict()).id, obj.id)
+        with mock.patch("models.base_model.new_id", uuid4):
+            self.assertIsNone(id_time(BaseModel().id))
+        self.assertIsNone(id_time("a1"))
+
+
+class TestCoercion(unittest.TestCase):
+    """Test the numbers are given the type their class declares"""
+
+    def test_schema(self):
+        self.assertEqual(schema(Place)["number_rooms"], int)
+        self.assertEqual(schema(Place)["latitude"], float)
+        self.assertNotIn("name", schema(Place))
+        self.assertEqual(schema(BaseModel), {})
+
+    def test_coerce(self):
+        self.assertEqual(coerce(int, "120"), 120)
+        self.assertIs(type(coerce(int, "12.0")), int)
+        self.assertEqual(coerce(int, 12.5), 12.5)
+        self.assertEqual(coerce(int, "abc"), "abc")
+        self.assertIs(coerce(int, True), True)
+        self.assertEqual(coerce(float, "1.5"), 1.5)
+        self.assertIs(type(coerce(float, 3)), float)
+        self.assertEqual(coerce(float, ["x"]), ["x"])
+
+    def test_typed(self):
+        self.assertEqual(typed(Place, "max_guest", "4"), 4)
+        self.assertEqual(typed(Place, "name", "4"), "4")
+
+    def test_from_dict(self):
+        place = Place.from_dict({"id": "p1", "price_by_night": "120",
+                                 "longitude": "2", "name": "7"})
+        self.assertIs(type(place.price_by_night), int)
+        self.assertIs(type(place.longitude), float)
+        self.assertEqual(place.name, "7")
+
 
 if __name__ == "__main__":
     unittest.main()
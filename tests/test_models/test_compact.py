@@ -0,0 +1,140 @@
+#!/usr/bin/python3
+"""This module contains unittests for the compact model classes"""
+
+from datetime import datetime
+from models.compact import compact, CompactModel
+from models.engine.file_storage import FileStorage
+from models.place import Place
+from models.user import User
+from models import storage
+from tests.storage_case import StorageTestCase
+from unittest.mock import patch
+import models
+import unittest
+
+DATE = "2024-01-13T12:09:00.462348"
+
+
+class TestCompact(unittest.TestCase):
+    """Test the __slots__ based variants of the model classes"""
+
+    def setUp(self):
+        self.CompactPlace = compact(Place)
+        self.CompactUser = compact(User)
+
+    def test_class(self):
+        self.assertEqual(self.CompactPlace.__name__, "Place")
+        self.assertTrue(issubclass(self.CompactPlace, CompactModel))
+        self.assertIn("price_by_night", self.CompactPlace.__slots__)
+        self.assertEqual(self.CompactPlace.defaults(), Place.defaults())
+
+    def test_no_instance_dict(self):
+        place = self.CompactPlace()
+        self.assertEqual(type(place).__dictoffset__, 0)
+        self.assertNotEqual(Place.__dictoffset__, 0)
+        self.assertIsInstance(place.__dict__, dict)
+
+    def test_new_instance(self):
+        place = self.CompactPlace()
+        self.assertIsInstance(place.id, str)
+        self.assertIsInstance(place.created_at, datetime)
+        self.assertIn("Place." + place.id, storage.all())
+        self.assertEqual(place.price_by_night, 0)
+        self.assertEqual(place.name, "")
+
+    def test_mutable_default_not_shared(self):
+        place1 = self.CompactPlace()
+        place2 = self.CompactPlace()
+        place1.amenity_ids.append("a1")
+        self.assertEqual(place2.amenity_ids, [])
+        self.assertEqual(Place.amenity_ids, [])
+
+    def test_overflow_attributes(self):
+        user = self.CompactUser()
+        user.first_name = "Betty"
+        user.age = "89"
+        self.assertEqual(user.age, "89")
+        self.assertEqual(user._extra, {"age": "89"})
+        with self.assertRaises(AttributeError):
+            user.middle_name
+
+    def test_to_dict_and_str(self):
+        user = self.CompactUser()
+        user.first_name = "Betty"
+        user.age = "89"
+        user_dict = user.to_dict()
+        self.assertEqual(user_dict["__class__"], "User")
+        self.assertEqual(user_dict["first_name"], "Betty")
+        self.assertEqual(user_dict["age"], "89")
+        self.assertEqual(user_dict["created_at"], user.created_at.isoformat())
+        self.assertEqual(str(user), f"[User] ({user.id}) {user.__dict__}")
+
+    def test_kwargs_and_from_dict(self):
+        data = {"id": "1", "created_at": DATE, "updated_at": DATE,
+                "__class__": "User", "email": "a@b.c", "age": "89"}
+        for user in (self.CompactUser(**data),
+                     self.CompactUser.from_dict(data)):
+            self.assertEqual(user.to_dict(), data)
+            self.assertNotIn("User.1", storage.all())
+
+    def test_from_dict_typed(self):
+        place = self.CompactPlace.from_dict({"id": "1", "max_guest": "3",
+                                             "latitude": "1.5"})
+        self.assertEqual(place.max_guest, 3)
+        self.assertEqual(place.latitude, 1.5)
+
+    def test_replace_dict(self):
+        user = self.CompactUser.from_dict(
+            {"id": "1", "created_at": DATE, "updated_at": DATE,
+             "first_name": "Betty", "age": "89"})
+        state = user.__dict__
+        user.first_name = "John"
+        user.color = "blue"
+        object.__setattr__(user, "__dict__", state)
+        self.assertEqual(user.__dict__, state)
+        self.assertEqual(user.first_name, "Betty")
+
+    def test_storage_round_trip(self):
+        place = self.CompactPlace()
+        place.name = "Loft"
+        place.save()
+        data = storage.all()["Place." + place.id].to_dict()
+        self.assertEqual(self.CompactPlace.from_dict(data).to_dict(), data)
+
+
+class TestCompactRegistry(StorageTestCase):
+    """Test a storage building compact objects (HBNB_COMPACT_MODELS=1)"""
+
+    def setUp(self):
+        super().setUp()
+        self.compacts = {name: compact(cls)
+                         for name, cls in models.classes.items()}
+
+    def test_mixed_classes(self):
+        """the storage builds compact objects, the modules keep theirs"""
+        self.fs.new(User(id="u1", created_at=DATE, updated_at=DATE))
+        self.fs.save()
+        with patch.dict(models.classes, self.compacts), \
+                patch("models.storage", self.fs):
+            FileStorage._FileStorage__objects.clear()
+            self.fs.reload()
+            user = self.fs.get(User, "u1")
+            self.assertIsInstance(user, self.compacts["User"])
+            self.assertNotIsInstance(user, User)
+            # a regular instance is still stored and saved with the others
+            self.fs.new(User(id="u2", created_at=DATE, updated_at=DATE,
+                             first_name="Betty"))
+            user.first_name = "John"
+            self.fs.save()
+            FileStorage._FileStorage__objects.clear()
+            self.fs.reload()
+            users = self.fs.all(User)
+            self.assertEqual({key: obj.first_name
+                              for key, obj in users.items()},
+                             {"User.u1": "John", "User.u2": "Betty"})
+            for obj in users.values():
+                self.assertIs(type(obj), self.compacts["User"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+#!/usr/bin/python3
+"""This module contains Tests for the columnar store of numeric fields"""
+
+from models.engine import columns as columns_module
+from models.engine.columns import Columns, numeric_fields
+from models.engine.file_storage import FileStorage
+from models.place import Place
+from tests.storage_case import StorageTestCase
+from unittest import mock
+import unittest
+
+
+def place(obj_id, price, rooms):
+    """return a Place with the given id, price and number of rooms"""
+    return Place(id=obj_id, created_at="2024-01-13T12:09:00",
+                 updated_at="2024-01-13T12:09:00", price_by_night=price,
+                 number_rooms=rooms)
+
+
+class TestColumns(unittest.TestCase):
+    """Test the Columns class on its own"""
+
+    def setUp(self):
+        self.columns = Columns(numeric_fields(Place))
+        for i in range(6):
+            self.columns.put(str(i), place(str(i), i * 50, i))
+
+    def test_numeric_fields(self):
+        self.assertEqual(numeric_fields(Place),
+                         ["number_rooms", "number_bathrooms", "max_guest",
+                          "price_by_night", "latitude", "longitude"])
+
+    def test_select(self):
+        for numpy in (columns_module.numpy, None):
+            with mock.patch.object(columns_module, "numpy", numpy):
+                self.assertEqual(self.columns.select(
+                    price_by_night__lt=200, number_rooms__ge=2), ["2", "3"])
+                self.assertEqual(self.columns.select(number_rooms__eq=5),
+                                 ["5"])
+                self.assertEqual(len(self.columns.select()), 6)
+                self.assertEqual(Columns(["a"]).select(a__gt=1), [])
+
+    def test_put_and_discard(self):
+        self.columns.put("2", place("2", 1000, 2))
+        self.columns.discard("0")
+        self.columns.discard("missing")
+        self.assertEqual(len(self.columns), 5)
+        self.assertEqual(self.columns.ids, ["5", "1", "2", "3", "4"])
+        self.assertEqual(list(self.columns.column("price_by_night")),
+                         [250, 50, 1000, 150, 200])
+        self.assertEqual(self.columns.select(price_by_night__gt=500), ["2"])
+
+    def test_not_a_number(self):
+        self.columns.put("9", place("9", "cheap", 1))
+        self.assertNotIn("9", self.columns.select(price_by_night__ge=0))
+        self.assertNotIn("9", self.columns.select(price_by_night__lt=0))
+
+    def test_bad_condition(self):
+        with self.assertRaises(ValueError):
+            self.columns.select(name__eq=1)
+        with self.assertRaises(ValueError):
+            self.columns.select(price_by_night__near=1)
+
+
+class TestFileStorageColumns(StorageTestCase):
+    """Test that FileStorage keeps the columns in step with the objects"""
+
+    def setUp(self):
+        super().setUp()
+        self.places = [place(str(i), i * 50, i) for i in range(4)]
+        for obj in self.places:
+            self.fs.new(obj)
+
+    def select(self, **conditions):
+        return sorted(self.fs.columns(Place).select(**conditions))
+
+    def test_new_update_delete(self):
+        self.assertEqual(self.select(price_by_night__lt=100), ["0", "1"])
+        self.fs.new(place("9", 10, 1))
+        self.places[3].price_by_night = 20
+        self.fs.delete(self.places[0])
+        self.assertEqual(self.select(price_by_night__lt=100),
+                         ["1", "3", "9"])
+
+    def test_rollback(self):
+        self.select()
+        with mock.patch("models.storage", self.fs):
+            with self.assertRaises(KeyError):
+                with self.fs.transaction():
+                    self.places[3].price_by_night = 20
+                    raise KeyError
+        self.assertEqual(self.select(price_by_night__lt=100), ["0", "1"])
+
+    def test_reload(self):
+        self.select()
+        self.fs.save()
+        FileStorage._FileStorage__objects.clear()
+        self.fs.reload()
+        self.assertEqual(self.select(number_rooms__ge=2), ["2", "3"])
+        self.assertIs(self.fs.columns("Place"), self.fs.columns(Place))
+
+
+if __name__ == "__main__":
+    unittest.main()
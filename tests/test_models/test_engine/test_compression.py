@@ -0,0 +1,101 @@
+#!/usr/bin/python3
+"""This module contains Tests for the compressed storage files"""
+
+from models.engine import compression
+from models.engine.file_storage import FileStorage
+from models.engine.serializers import convert
+from models.user import User
+from tests.storage_case import StorageTestCase
+from unittest import mock
+import json
+import os
+import tempfile
+import unittest
+
+TEXT = json.dumps({f"User.{i}": {"id": str(i), "email": "a@b.c"}
+                   for i in range(2000)})
+
+
+class TestCompression(unittest.TestCase):
+    """Test the compressed streams"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "file")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, codec, level=None):
+        with open(self.path, "wb") as raw:
+            with compression.writing(raw, codec, level, True) as file:
+                file.write(TEXT)
+            self.assertFalse(raw.closed)
+
+    def read(self):
+        with compression.reading(self.path) as stream:
+            return stream.read().decode()
+
+    @mock.patch("models.engine.compression.CHUNK", 64)
+    def test_round_trip(self):
+        for codec in (None, "gzip", "lzma", "zlib"):
+            self.write(codec, 1 if codec == "zlib" else None)
+            with open(self.path, "rb") as raw:
+                self.assertEqual(compression.detect(raw), codec)
+            self.assertEqual(self.read(), TEXT)
+            if codec is not None:
+                self.assertLess(os.path.getsize(self.path), len(TEXT) / 5)
+
+    def test_truncated(self):
+        for codec in ("gzip", "lzma", "zlib"):
+            self.write(codec)
+            with open(self.path, "rb+") as raw:
+                raw.truncate(os.path.getsize(self.path) // 2)
+            with self.assertRaises(compression.errors):
+                self.read()
+
+
+class TestFileStorageCompression(StorageTestCase):
+    """Test FileStorage with compressed files"""
+
+    def setUp(self):
+        super().setUp()
+        for i in range(3):
+            FileStorage(self.path).new(
+                User(id=str(i), created_at="2024-01-13T12:09:00",
+                     updated_at="2024-01-13T12:09:00", email="a@b.c"))
+        self.expected = {key: obj.to_dict() for key, obj
+                         in FileStorage(self.path).all().items()}
+
+    def reloaded(self):
+        FileStorage._FileStorage__objects.clear()
+        fs = FileStorage(self.path)
+        fs.reload()
+        return {key: obj.to_dict() for key, obj in fs.all().items()}
+
+    def test_save_and_reload(self):
+        for codec in ("gzip", "lzma", "zlib"):
+            for serializer in ("json", "binary"):
+                fs = FileStorage(self.path, serializer=serializer,
+                                 compression=codec, fsync=False)
+                fs.save()
+                with open(self.path, "rb") as raw:
+                    self.assertEqual(compression.detect(raw), codec)
+                self.assertEqual(self.reloaded(), self.expected)
+
+    def test_convert(self):
+        FileStorage(self.path, compression="gzip").save()
+        plain = os.path.join(self.tmp.name, "plain.json")
+        convert(self.path, plain, "json")
+        with open(plain) as file:
+            self.assertEqual(json.load(file), self.expected)
+        convert(plain, self.path, "binary", "lzma")
+        self.assertEqual(self.reloaded(), self.expected)
+
+    def test_unknown_codec(self):
+        with self.assertRaises(ValueError):
+            FileStorage(self.path, compression="zip")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,142 @@
+#!/usr/bin/python3
+"""This module contains Tests for the DBStorage class"""
+
+from models.engine.db_storage import DBStorage
+from models.place import Place
+from models.review import Review
+from models.user import User
+from unittest.mock import patch
+import models
+import os
+import sqlite3
+import tempfile
+import unittest
+
+DATE = "2024-01-13T12:09:00.462348"
+
+
+class TestDBStorage(unittest.TestCase):
+    """Test the SQLite storage engine"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "hbnb.db")
+        self.db = DBStorage(self.path)
+        self.db.reload()
+        self.patcher = patch("models.storage", self.db)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+        self.db.close()
+        self.tmp.cleanup()
+
+    def reopen(self):
+        self.db.close()
+        self.db = DBStorage(self.path)
+        self.db.reload()
+        return self.db
+
+    def test_tables_and_indexes(self):
+        conn = sqlite3.connect(self.path)
+        tables = {row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table'")}
+        indexes = {row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index'")}
+        conn.close()
+        self.assertTrue({"BaseModel", "User", "Place", "Review"} <= tables)
+        self.assertIn("Review_place_id", indexes)
+        self.assertIn("Review_user_id", indexes)
+        self.assertIn("City_state_id", indexes)
+        self.assertIn("Place_city_id", indexes)
+
+    def test_new_save_reload(self):
+        place = Place(id="p1", created_at=DATE, updated_at=DATE)
+        place.name = "Loft"
+        place.amenity_ids = ["a1", "a2"]
+        place.color = "blue"
+        self.db.new(place)
+        self.db.save()
+
+        db = self.reopen()
+        loaded = db.all()["Place.p1"]
+        self.assertIsNot(loaded, place)
+        self.assertEqual(loaded.to_dict(), place.to_dict())
+
+    def test_get(self):
+        self.db.new(User(id="u1", created_at=DATE, updated_at=DATE))
+        self.db.save()
+        db = self.reopen()
+        user = db.get(User, "u1")
+        self.assertIsInstance(user, models.classes["User"])
+        self.assertIs(db.get("User", "u1"), user)
+        self.assertIsNone(db.get(User, "missing"))
+        self.assertIsNone(db.get("MyModel", "u1"))
+
+    def test_all_and_count_by_class(self):
+        self.db.new(User(id="u1", created_at=DATE, updated_at=DATE))
+        self.db.new(Review(id="r1", created_at=DATE, updated_at=DATE))
+        self.db.new(Review(id="r2", created_at=DATE, updated_at=DATE))
+        self.assertEqual(self.db.count(), 3)
+        self.assertEqual(self.db.count(Review), 2)
+        # counting writes nothing
+        conn = sqlite3.connect(self.path)
+        self.assertEqual(conn.execute('SELECT COUNT(*) FROM "Review"')
+                         .fetchone()[0], 0)
+        conn.close()
+        self.db.save()
+        self.assertEqual(set(self.reopen().all("Review")),
+                         {"Review.r1", "Review.r2"})
+
+    def test_row_level_writes(self):
+        for i in range(5):
+            self.db.new(User(id=str(i), created_at=DATE, updated_at=DATE))
+        self.db.save()
+        self.assertEqual(self.db.stats()["encoded"], 5)
+        user = self.db.all(User)["User.3"]
+        user.first_name = "Betty"
+        self.db.save()
+        self.assertEqual(self.db.stats()["encoded"], 1)
+        self.assertEqual(self.reopen().all()["User.3"].first_name, "Betty")
+
+    def test_delete(self):
+        user = User(id="u1", created_at=DATE, updated_at=DATE)
+        self.db.new(user)
+        self.db.save()
+        self.db.delete(user)
+        self.assertNotIn("User.u1", self.db.all())
+        self.assertNotIn("User.u1", self.reopen().all())
+
+    def test_transaction(self):
+        user = User(id="u1", created_at=DATE, updated_at=DATE)
+        self.db.new(user)
+        self.db.save()
+        with self.db.transaction():
+            user.first_name = "Betty"
+            user.save()
+            self.db.new(User(id="u2", created_at=DATE, updated_at=DATE))
+            self.db.save()
+            self.assertEqual(self.db.stats()["encoded"], 1)
+        self.assertEqual(self.db.stats()["encoded"], 2)
+
+        with self.assertRaises(ValueError):
+            with self.db.batch():
+                user.first_name = "John"
+                self.db.new(User(id="u3", created_at=DATE, updated_at=DATE))
+                self.db.delete(self.db.all()["User.u2"])
+                raise ValueError("boom")
+        self.assertEqual(user.first_name, "Betty")
+        self.assertEqual(set(self.db.all(User)), {"User.u1", "User.u2"})
+
+        with self.db.transaction():
+            self.db.new(User(id="u3", created_at=DATE, updated_at=DATE))
+            self.db.delete(self.db.get(User, "u2"))
+            self.assertEqual(self.db.count(User), 2)
+            self.assertEqual(set(self.db.all(User)), {"User.u1", "User.u3"})
+            self.assertIsNone(self.db.get(User, "u2"))
+        self.assertEqual(self.db.count(User), 2)
+        self.assertEqual(self.reopen().all()["User.u1"].first_name, "Betty")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,10 +3,16 @@
 
 from models.base_model import BaseModel
 from models.engine.file_storage import FileStorage
+from models.user import User
 from models import storage
+from tests.storage_case import StorageTestCase
 import json
+import models
 import os
+import threading
+import time
 import unittest
+from unittest.mock import patch
 
 
 class TestFileStorage(unittest.TestCase):
@@ -78,10 +84,624 @@ class TestFileStorage(unittest.TestCase):
             self.assertEqual(dict_obj[key].to_dict(),
                              storage.all()[key].to_dict())
 
+    def test_reload_uses_class_registry(self):
+        my_user = User()
+        my_user.save()
+        with patch("builtins.eval", side_effect=AssertionError):
+            FileStorage._FileStorage__objects.clear()
+            storage.reload()
+        key = "User." + my_user.id
+        self.assertIsInstance(storage.all()[key], models.classes["User"])
+        self.assertEqual(storage.all()[key].to_dict(), my_user.to_dict())
+
     def testSaveSelf(self):
         with self.assertRaises(TypeError) as e:
             FileStorage.save(self, 100)
 
 
+class TestFileStorageDirtyTracking(StorageTestCase):
+    """Test that FileStorage only re-encodes changed objects"""
+
+    def setUp(self):
+        super().setUp()
+        self.users = []
+        for i in range(5):
+            user = User(id=str(i), created_at="2024-01-13T12:09:00.462348",
+                        updated_at="2024-01-13T12:09:00.462348")
+            self.fs.new(user)
+            self.users.append(user)
+
+    def test_only_dirty_objects_encoded(self):
+        self.fs.save()
+        self.assertEqual(self.fs.stats()["encoded"], 5)
+        self.fs.save()
+        self.assertEqual(self.fs.stats()["encoded"], 0)
+        self.users[2].first_name = "Betty"
+        self.fs.save()
+        self.assertEqual(self.fs.stats()["encoded"], 1)
+
+    def test_reload_keeps_fragments(self):
+        self.fs.save()
+        FileStorage._FileStorage__objects.clear()
+        fs = FileStorage(self.path)
+        fs.reload()
+        fs.save()
+        self.assertEqual(fs.stats()["encoded"], 0)
+        self.assertEqual(fs.stats()["fragment_hits"], 5)
+        fs.all()["User.2"].first_name = "Betty"
+        fs.save()
+        self.assertEqual(fs.stats()["fragment_misses"], 1)
+        self.assertEqual(fs.stats()["fragment_hits"], 9)
+        with open(self.path) as file:
+            self.assertEqual(json.load(file), {
+                key: obj.to_dict() for key, obj in fs.all().items()})
+
+    def test_typed_values_written(self):
+        """the numbers from_dict() types are saved with their type"""
+        for lazy in (False, True):
+            with open(self.path, "w") as file:
+                json.dump({"Place.p": {
+                    "id": "p", "__class__": "Place", "price_by_night": "120",
+                    "number_rooms": "many", "latitude": 1.5,
+                    "created_at": "2024-01-13T12:09:00.462348",
+                    "updated_at": "2024-01-13T12:09:00.462348"}}, file)
+            FileStorage._FileStorage__objects.clear()
+            fs = FileStorage(self.path, lazy=lazy)
+            fs.reload()
+            self.assertEqual(fs.get("Place", "p").price_by_night, 120)
+            fs.new(BaseModel(id="b", created_at="2024-01-13T12:09:00.462348",
+                             updated_at="2024-01-13T12:09:00.462348"))
+            fs.save()
+            with open(self.path) as file:
+                saved = json.load(file)["Place.p"]
+            self.assertEqual(saved["price_by_night"], 120)
+            self.assertEqual(saved["number_rooms"], "many")
+            # values kept as read keep their fragment
+            fs.save()
+            self.assertEqual(fs.stats()["encoded"], 0)
+
+    def test_all_and_count_by_class(self):
+        self.fs.new(BaseModel(id="b", created_at="2024-01-13T12:09:00.462348",
+                              updated_at="2024-01-13T12:09:00.462348"))
+        self.assertEqual(self.fs.count(), 6)
+        self.assertEqual(self.fs.count(User), 5)
+        self.assertEqual(self.fs.count("BaseModel"), 1)
+        self.assertEqual(self.fs.count("Review"), 0)
+        self.assertEqual(set(self.fs.all("User")),
+                         {f"User.{i}" for i in range(5)})
+        self.assertIs(self.fs.all(BaseModel)["BaseModel.b"],
+                      self.fs.all()["BaseModel.b"])
+
+        self.fs.delete(self.users[0])
+        self.assertEqual(self.fs.count(User), 4)
+        self.assertNotIn("User.0", self.fs.all(User))
+
+    def test_reload_rebuilds_class_index(self):
+        self.fs.save()
+        FileStorage._FileStorage__objects.clear()
+        self.fs.reload()
+        self.assertEqual(self.fs.count(User), 5)
+        # the index is keyed by the id strings of the objects themselves
+        for obj_id, obj in FileStorage._FileStorage__by_class["User"].items():
+            self.assertIs(obj_id, obj.id)
+
+    def test_binary_serializer(self):
+        fs = FileStorage(self.path, serializer="binary")
+        self.users[2].first_name = "Betty"
+        fs.save()
+        with open(self.path, "rb") as file:
+            self.assertEqual(file.read(4), b"HBNB")
+        expected = {key: obj.to_dict() for key, obj in fs.all().items()}
+        FileStorage._FileStorage__objects.clear()
+        FileStorage(self.path).reload()
+        self.assertEqual(
+            {key: obj.to_dict() for key, obj in fs.all().items()}, expected)
+
+        # switching format re-encodes everything in the other format
+        self.fs.save()
+        with open(self.path) as file:
+            self.assertEqual(json.load(file), expected)
+
+    def test_file_matches_full_dump(self):
+        self.fs.save()
+        self.users[2].first_name = "Betty"
+        self.fs.delete(self.users[3])
+        with open(self.path) as file:
+            saved = json.load(file)
+        expected = {key: obj.to_dict() for key, obj in self.fs.all().items()}
+        self.assertEqual(saved, expected)
+        self.assertNotIn("User.3", saved)
+        self.assertEqual(saved["User.2"]["first_name"], "Betty")
+
+
+class TestFileStorageTransaction(StorageTestCase):
+    """Test the transaction/batch context manager of FileStorage"""
+
+    def setUp(self):
+        super().setUp()
+        self.user = User(id="1", created_at="2024-01-13T12:09:00.462348",
+                         updated_at="2024-01-13T12:09:00.462348")
+        self.user.first_name = "Betty"
+        self.fs.new(self.user)
+        self.fs.save()
+
+    def saved(self):
+        with open(self.path) as file:
+            return json.load(file)
+
+    def test_single_write_on_exit(self):
+        with patch("models.storage", self.fs):
+            with self.fs.transaction():
+                for i in range(2, 5):
+                    user = User(id=str(i),
+                                created_at="2024-01-13T12:09:00.462348",
+                                updated_at="2024-01-13T12:09:00.462348")
+                    self.fs.new(user)
+                    user.save()
+                    self.assertNotIn(f"User.{i}", self.saved())
+                with self.fs.batch():
+                    self.user.last_name = "Holberton"
+                    self.user.save()
+                self.assertNotIn("last_name", self.saved()["User.1"])
+        saved = self.saved()
+        self.assertEqual(len(saved), 4)
+        self.assertEqual(saved["User.1"]["last_name"], "Holberton")
+
+    def test_rollback_on_exception(self):
+        other = User(id="2", created_at="2024-01-13T12:09:00.462348",
+                     updated_at="2024-01-13T12:09:00.462348")
+        self.fs.new(other)
+        self.fs.save()
+        with patch("models.storage", self.fs):
+            with self.assertRaises(ValueError):
+                with self.fs.transaction():
+                    self.user.first_name = "John"
+                    self.user.save()
+                    self.fs.new(User(id="3",
+                                     created_at="2024-01-13T12:09:00.462348",
+                                     updated_at="2024-01-13T12:09:00.462348"))
+                    self.fs.delete(other)
+                    raise ValueError("boom")
+        self.assertEqual(self.user.first_name, "Betty")
+        self.assertEqual(set(self.fs.all(User)), {"User.1", "User.2"})
+        self.assertEqual(set(self.saved()), {"User.1", "User.2"})
+        self.fs.save()
+        self.assertEqual(self.saved()["User.1"]["first_name"], "Betty")
+
+
+class TestFileStorageWriteBehind(StorageTestCase):
+    """Test the background flush thread of FileStorage"""
+
+    options = {"flush_interval": 50}
+
+    def setUp(self):
+        super().setUp()
+        self.user = User(id="1", created_at="2024-01-13T12:09:00.462348",
+                         updated_at="2024-01-13T12:09:00.462348")
+        self.fs.new(self.user)
+
+    def tearDown(self):
+        self.fs.close()
+        super().tearDown()
+
+    def saved(self):
+        with open(self.path) as file:
+            return json.load(file)
+
+    def test_burst_of_saves_coalesced(self):
+        for i in range(1000):
+            self.user.first_name = str(i)
+            self.fs.save()
+        self.fs.close()
+        self.assertLess(self.fs.stats()["writes"], 20)
+        self.assertEqual(self.saved()["User.1"]["first_name"], "999")
+
+    def test_flush_is_immediate(self):
+        self.user.first_name = "Betty"
+        self.fs.save()
+        self.fs.flush()
+        self.assertEqual(self.saved()["User.1"]["first_name"], "Betty")
+
+    def test_background_thread_writes(self):
+        self.fs.save()
+        for i in range(100):
+            if self.fs.stats()["writes"]:
+                break
+            time.sleep(0.01)
+        self.assertIn("User.1", self.saved())
+
+    def test_close_stops_thread(self):
+        self.fs.save()
+        self.fs.close()
+        self.assertIsNone(self.fs._FileStorage__flusher)
+        self.assertIn("User.1", self.saved())
+
+    def test_write_between_touch_and_set(self):
+        touch = self.fs.touch
+        written = []
+
+        def racing(obj):
+            touch(obj)
+            if not written:
+                # the background thread writes before the value is set
+                written.append(obj)
+                self.fs.flush()
+        with patch("models.storage", self.fs), \
+                patch.object(self.fs, "touch", side_effect=racing):
+            self.user.first_name = "new"
+        self.assertNotIn("first_name", self.saved()["User.1"])
+        self.fs.save()
+        self.fs.close()
+        self.assertEqual(self.saved()["User.1"]["first_name"], "new")
+
+    def test_no_write_inside_transaction(self):
+        self.fs.flush()
+        with patch("models.storage", self.fs):
+            with self.fs.transaction():
+                self.user.first_name = "Betty"
+                self.fs.flush()
+                self.assertNotIn("first_name", self.saved()["User.1"])
+        self.fs.close()
+        self.assertEqual(self.saved()["User.1"]["first_name"], "Betty")
+
+
+class TestFileStorageDurability(StorageTestCase):
+    """Test atomic writes, fsync accounting and group commit"""
+
+    def setUp(self):
+        super().setUp()
+        self.user = User(id="1", created_at="2024-01-13T12:09:00.462348",
+                         updated_at="2024-01-13T12:09:00.462348")
+        self.fs.new(self.user)
+        self.fs.save()
+
+    def saved(self):
+        with open(self.path) as file:
+            return json.load(file)
+
+    def test_no_temp_file_left(self):
+        self.assertEqual(os.listdir(self.tmp.name), ["file.json"])
+
+    def test_failed_write_keeps_old_file(self):
+        self.user.first_name = "Betty"
+        with patch("os.replace", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                self.fs.save()
+        self.assertNotIn("first_name", self.saved()["User.1"])
+
+    def test_fsync_stats(self):
+        stats = self.fs.stats()
+        self.assertEqual(stats["fsyncs"], 1)
+        self.assertGreaterEqual(stats["fsync_ms"], 0)
+        self.assertGreaterEqual(stats["fsync_total_ms"], stats["fsync_ms"])
+
+        fs = FileStorage(self.path, fsync=False)
+        fs.save()
+        self.assertEqual(fs.stats()["fsyncs"], 0)
+
+    def test_group_commit(self):
+        fs = FileStorage(self.path, group_commit=True)
+        real_fsync = os.fsync
+
+        def slow_fsync(fd):
+            time.sleep(0.02)
+            real_fsync(fd)
+
+        with patch("os.fsync", side_effect=slow_fsync):
+            threads = [threading.Thread(target=fs.save) for i in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertLess(fs.stats()["writes"], 8)
+        self.assertIn("User.1", self.saved())
+
+
+class TestFileStorageSharded(StorageTestCase):
+    """Test the per-class sharded layout of FileStorage"""
+
+    options = {"sharded": True}
+
+    def setUp(self):
+        super().setUp()
+        self.users = []
+        for i in range(4):
+            user = User(id=str(i), created_at="2024-01-13T12:09:00.462348",
+                        updated_at="2024-01-13T12:09:00.462348")
+            self.fs.new(user)
+            self.users.append(user)
+        self.fs.new(BaseModel(id="b", created_at="2024-01-13T12:09:00.462348",
+                              updated_at="2024-01-13T12:09:00.462348"))
+
+    def test_one_file_per_class(self):
+        self.fs.save()
+        self.assertEqual(sorted(os.listdir(self.tmp.name)),
+                         ["file.BaseModel.json", "file.User.json"])
+        with open(os.path.join(self.tmp.name, "file.User.json")) as file:
+            self.assertEqual(len(json.load(file)), 4)
+
+    def test_only_dirty_shards_rewritten(self):
+        self.fs.save()
+        self.users[1].first_name = "Betty"
+        self.fs.save()
+        self.assertEqual(self.fs.stats()["writes"], 3)
+        self.assertEqual(self.fs.stats()["encoded"], 1)
+
+    def test_buckets(self):
+        fs = FileStorage(self.path, sharded=True, buckets=4)
+        fs.save()
+        names = os.listdir(self.tmp.name)
+        self.assertTrue(all(name.startswith(("file.User.",
+                                             "file.BaseModel."))
+                            for name in names))
+        self.users[1].first_name = "Betty"
+        before = fs.stats()["writes"]
+        fs.save()
+        self.assertEqual(fs.stats()["writes"], before + 1)
+
+        FileStorage._FileStorage__objects.clear()
+        fs.reload()
+        self.assertEqual(fs.count(User), 4)
+        self.assertEqual(fs.all()["User.1"].first_name, "Betty")
+
+    def test_buckets_changed(self):
+        self.fs.save()
+        fs = FileStorage(self.path, sharded=True, buckets=4)
+        fs.delete(self.users[0])
+        names = sorted(os.listdir(self.tmp.name))
+        self.assertNotIn("file.User.json", names)
+        self.assertIn("file.BaseModel.json", names)
+
+        FileStorage._FileStorage__objects.clear()
+        fs.reload()
+        self.assertEqual(sorted(fs.all(User)),
+                         ["User.1", "User.2", "User.3"])
+
+    def test_corrupt_shard_skipped(self):
+        self.fs.save()
+        with open(os.path.join(self.tmp.name, "file.BaseModel.json"),
+                  "w") as file:
+            file.write("{nope")
+        FileStorage._FileStorage__objects.clear()
+        self.fs.reload()
+        self.assertEqual(self.fs.count(User), 4)
+
+    def test_reload_some_classes(self):
+        self.fs.save()
+        FileStorage._FileStorage__objects.clear()
+        self.fs.reload(["User"])
+        self.assertEqual(self.fs.count(), 4)
+        self.assertEqual(self.fs.count(BaseModel), 0)
+
+    def test_save_after_partial_reload(self):
+        for buckets in (1, 3):
+            fs = FileStorage(self.path, sharded=True, buckets=buckets)
+            fs.save()
+            FileStorage._FileStorage__objects.clear()
+            fs.reload(["BaseModel"])
+            self.assertEqual(fs.count(User), 0)
+            fs.new(User(id="new", created_at="2024-01-13T12:09:00.462348",
+                        updated_at="2024-01-13T12:09:00.462348"))
+            fs.save()
+            FileStorage._FileStorage__objects.clear()
+            fs.reload()
+            self.assertEqual(sorted(fs.all(User)),
+                             ["User.0", "User.1", "User.2", "User.3",
+                              "User.new"])
+            fs.delete(fs.get(User, "new"))
+            fs.save()
+
+    def test_log_mode_rejected(self):
+        with self.assertRaises(ValueError):
+            FileStorage(self.path, sharded=True, log_mode=True)
+
+
+class TestFileStorageLazy(StorageTestCase):
+    """Test the lazy materialization mode of FileStorage"""
+
+    options = {"lazy": True}
+
+    def setUp(self):
+        super().setUp()
+        records = {}
+        for i in range(3):
+            records[f"User.{i}"] = {
+                "id": str(i), "__class__": "User", "first_name": str(i),
+                "created_at": "2024-01-13T12:09:00.462348",
+                "updated_at": "2024-01-13T12:09:00.462348"}
+        records["BaseModel.b"] = {
+            "id": "b", "__class__": "BaseModel",
+            "created_at": "2024-01-13T12:09:00.462348",
+            "updated_at": "2024-01-13T12:09:00.462348"}
+        with open(self.path, "w") as file:
+            json.dump(records, file)
+        self.fs.reload()
+
+    def test_reload_builds_nothing(self):
+        self.assertEqual(FileStorage._FileStorage__objects, {})
+        self.assertEqual(self.fs.count(), 4)
+        self.assertEqual(self.fs.count(User), 3)
+        # only the text of the records is kept, not a parsed copy
+        raw = FileStorage._FileStorage__raw["User"]["1"]
+        self.assertEqual(raw[0], "json")
+        self.assertIs(raw[1], FileStorage._FileStorage__fragments[
+            "json"]["User.1"])
+
+    def test_binary_file(self):
+        self.fs.all()
+        FileStorage(self.path, serializer="binary").save()
+        FileStorage._FileStorage__objects.clear()
+        self.fs.reload()
+        self.assertEqual(FileStorage._FileStorage__raw["User"]["2"][0],
+                         "binary")
+        self.assertEqual(self.fs.get(User, "2").first_name, "2")
+        # written as JSON again from the binary fragments
+        self.fs.save()
+        with open(self.path) as file:
+            self.assertEqual(json.load(file)["User.0"]["first_name"], "0")
+
+    def test_get_builds_one(self):
+        user = self.fs.get(User, "1")
+        self.assertIsInstance(user, models.classes["User"])
+        self.assertEqual(user.first_name, "1")
+        self.assertIs(self.fs.get("User", "1"), user)
+        self.assertEqual(list(FileStorage._FileStorage__objects),
+                         ["User.1"])
+        self.assertIsNone(self.fs.get(User, "missing"))
+
+    def test_build_under_lock(self):
+        """a record leaves __raw only once its object is in __objects"""
+        lock = FileStorage._FileStorage__lock
+        raw = FileStorage._FileStorage__raw
+        cls = models.classes["User"]
+        from_dict = cls.from_dict
+        seen = []
+
+        def build(record):
+            seen.append((lock._is_owned(), record["id"] in raw["User"]))
+            return from_dict(record)
+
+        with patch.object(cls, "from_dict", side_effect=build):
+            self.fs.get(User, "1")
+            self.fs.all(User)
+        self.assertEqual(seen, [(True, True)] * 3)
+        self.assertNotIn("User", raw)
+        self.assertEqual(len(self.fs.all()), 4)
+
+    def test_all_by_class_builds_class(self):
+        self.assertEqual(len(self.fs.all(User)), 3)
+        self.assertEqual(self.fs.count(User), 3)
+        self.assertNotIn("BaseModel.b", FileStorage._FileStorage__objects)
+        self.assertEqual(len(self.fs.all()), 4)
+
+    def test_save_keeps_unbuilt_records(self):
+        user = self.fs.get(User, "1")
+        user.first_name = "Betty"
+        self.fs.save()
+        # the others reuse the text reload() read them from
+        self.assertEqual(self.fs.stats()["encoded"], 1)
+        with open(self.path) as file:
+            saved = json.load(file)
+        self.assertEqual(len(saved), 4)
+        self.assertEqual(saved["User.1"]["first_name"], "Betty")
+        self.assertEqual(saved["User.2"]["first_name"], "2")
+        self.fs.save()
+        self.assertEqual(self.fs.stats()["encoded"], 0)
+
+
+class TestFileStorageLogMode(StorageTestCase):
+    """Test the write-ahead log mode of FileStorage"""
+
+    options = {"log_mode": True}
+
+    def log_lines(self):
+        with open(self.path + ".log") as file:
+            return [json.loads(line) for line in file]
+
+    def test_save_appends_only_changes(self):
+        u1 = User(id="1", created_at="2024-01-13T12:09:00.462348",
+                  updated_at="2024-01-13T12:09:00.462348")
+        u2 = User(id="2", created_at="2024-01-13T12:09:00.462348",
+                  updated_at="2024-01-13T12:09:00.462348")
+        self.fs.new(u1)
+        self.fs.new(u2)
+        self.fs.save()
+        self.assertEqual(len(self.log_lines()), 2)
+        self.assertFalse(os.path.exists(self.path))
+
+        u1.first_name = "Betty"
+        self.fs.save()
+        lines = self.log_lines()
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(lines[-1]["key"], "User.1")
+        self.assertEqual(lines[-1]["value"]["first_name"], "Betty")
+
+    def test_delete_appends_tombstone(self):
+        u1 = User(id="1", created_at="2024-01-13T12:09:00.462348",
+                  updated_at="2024-01-13T12:09:00.462348")
+        self.fs.new(u1)
+        self.fs.delete(u1)
+        self.assertEqual(self.log_lines()[-1],
+                         {"key": "User.1", "value": None})
+
+    def test_reload_replays_snapshot_and_log(self):
+        u1 = User(id="1", created_at="2024-01-13T12:09:00.462348",
+                  updated_at="2024-01-13T12:09:00.462348")
+        u2 = User(id="2", created_at="2024-01-13T12:09:00.462348",
+                  updated_at="2024-01-13T12:09:00.462348")
+        self.fs.new(u1)
+        self.fs.new(u2)
+        self.fs.compact()
+        self.assertTrue(os.path.exists(self.path))
+        self.assertFalse(os.path.exists(self.path + ".log"))
+
+        u1.first_name = "Betty"
+        self.fs.delete(u2)
+        with open(self.path + ".log", "a") as file:
+            file.write('{"key": "User.3", "val')
+
+        FileStorage._FileStorage__objects.clear()
+        FileStorage(self.path, log_mode=True).reload()
+        objs = self.fs.all()
+        self.assertEqual(list(objs.keys()), ["User.1"])
+        self.assertEqual(objs["User.1"].first_name, "Betty")
+
+    def test_torn_record_truncated(self):
+        self.fs.new(User(id="1", created_at="2024-01-13T12:09:00",
+                         updated_at="2024-01-13T12:09:00"))
+        self.fs.save()
+        with open(self.path + ".log", "a") as file:
+            file.write('{"key": "User.3", "val')
+
+        # first restart, then a save after the crash
+        FileStorage._FileStorage__objects.clear()
+        fs = FileStorage(self.path, log_mode=True)
+        fs.reload()
+        self.assertEqual(len(self.log_lines()), 1)
+        fs.new(User(id="2", created_at="2024-01-13T12:09:00",
+                    updated_at="2024-01-13T12:09:00"))
+        fs.save()
+
+        # second restart
+        FileStorage._FileStorage__objects.clear()
+        fs = FileStorage(self.path, log_mode=True)
+        fs.reload()
+        self.assertEqual(fs.count(User), 2)
+        self.assertEqual(len(self.log_lines()), 2)
+
+    def test_corrupt_snapshot_replays_log(self):
+        with open(self.path, "w") as file:
+            file.write("{nope")
+        self.fs.new(User(id="1", created_at="2024-01-13T12:09:00",
+                         updated_at="2024-01-13T12:09:00"))
+        self.fs.save()
+        FileStorage._FileStorage__objects.clear()
+        FileStorage(self.path, log_mode=True).reload()
+        self.assertEqual(self.fs.count(User), 1)
+
+    def test_compact_reuses_log_fragments(self):
+        for i in range(2):
+            self.fs.new(User(id=str(i), created_at="2024-01-13T12:09:00",
+                             updated_at="2024-01-13T12:09:00"))
+        self.fs.save()
+        self.fs.compact()
+        self.assertEqual(self.fs.stats()["fragment_misses"], 2)
+        self.assertEqual(self.fs.stats()["fragment_hits"], 2)
+        with open(self.path) as file:
+            self.assertEqual(set(json.load(file)), {"User.0", "User.1"})
+
+    def test_auto_compact(self):
+        fs = FileStorage(self.path, log_mode=True, compact_after=3)
+        u1 = User(id="1", created_at="2024-01-13T12:09:00.462348",
+                  updated_at="2024-01-13T12:09:00.462348")
+        fs.new(u1)
+        for i in range(3):
+            u1.first_name = str(i)
+            fs.save()
+        self.assertFalse(os.path.exists(self.path + ".log"))
+        with open(self.path) as file:
+            self.assertIn("User.1", json.load(file))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,126 @@
+#!/usr/bin/python3
+"""This module contains Tests for the predicate query API of storage"""
+
+from models.engine.db_storage import DBStorage
+from models.engine.query import Query, parse
+from models.place import Place
+from models.user import User
+from tests.storage_case import StorageTestCase
+import os
+import tempfile
+import unittest
+
+DATE = "2024-01-13T12:09:00"
+
+
+def place(obj_id, price, rooms, name=""):
+    """return a Place with the given id, price, rooms and name"""
+    return Place(id=obj_id, created_at=DATE, updated_at=DATE,
+                 price_by_night=price, number_rooms=rooms, name=name)
+
+
+class TestQuery(StorageTestCase):
+    """Test storage.query() on FileStorage"""
+
+    def setUp(self):
+        super().setUp()
+        for i in range(6):
+            self.fs.new(place(str(i), i * 50, i % 3, f"place {i % 2}"))
+        self.fs.new(User(id="u", created_at=DATE, updated_at=DATE))
+
+    def ids(self, query):
+        return sorted(obj.id for obj in query)
+
+    def test_parse(self):
+        self.assertEqual(parse("price_by_night__lt"), ("price_by_night", "lt"))
+        self.assertEqual(parse("name"), ("name", "eq"))
+        self.assertEqual(parse("city__id"), ("city__id", "eq"))
+
+    def test_filter(self):
+        query = self.fs.query(Place)
+        self.assertIsInstance(query, Query)
+        self.assertEqual(self.ids(query), ["0", "1", "2", "3", "4", "5"])
+        self.assertEqual(self.ids(query.filter(price_by_night__lt=150,
+                                               name="place 1")), ["1"])
+        self.assertEqual(self.ids(query.filter(name__in=["place 0"])),
+                         ["0", "2", "4"])
+        self.assertEqual(self.ids(query.filter(name__gt=3)), [])
+        self.assertEqual(self.ids(query.filter(missing=1)), [])
+        self.assertEqual(query.filter(number_rooms=1).count(), 2)
+
+    def test_order_and_limit(self):
+        query = self.fs.query("Place")
+        self.assertEqual([obj.id for obj in query.order_by(
+            "-price_by_night").limit(2)], ["5", "4"])
+        self.assertEqual([obj.id for obj in query.order_by(
+            "number_rooms", "-price_by_night").all()],
+            ["3", "0", "4", "1", "5", "2"])
+        self.assertEqual(query.order_by("price_by_night").first().id, "0")
+        self.assertEqual(query.limit(2).count(), 2)
+        self.assertIsNone(query.filter(name="none").first())
+
+    def test_explain(self):
+        query = self.fs.query(Place)
+        self.assertEqual(query.explain(), "scan: Place")
+        self.assertEqual(query.filter(id="3", name="x").explain(),
+                         "id: Place.3\nfilter: name__eq")
+        self.assertEqual(query.filter(price_by_night__lt=100, name="x")
+                         .order_by("-name").limit(3).explain(),
+                         "columns: price_by_night__lt\nfilter: name__eq\n"
+                         "order by: -name\nlimit: 3")
+        self.assertEqual(query.filter(price_by_night="50").explain(),
+                         "scan: Place\nfilter: price_by_night__eq")
+
+    def test_paths_agree(self):
+        query = self.fs.query(Place)
+        self.assertEqual(self.ids(query.filter(id="3", number_rooms=0)),
+                         ["3"])
+        self.assertEqual(self.ids(query.filter(id="3", number_rooms=1)), [])
+        self.assertEqual(self.ids(query.filter(id="u")), [])
+        repeated = query.filter(price_by_night__lt=100).filter(
+            price_by_night__lt=200)
+        self.assertEqual(repeated.explain(), "columns: price_by_night__lt\n"
+                         "filter: price_by_night__lt")
+        self.assertEqual(self.ids(repeated), ["0", "1"])
+        self.assertEqual(self.ids(query.filter(price_by_night__ne=50).filter(
+            price_by_night__ne=150)), ["0", "2", "4", "5"])
+        self.fs.all()["Place.4"].price_by_night = 10
+        self.assertEqual(self.ids(query.filter(price_by_night__le=50)),
+                         ["0", "1", "4"])
+
+    def test_order_with_text_values(self):
+        """values that are not numbers come last on every path"""
+        rooms = {"0": 3, "1": 1, "2": "many", "3": 0, "4": 2, "5": 5}
+        for obj_id, value in rooms.items():
+            self.fs.get(Place, obj_id).number_rooms = value
+        query = self.fs.query(Place)
+        for order, expected in [("number_rooms", "3 1 4 0 5 2"),
+                                ("-number_rooms", "5 0 4 1 3 2")]:
+            for ordered, path in [
+                    (query.order_by(order), "scan"),
+                    (query.filter(price_by_night__ge=0).order_by(order),
+                     "columns"),
+                    (query.order_by(order).limit(6), "range")]:
+                self.assertEqual(ordered.explain().split(":")[0], path)
+                self.assertEqual(" ".join(obj.id for obj in ordered),
+                                 expected, path)
+
+
+class TestDBStorageQuery(unittest.TestCase):
+    """Test storage.query() on DBStorage"""
+
+    def test_scan(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            db = DBStorage(os.path.join(tmp, "hbnb.db"))
+            db.reload()
+            for i in range(3):
+                db.new(place(str(i), i * 50, i))
+            query = db.query(Place).filter(price_by_night__ge=50)
+            self.assertEqual(query.explain(), "scan: Place\n"
+                             "filter: price_by_night__ge")
+            self.assertEqual(sorted(obj.id for obj in query), ["1", "2"])
+            db.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,161 @@
+#!/usr/bin/python3
+"""This module contains Tests for the sorted index of numeric fields"""
+
+from models.engine.query import interval, matches
+from models.engine.ranges import Ranges, bounds
+from models.place import Place
+from tests.storage_case import StorageTestCase
+from unittest import mock
+import random
+import unittest
+
+DATE = "2024-01-13T12:09:00"
+
+
+def place(obj_id, price, guests=0, city_id=""):
+    """return a Place with the given id, price, guests and city"""
+    return Place(id=obj_id, created_at=DATE, updated_at=DATE,
+                 price_by_night=price, max_guest=guests, city_id=city_id)
+
+
+class TestRanges(unittest.TestCase):
+    """Test the Ranges class on its own"""
+
+    def setUp(self):
+        self.ranges = Ranges(["price_by_night", "max_guest"])
+        self.places = {str(i): place(str(i), (i * 37) % 10, i)
+                       for i in range(10)}
+        self.ranges.build("price_by_night", self.places.items())
+
+    def test_bounds(self):
+        self.assertEqual(bounds([("ge", 2), ("lt", 5), ("gt", 2)]),
+                         (2.0, True, 5.0, True))
+        self.assertEqual(bounds([("eq", 3), ("le", 4)]),
+                         (3.0, False, 3.0, False))
+        self.assertEqual(bounds([]), (None, False, None, False))
+        self.assertEqual(interval(*bounds([("gt", 1)])), "(1.0, inf)")
+        self.assertEqual(interval(*bounds([("le", 1)])), "(-inf, 1.0]")
+
+    def test_ids_and_count(self):
+        ids = list(self.ranges.ids("price_by_night"))
+        self.assertEqual([self.places[i].price_by_night for i in ids],
+                         list(range(10)))
+        self.assertEqual(list(self.ranges.ids("price_by_night", 2, False,
+                                              5, True)), ["6", "9", "2"])
+        self.assertEqual(list(self.ranges.ids("price_by_night", 2, True,
+                                              5, False, reverse=True)),
+                         ["5", "2", "9"])
+        self.assertEqual(self.ranges.count("price_by_night", 8), 2)
+        self.assertEqual(self.ranges.count("price_by_night", 5, False, 4),
+                         0)
+        self.assertTrue(self.ranges.built("price_by_night"))
+        self.assertFalse(self.ranges.built("max_guest"))
+        with self.assertRaises(ValueError):
+            self.ranges.build("name", [])
+
+    def test_put_and_discard(self):
+        self.places["0"].price_by_night = 4
+        self.ranges.put("0", self.places["0"])
+        self.ranges.put("1", place("1", "cheap"))
+        self.ranges.put("10", place("10", 4))
+        self.ranges.discard("2")
+        self.ranges.discard("missing")
+        self.assertEqual(list(self.ranges.ids("price_by_night", 4, False,
+                                              4, False)), ["0", "10"])
+        self.assertEqual(list(self.ranges.ids("price_by_night"))[-1], "1")
+        self.assertEqual(self.ranges.count("price_by_night"), 9)
+        self.ranges.put("1", place("1", 100))
+        self.assertEqual(list(self.ranges.ids("price_by_night", 50)), ["1"])
+
+    def test_random_changes(self):
+        generator = random.Random(3)
+        prices = {}
+        for step in range(2000):
+            obj_id = str(generator.randrange(50))
+            if generator.random() < 0.2:
+                self.ranges.discard(obj_id)
+                prices.pop(obj_id, None)
+            else:
+                prices[obj_id] = generator.randrange(20)
+                self.ranges.put(obj_id, place(obj_id, prices[obj_id]))
+        self.places.clear()
+        expected = sorted(obj_id for obj_id, price in prices.items()
+                          if 5 <= price < 12)
+        self.assertEqual(sorted(self.ranges.ids("price_by_night", 5, False,
+                                                12, True)), expected)
+        ids = [i for i in self.ranges.ids("price_by_night") if i in prices]
+        self.assertEqual([prices[i] for i in ids], sorted(prices.values()))
+
+
+class TestFileStorageRanges(StorageTestCase):
+    """Test the range index of FileStorage and the query paths using it"""
+
+    def setUp(self):
+        super().setUp()
+        self.places = [place(str(i), (i * 7) % 100, i % 5, f"c{i % 2}")
+                       for i in range(100)]
+        for obj in self.places:
+            self.fs.new(obj)
+
+    def ids(self, low, high):
+        ranges = self.fs.ranges(Place, "price_by_night")
+        return sorted(ranges.ids("price_by_night", low, False, high, True))
+
+    def test_new_update_delete(self):
+        self.assertEqual(self.ids(0, 3), ["0", "43", "86"])
+        self.fs.new(place("new", 1))
+        with mock.patch("models.storage", self.fs):
+            self.places[43].price_by_night = 50
+        self.fs.delete(self.places[86])
+        self.assertEqual(self.ids(0, 3), ["0", "new"])
+
+    def test_many_changes_sort_again(self):
+        self.assertEqual(self.ids(0, 3), ["0", "43", "86"])
+        ranges = self.fs.ranges(Place, "price_by_night")
+        with mock.patch("models.storage", self.fs):
+            for obj in self.places[:10]:
+                obj.price_by_night = 1
+        with mock.patch.object(Ranges, "build", autospec=True,
+                               side_effect=Ranges.build) as build:
+            self.assertEqual(len(self.ids(0, 3)), 12)
+        build.assert_called_once()
+        self.assertIs(self.fs.ranges(Place, "price_by_night"), ranges)
+
+    def test_query_paths(self):
+        query = self.fs.query(Place)
+        cheap = query.filter(price_by_night__lt=10, max_guest__ge=2)
+        self.assertEqual(cheap.explain(),
+                         "range: Place.price_by_night in (-inf, 10.0)\n"
+                         "filter: max_guest__ge")
+        self.assertEqual(sorted(obj.id for obj in cheap), sorted(
+            obj.id for obj in self.places
+            if obj.price_by_night < 10 and obj.max_guest >= 2))
+        top = query.order_by("-price_by_night").limit(3)
+        self.assertEqual(top.explain(), "range: Place.price_by_night in "
+                         "(-inf, inf) descending\nlimit: 3")
+        self.assertEqual([obj.price_by_night for obj in top], [99, 98, 97])
+        wide = query.filter(price_by_night__ge=10).order_by("price_by_night")
+        self.assertEqual(wide.explain(), "columns: price_by_night__ge\n"
+                         "order by: price_by_night")
+        self.assertEqual([obj.price_by_night for obj in wide],
+                         list(range(10, 100)))
+        city = query.filter(city_id="c1").order_by("price_by_night") \
+            .limit(2)
+        self.assertEqual(city.explain().splitlines()[0],
+                         "foreign key: Place.city_id = c1")
+        self.assertEqual([obj.price_by_night for obj in city], [1, 3])
+
+    def test_same_as_scan(self):
+        generator = random.Random(5)
+        for step in range(20):
+            predicates = {"price_by_night__" + generator.choice(
+                ["lt", "le", "gt", "ge", "eq"]): generator.randrange(100),
+                "max_guest__ne": generator.randrange(5)}
+            query = self.fs.query(Place).filter(**predicates)
+            expected = sorted(obj.id for obj in self.places
+                              if matches(obj, query.predicates))
+            self.assertEqual(sorted(obj.id for obj in query), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
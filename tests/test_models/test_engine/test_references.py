@@ -0,0 +1,161 @@
+#!/usr/bin/python3
+"""This module contains Tests for the foreign-key reverse indexes"""
+
+from models.amenity import Amenity
+from models.city import City
+from models.compact import compact
+from models.engine.db_storage import DBStorage
+from models.engine.file_storage import FileStorage
+from models.engine.references import References, parents
+from models.place import Place
+from models.review import Review
+from models.state import State
+from models.user import User
+from tests.storage_case import StorageTestCase
+from unittest import mock
+import os
+import tempfile
+import unittest
+
+DATE = "2024-01-13T12:09:00"
+
+
+def make(cls, obj_id, **attributes):
+    """return an instance of cls with the given id and attributes"""
+    return cls(id=obj_id, created_at=DATE, updated_at=DATE, **attributes)
+
+
+class TestReferences(unittest.TestCase):
+    """Test the References class on its own"""
+
+    def setUp(self):
+        self.references = References(["city_id", "amenity_ids"])
+        self.references.put("p1", make(Place, "p1", city_id="c1",
+                                       amenity_ids=["a1", "a2"]))
+        self.references.put("p2", make(Place, "p2", city_id="c1"))
+
+    def test_parents(self):
+        self.assertEqual(parents("c1"), ["c1"])
+        self.assertEqual(parents(["a1", 3, ""]), ["a1"])
+        self.assertEqual(parents(None), [])
+
+    def test_ids(self):
+        self.assertEqual(self.references.ids("city_id", "c1"), ["p1", "p2"])
+        self.assertEqual(self.references.ids("amenity_ids", "a2"), ["p1"])
+        self.assertEqual(self.references.ids("city_id", "c2"), [])
+        with self.assertRaises(ValueError):
+            self.references.ids("name", "c1")
+
+    def test_put_and_discard(self):
+        self.references.put("p1", make(Place, "p1", city_id="c2",
+                                       amenity_ids=["a1", "a1"]))
+        self.assertEqual(self.references.ids("city_id", "c1"), ["p2"])
+        self.assertEqual(self.references.ids("amenity_ids", "a2"), [])
+        self.references.discard("p1")
+        self.references.discard("missing")
+        self.assertEqual(len(self.references), 1)
+        self.assertEqual(self.references.ids("amenity_ids", "a1"), [])
+
+
+class TestFileStorageReferences(StorageTestCase):
+    """Test the accessors and that FileStorage keeps the index in step"""
+
+    def setUp(self):
+        super().setUp()
+        self.patch = mock.patch("models.storage", self.fs)
+        self.patch.start()
+        self.state = make(State, "s1")
+        self.cities = [make(City, f"c{i}", state_id="s1") for i in range(2)]
+        self.place = make(Place, "p1", city_id="c0", user_id="u1",
+                          amenity_ids=["a1"])
+        self.user = make(User, "u1")
+        self.review = make(Review, "r1", place_id="p1", user_id="u1")
+        for obj in [self.state, self.place, self.user, self.review,
+                    make(Amenity, "a1")] + self.cities:
+            self.fs.new(obj)
+
+    def tearDown(self):
+        self.patch.stop()
+        super().tearDown()
+
+    def ids(self, objects):
+        return sorted(obj.id for obj in objects)
+
+    def test_accessors(self):
+        self.assertEqual(self.ids(self.state.cities), ["c0", "c1"])
+        self.assertEqual(self.ids(self.cities[0].places), ["p1"])
+        self.assertEqual(self.ids(self.cities[1].places), [])
+        self.assertEqual(self.ids(self.place.reviews), ["r1"])
+        self.assertEqual(self.ids(self.user.reviews), ["r1"])
+        self.assertEqual(self.ids(self.user.places), ["p1"])
+        self.assertEqual(self.ids(self.fs.get(Amenity, "a1").places), ["p1"])
+        self.assertNotIn("cities", State.defaults())
+
+    def test_new_update_delete(self):
+        self.assertEqual(len(self.state.cities), 2)
+        self.fs.new(make(City, "c2", state_id="s1"))
+        self.cities[0].state_id = "s2"
+        self.fs.delete(self.cities[1])
+        self.assertEqual(self.ids(self.state.cities), ["c2"])
+        self.assertEqual(self.ids(self.fs.children(City, "state_id", "s2")),
+                         ["c0"])
+
+    def test_rollback(self):
+        self.assertEqual(len(self.state.cities), 2)
+        with self.assertRaises(KeyError):
+            with self.fs.transaction():
+                self.cities[0].state_id = "s2"
+                raise KeyError
+        self.assertEqual(self.ids(self.state.cities), ["c0", "c1"])
+
+    def test_reload(self):
+        self.assertEqual(len(self.state.cities), 2)
+        self.fs.save()
+        FileStorage._FileStorage__objects.clear()
+        FileStorage(self.path, lazy=True).reload()
+        self.assertEqual(self.ids(self.state.cities), ["c0", "c1"])
+
+    def test_query(self):
+        query = self.fs.query(City).filter(state_id="s1", name="")
+        self.assertEqual(query.explain(),
+                         "foreign key: City.state_id = s1\nfilter: name__eq")
+        self.assertEqual(self.ids(query), ["c0", "c1"])
+        self.assertEqual(self.ids(self.fs.query(Place).filter(
+            amenity_ids="a1")), ["p1"])
+        # the same on the id path, where the predicate is checked on p1
+        self.assertEqual(self.ids(self.fs.query(Place).filter(
+            amenity_ids="a1", id="p1")), ["p1"])
+        self.assertEqual(self.ids(self.fs.query(Place).filter(
+            amenity_ids="a2", id="p1")), [])
+
+    def test_compact(self):
+        CompactState = compact(State)
+        self.assertIs(CompactState.cities, State.cities)
+
+
+class TestDBStorageReferences(unittest.TestCase):
+    """Test DBStorage.children()"""
+
+    def test_children(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            db = DBStorage(os.path.join(tmp, "hbnb.db"))
+            db.reload()
+            with mock.patch("models.storage", db):
+                state = make(State, "s1")
+                db.new(state)
+                for i in range(2):
+                    db.new(make(City, f"c{i}", state_id="s1"))
+                db.new(make(Place, "p1", amenity_ids=["a1"]))
+                db.save()
+                db.new(make(City, "c2", state_id="s1"))
+                db.get(City, "c0").state_id = "s2"
+                self.assertEqual(sorted(obj.id for obj in state.cities),
+                                 ["c1", "c2"])
+                self.assertEqual([obj.id for obj in db.children(
+                    Place, "amenity_ids", "a1")], ["p1"])
+                self.assertEqual(db.children("Nope", "state_id", "s1"), [])
+            db.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+#!/usr/bin/python3
+"""This module contains Tests for the storage file serializers"""
+
+from models.base_model import to_isoformat
+from models.engine.serializers import BinarySerializer, JSONSerializer
+from models.engine.serializers import convert, detect
+from unittest import mock
+import io
+import json
+import os
+import tempfile
+import unittest
+
+RECORDS = {
+    "Place.1": {"id": "1", "__class__": "Place", "name": "Loft",
+                "created_at": "2024-01-13T12:09:00.462348",
+                "updated_at": "2024-01-13T12:11:53.552925",
+                "number_rooms": 3, "latitude": 37.77, "amenity_ids": ["a"],
+                "big": 2 ** 70, "flag": True, "nothing": None,
+                "unicode": "Café ☕"},
+    "User.2": {"id": "2", "__class__": "User", "age": "189",
+               "created_at": "2024-01-13T12:09:00",
+               "updated_at": "2024-01-13T12:09:00.000001"},
+}
+
+
+def isoformat(record):
+    """return record with its timestamps turned back to ISO strings"""
+    return {name: to_isoformat(value) if name.endswith("_at")
+            else value for name, value in record.items()}
+
+
+class TestSerializers(unittest.TestCase):
+    """Test the JSON and binary serializers"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def write(self, serializer, path):
+        fragments = [(key, serializer.encode(record))
+                     for key, record in RECORDS.items()]
+        with open(path, "wb" if serializer.binary else "w") as file:
+            serializer.write(file, fragments)
+
+    def read(self, serializer, path):
+        with open(path, "rb" if serializer.binary else "r") as file:
+            return {key: isoformat(record)
+                    for key, record in serializer.read(file)}
+
+    def test_json_matches_json_dump(self):
+        self.write(JSONSerializer(), self.path("file.json"))
+        with open(self.path("file.json")) as file:
+            self.assertEqual(json.load(file), RECORDS)
+
+    def test_json_writes_pair_by_pair(self):
+        serializer = JSONSerializer()
+        fragments = [(key, serializer.encode(record))
+                     for key, record in RECORDS.items()]
+        for pairs in (fragments, []):
+            file = io.StringIO()
+            with mock.patch.object(file, "write", wraps=file.write) as write:
+                serializer.write(file, iter(pairs))
+            self.assertEqual(json.loads(file.getvalue()),
+                             {key: json.loads(fragment)
+                              for key, fragment in pairs})
+            # the document is never joined into one string
+            self.assertEqual(write.call_count, len(pairs) + 2)
+
+    @mock.patch("models.engine.serializers.CHUNK", 7)
+    def test_json_streams_records(self):
+        records = dict(RECORDS, **{'Odd.{"\\x}': {"__class__": "Odd"}})
+        path = self.path("file.json")
+        with open(path, "w") as file:
+            json.dump(records, file, indent=4)
+        with open(path) as file:
+            pairs = JSONSerializer().read(file)
+            self.assertEqual(next(pairs)[0], "Place.1")
+            # only the first record has been read so far
+            self.assertLess(file.tell(), os.path.getsize(path))
+            self.assertEqual(dict(pairs), {key: records[key]
+                                           for key in list(records)[1:]})
+
+    def test_scan_fragments(self):
+        for serializer, name in ((JSONSerializer(), "file.json"),
+                                 (BinarySerializer(), "file.bin")):
+            self.write(serializer, self.path(name))
+            with open(self.path(name),
+                      "rb" if serializer.binary else "r") as file:
+                for key, record, fragment in serializer.scan(file):
+                    self.assertEqual(fragment, serializer.encode(record))
+
+    def test_json_bad_files(self):
+        read = JSONSerializer().read
+        self.assertEqual(list(read(io.StringIO(" { } "))), [])
+        for text in ("", "[]", '{"a": {}', '{"a": {}, "b": {"c"}'):
+            with self.assertRaises(ValueError):
+                list(read(io.StringIO(text)))
+
+    def test_binary_round_trip(self):
+        self.write(BinarySerializer(), self.path("file.bin"))
+        self.assertEqual(self.read(BinarySerializer(), self.path("file.bin")),
+                         RECORDS)
+
+    def test_binary_is_smaller(self):
+        self.write(JSONSerializer(), self.path("file.json"))
+        self.write(BinarySerializer(), self.path("file.bin"))
+        self.assertLess(os.path.getsize(self.path("file.bin")),
+                        os.path.getsize(self.path("file.json")))
+
+    def test_detect(self):
+        self.write(JSONSerializer(), self.path("file.json"))
+        self.write(BinarySerializer(), self.path("file.bin"))
+        with open(self.path("file.json"), "rb") as file:
+            self.assertIsInstance(detect(file), JSONSerializer)
+        with open(self.path("file.bin"), "rb") as file:
+            self.assertIsInstance(detect(file), BinarySerializer)
+
+    def test_convert_both_ways(self):
+        self.write(JSONSerializer(), self.path("file.json"))
+        convert(self.path("file.json"), self.path("file.bin"), "binary")
+        self.assertEqual(self.read(BinarySerializer(), self.path("file.bin")),
+                         RECORDS)
+        convert(self.path("file.bin"), self.path("back.json"), "json")
+        with open(self.path("back.json")) as file:
+            self.assertEqual(json.load(file), RECORDS)
+
+    def test_corrupt_binary(self):
+        self.write(BinarySerializer(), self.path("file.bin"))
+        with open(self.path("file.bin"), "rb") as file:
+            data = file.read()
+        with self.assertRaises(ValueError):
+            list(BinarySerializer().read(io.BytesIO(data[:-3])))
+        with self.assertRaises(ValueError):
+            list(BinarySerializer().read(io.BytesIO(b"nope" + data)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,187 @@
+#!/usr/bin/python3
+"""This module contains Tests for the spatial index of places"""
+
+from console import HBNBCommand
+from io import StringIO
+from models.compact import compact
+from models.engine.db_storage import DBStorage
+from models.engine.spatial import Grid, distance, point, radius_box
+from models.engine.spatial import scan_box, scan_nearest, scan_radius
+from models.place import Place
+from tests.storage_case import StorageTestCase
+from unittest import mock
+import os
+import random
+import tempfile
+import unittest
+
+DATE = "2024-01-13T12:09:00"
+PARIS = (48.8566, 2.3522)
+LONDON = (51.5074, -0.1278)
+
+
+def place(obj_id, latitude, longitude):
+    """return a Place with the given id and coordinates"""
+    return Place(id=obj_id, created_at=DATE, updated_at=DATE,
+                 latitude=latitude, longitude=longitude)
+
+
+class TestGeometry(unittest.TestCase):
+    """Test the distance and box helpers"""
+
+    def test_distance(self):
+        self.assertAlmostEqual(distance(*PARIS, *LONDON), 343.9, delta=0.5)
+        self.assertEqual(distance(*PARIS, *PARIS), 0)
+        self.assertAlmostEqual(distance(0, 179.5, 0, -179.5), 111.2,
+                               delta=0.1)
+
+    def test_point(self):
+        self.assertEqual(point(place("p", 1, 2.5)), (1.0, 2.5))
+        self.assertIsNone(point(place("p", "north", 2)))
+        self.assertIsNone(point(place("p", 91.0, 2)))
+        # the class defaults (0.0) are not coordinates
+        self.assertIsNone(point(Place(id="p", created_at=DATE,
+                                      updated_at=DATE, latitude=1)))
+        CompactPlace = compact(Place)
+        self.assertEqual(point(CompactPlace(
+            id="p", created_at=DATE, updated_at=DATE, latitude=1,
+            longitude=2)), (1.0, 2.0))
+        self.assertIsNone(point(CompactPlace(id="p", created_at=DATE,
+                                             updated_at=DATE)))
+
+    def test_radius_box(self):
+        south, west, north, east = radius_box(0, 179.9, 50)
+        self.assertGreater(west, east)
+        self.assertEqual(radius_box(89.9, 0, 50)[1:4:2], (-180.0, 180.0))
+
+
+class TestGrid(unittest.TestCase):
+    """Test the Grid against the linear scans"""
+
+    def setUp(self):
+        generator = random.Random(7)
+        self.grid = Grid(size=1)
+        self.points = {}
+        for i in range(3000):
+            # dense around Paris, the rest anywhere, poles and 180 included
+            if i % 2:
+                position = (PARIS[0] + generator.uniform(-1, 1),
+                            PARIS[1] + generator.uniform(-1, 1))
+            else:
+                position = (generator.uniform(-90, 90),
+                            generator.uniform(-180, 180))
+            self.points[str(i)] = position
+            self.grid.put(str(i), place(str(i), *position))
+
+    def test_box(self):
+        for box in [(48, 1, 50, 3), (-10, 170, 10, -170), (-90, -180, 90, 180),
+                    (10, 10, 9, 11)]:
+            self.assertEqual(sorted(self.grid.box(*box)),
+                             sorted(scan_box(self.points.items(), *box)))
+
+    def test_radius(self):
+        for latitude, longitude, km in [(*PARIS, 5), (*PARIS, 60),
+                                        (0, 180, 800), (89, 0, 500),
+                                        (-30, 60, 3000)]:
+            self.assertEqual(
+                self.grid.radius(latitude, longitude, km),
+                scan_radius(self.points.items(), latitude, longitude, km))
+
+    def test_nearest(self):
+        for latitude, longitude, k in [(*PARIS, 5), (0, -180, 3),
+                                       (-89, 10, 1), (*LONDON, 4000)]:
+            self.assertEqual(
+                self.grid.nearest(latitude, longitude, k),
+                scan_nearest(self.points.items(), latitude, longitude, k))
+        self.assertEqual(Grid().nearest(*PARIS, 3), [])
+
+    def test_put_and_discard(self):
+        self.grid.put("1", place("1", *LONDON))
+        self.grid.put("3", place("3", "north", 0))
+        self.grid.discard("5")
+        self.grid.discard("missing")
+        self.assertEqual(len(self.grid), 2998)
+        self.assertEqual([obj_id for km, obj_id
+                          in self.grid.radius(*LONDON, 1)], ["1"])
+
+
+class TestFileStorageGrid(StorageTestCase):
+    """Test the spatial queries of FileStorage and of the console"""
+
+    def setUp(self):
+        super().setUp()
+        self.paris = place("paris", *PARIS)
+        self.london = place("london", *LONDON)
+        for obj in (self.paris, self.london):
+            self.fs.new(obj)
+
+    def test_queries(self):
+        self.assertEqual(self.fs.within_box(Place, 48, 2, 49, 3),
+                         [self.paris])
+        self.assertEqual([obj for km, obj in self.fs.within_radius(
+            Place, *LONDON, 400)], [self.london, self.paris])
+        km, obj = self.fs.nearest("Place", 48, 2)[0]
+        self.assertIs(obj, self.paris)
+        self.assertAlmostEqual(km, distance(48, 2, *PARIS))
+
+    def test_new_update_delete(self):
+        self.assertEqual(len(self.fs.within_radius(Place, *PARIS, 10)), 1)
+        self.fs.new(place("near", PARIS[0], PARIS[1] + 0.01))
+        with mock.patch("models.storage", self.fs):
+            self.london.latitude = PARIS[0]
+            self.london.longitude = PARIS[1] - 0.01
+            self.fs.delete(self.paris)
+        self.assertEqual(sorted(obj.id for km, obj in self.fs.within_radius(
+            Place, *PARIS, 10)), ["london", "near"])
+
+    def test_console(self):
+        console = HBNBCommand()
+        for line, found in [("near Place 51.5 -0.1 20", ["london"]),
+                            ("Place.near(51.5, -0.1, top=2)",
+                             ["london", "paris"]),
+                            ("near Place 48 2 49 3", ["paris"])]:
+            with mock.patch("models.storage", self.fs), \
+                    mock.patch("sys.stdout", new=StringIO()) as output:
+                console.onecmd(console.precmd(line))
+            self.assertEqual([obj_id for obj_id in ("london", "paris")
+                              if obj_id in output.getvalue()], found)
+        with mock.patch("models.storage", self.fs), \
+                mock.patch("sys.stdout", new=StringIO()) as output:
+            Place()
+            console.onecmd("near Place 0 0 1")
+        self.assertEqual(output.getvalue().strip(), "[]")
+        for line, error in [("near", "** class name missing **"),
+                            ("near Nope 1 2 3", "** class doesn't exist **"),
+                            ("near Place 1", "** coordinates missing **"),
+                            ("near Place 1 2", "** distance missing **"),
+                            ("near Place 1 x 2", "** invalid number **"),
+                            ("near Place 1 2 3 top=2",
+                             "** invalid arguments **")]:
+            with mock.patch("sys.stdout", new=StringIO()) as output:
+                console.onecmd(line)
+            self.assertEqual(output.getvalue().strip(), error)
+
+
+class TestDBStorageSpatial(unittest.TestCase):
+    """Test the spatial queries of DBStorage"""
+
+    def test_queries(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            db = DBStorage(os.path.join(tmp, "hbnb.db"))
+            db.reload()
+            db.new(place("paris", *PARIS))
+            db.new(place("london", *LONDON))
+            db.new(place("nowhere", "north", "east"))
+            db.new(Place(id="unset", created_at=DATE, updated_at=DATE))
+            self.assertEqual([obj.id for obj in db.within_box(
+                Place, 48, 2, 49, 3)], ["paris"])
+            self.assertEqual([obj.id for km, obj in db.within_radius(
+                Place, *PARIS, 400)], ["paris", "london"])
+            self.assertEqual([obj.id for km, obj in db.nearest(
+                Place, *LONDON, 5)], ["london", "paris"])
+            self.assertEqual(db.within_radius(Place, 0, 0, 1), [])
+            db.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
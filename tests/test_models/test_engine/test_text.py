@@ -0,0 +1,244 @@
+#!/usr/bin/python3
+"""This module contains Tests for the full-text index of reviews and places"""
+
+from console import HBNBCommand
+from io import BytesIO, StringIO
+from models.engine.db_storage import DBStorage
+from models.engine.file_storage import FileStorage
+from models.engine.text import TextIndex, tokens
+from models.place import Place
+from models.review import Review
+from tests.storage_case import StorageTestCase
+from unittest import mock
+import math
+import os
+import random
+import tempfile
+import unittest
+
+DATE = "2024-01-13T12:09:00"
+
+
+def review(obj_id, text, **attributes):
+    """return a Review with the given id and text"""
+    return Review(id=obj_id, created_at=DATE, updated_at=DATE, text=text,
+                  **attributes)
+
+
+def bm25(texts, query, k1=1.2, b=0.75):
+    """return the {id: score} of the {id: text} texts, computed naively"""
+    documents = {obj_id: tokens(text) for obj_id, text in texts.items()}
+    average = sum(map(len, documents.values())) / len(documents)
+    scores = {}
+    for word in set(tokens(query)):
+        used = sum(word in words for words in documents.values())
+        if not used:
+            continue
+        idf = math.log(1 + (len(documents) - used + 0.5) / (used + 0.5))
+        for obj_id, words in documents.items():
+            count = words.count(word)
+            if count:
+                scores[obj_id] = scores.get(obj_id, 0) + idf * count \
+                    * (k1 + 1) / (count + k1 * (1 - b + b * len(words)
+                                                / average))
+    return scores
+
+
+class TestTextIndex(unittest.TestCase):
+    """Test the TextIndex class"""
+
+    def setUp(self):
+        self.texts = {"1": "A quiet, clean flat near the station.",
+                      "2": "Clean! Very clean and very quiet.",
+                      "3": "Noisy street, but a great breakfast",
+                      "4": ""}
+        self.index = TextIndex(["text"])
+        for obj_id, text in self.texts.items():
+            self.index.put(obj_id, review(obj_id, text))
+
+    def test_tokens(self):
+        self.assertEqual(tokens("Très_CLEAN, 2 beds!"),
+                         ["très", "clean", "2", "beds"])
+
+    def test_search(self):
+        expected = bm25(self.texts, "clean quiet")
+        found = self.index.search("Clean QUIET clean")
+        self.assertEqual([obj_id for score, obj_id in found], ["2", "1"])
+        for score, obj_id in found:
+            self.assertAlmostEqual(score, expected[obj_id])
+        self.assertEqual(self.index.search("clean", 1)[0][1], "2")
+        self.assertEqual(self.index.search("missing words"), [])
+        self.assertEqual(self.index.search("clean", 0), [])
+        self.assertEqual(len(self.index.search("a", None)), 2)
+
+    def test_put_discard(self):
+        self.index.put("3", review("3", "quiet garden"))
+        self.index.discard("2")
+        self.index.discard("2")
+        del self.texts["2"]
+        self.texts["3"] = "quiet garden"
+        expected = bm25(self.texts, "quiet noisy")
+        self.assertEqual({obj_id: round(score, 9) for score, obj_id
+                          in self.index.search("quiet noisy", None)},
+                         {obj_id: round(score, 9) for obj_id, score
+                          in expected.items()})
+        self.assertEqual(len(self.index), 3)
+
+    def test_same_as_exhaustive(self):
+        """the words skipped by MaxScore never change the first k"""
+        random.seed(3)
+        words = [f"w{i}" for i in range(300)]
+        weights = [1 / (rank + 1) for rank in range(len(words))]
+        texts = {str(i): " ".join(random.choices(
+            words, weights, k=random.randrange(1, 40))) for i in range(800)}
+        index = TextIndex(["text"])
+        for obj_id, text in texts.items():
+            index.put(obj_id, review(obj_id, text))
+        for trial in range(40):
+            query = " ".join(random.sample(words[:60], 3)
+                             + random.sample(words[60:], 2))
+            every = index.search(query, None)
+            self.assertEqual(index.search(query, 5), every[:5])
+            expected = bm25(texts, query)
+            self.assertEqual(len(every), len(expected))
+            for score, obj_id in every[:5]:
+                self.assertAlmostEqual(score, expected[obj_id])
+
+    def test_dump_load(self):
+        file = BytesIO()
+        self.index.dump(file)
+        self.assertFalse(self.index.changed)
+        file.seek(0)
+        index = TextIndex.load(file)
+        self.assertEqual(index.fields, ("text",))
+        self.assertEqual(index.stale, set(self.texts))
+        self.assertFalse(index.changed)
+        self.assertEqual(index.search("clean quiet"),
+                         self.index.search("clean quiet"))
+        # unchanged texts are not indexed again
+        index.put("1", review("1", self.texts["1"]))
+        self.assertFalse(index.changed)
+        for data in (b"", b"nope", file.getvalue()[:20]):
+            with self.assertRaises(ValueError):
+                TextIndex.load(BytesIO(data))
+
+
+class TestFileStorageText(StorageTestCase):
+    """Test the text search of FileStorage, of queries and of the console"""
+
+    def setUp(self):
+        super().setUp()
+        self.reviews = [review("r1", "Quiet and clean", place_id="p1"),
+                        review("r2", "clean clean clean", place_id="p2"),
+                        review("r3", "Loud music all night", place_id="p1")]
+        for obj in self.reviews:
+            self.fs.new(obj)
+        self.fs.new(Place(id="p1", created_at=DATE, updated_at=DATE,
+                          name="Loft", description="A quiet loft"))
+
+    def ids(self, found):
+        """return the ids of (score, obj) pairs"""
+        return [obj.id for score, obj in found]
+
+    def test_search(self):
+        self.assertEqual(self.ids(self.fs.search(Review, "clean")),
+                         ["r2", "r1"])
+        self.assertEqual(self.ids(self.fs.search("Place", "quiet loft")),
+                         ["p1"])
+        self.assertEqual(self.fs.text(Review).fields, ("text",))
+
+    def test_new_update_delete(self):
+        self.fs.search(Review, "clean")
+        self.fs.new(review("r4", "clean, very clean"))
+        with mock.patch("models.storage", self.fs):
+            self.reviews[1].text = "dirty"
+            self.fs.delete(self.reviews[0])
+        self.assertEqual(self.ids(self.fs.search(Review, "clean")), ["r4"])
+        self.assertEqual(self.ids(self.fs.search(Review, "dirty")), ["r2"])
+
+    def test_persist(self):
+        storage = FileStorage(self.path, persist_text=True)
+        storage.search(Review, "clean")
+        storage.close()
+        text_path = self.path + ".Review.text"
+        self.assertTrue(os.path.exists(text_path))
+        # changes made while the index was not loaded
+        FileStorage._FileStorage__objects.pop("Review.r1")
+        self.fs.new(review("r5", "clean and quiet"))
+        storage.reload()
+        with mock.patch.object(TextIndex, "put", autospec=True,
+                               side_effect=TextIndex.put) as put:
+            self.assertEqual(self.ids(storage.search(Review, "quiet")),
+                             ["r5"])
+        self.assertEqual(put.call_count, 3)
+        self.assertEqual(self.ids(storage.search(Review, "clean")),
+                         ["r2", "r5"])
+        # a file that cannot be read is built again
+        storage.close()
+        with open(text_path, "wb") as file:
+            file.write(b"garbage")
+        storage.reload()
+        self.assertEqual(self.ids(storage.search(Review, "quiet")), ["r5"])
+        storage.close()
+
+    def test_query(self):
+        query = self.fs.query(Review).search("clean quiet")
+        self.assertEqual(query.explain(),
+                         "text: Review matching 'clean quiet'")
+        self.assertEqual([obj.id for obj in query], ["r1", "r2"])
+        query = query.filter(place_id="p1").limit(1)
+        self.assertEqual(query.explain(), "text: Review matching "
+                         "'clean quiet'\nfilter: place_id__eq\nlimit: 1")
+        self.assertEqual([obj.id for obj in query], ["r1"])
+        query = self.fs.query(Review).search("clean").order_by("id")
+        self.assertEqual(query.explain(), "text: Review matching 'clean'"
+                         "\norder by: id")
+        self.assertEqual([obj.id for obj in query], ["r1", "r2"])
+        with mock.patch.object(self.fs, "search", wraps=self.fs.search) \
+                as search:
+            self.assertEqual(self.fs.query(Review).search("clean").filter(
+                place_id="p1").first().id, "r1")
+        self.assertEqual([call.args[2] for call in search.call_args_list],
+                         [1, 4])
+
+    def test_console(self):
+        console = HBNBCommand()
+        for line, found in [("search Review clean", ["r2", "r1"]),
+                            ('Review.search("clean")', ["r2", "r1"]),
+                            ("search Review clean top=1", ["r2"]),
+                            ("search Review opera", [])]:
+            with mock.patch("models.storage", self.fs), \
+                    mock.patch("sys.stdout", new=StringIO()) as output:
+                console.onecmd(console.precmd(line))
+            self.assertEqual(output.getvalue().strip(), str(
+                [str(self.fs.get(Review, obj_id)) for obj_id in found]))
+        for line, error in [("search", "** class name missing **"),
+                            ("search Nope x", "** class doesn't exist **"),
+                            ("search Review", "** words missing **"),
+                            ("search Review x top=y",
+                             "** invalid number **")]:
+            with mock.patch("sys.stdout", new=StringIO()) as output:
+                console.onecmd(line)
+            self.assertEqual(output.getvalue().strip(), error)
+
+
+class TestDBStorageText(unittest.TestCase):
+    """Test the text search of DBStorage"""
+
+    def test_search(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            db = DBStorage(os.path.join(tmp, "hbnb.db"))
+            db.reload()
+            db.new(review("r1", "Quiet and clean"))
+            db.new(review("r2", "clean clean clean"))
+            db.new(review("r3", "Loud"))
+            self.assertEqual([obj.id for score, obj
+                              in db.search(Review, "clean")], ["r2", "r1"])
+            self.assertEqual([obj.id for obj in db.query(Review).search(
+                "loud").all()], ["r3"])
+            self.assertEqual(db.search("Nope", "clean"), [])
+            db.close()
+
+
+if __name__ == "__main__":
+    unittest.main()